@@ -1,21 +1,226 @@
-from flask import Flask, request, jsonify, render_template
+import os
+import json
+import time
+import atexit
+from flask import Flask, Response, g, request, jsonify, render_template, stream_with_context
 import numpy as np
-import pickle
-from tensorflow.keras.models import load_model
+
+from src.constants import (
+    PREDICT_MAX_BATCH_SIZE,
+    PREDICT_MAX_WAIT_MS,
+    PREDICT_BATCH_CHUNK_SIZE,
+    META_SCORING_MODE,
+    SCORE_CACHE_MAX_ENTRIES,
+    SCORE_CACHE_TTL_S,
+    METRICS_ENABLED,
+    SEQUENCE_STORE_MAX_MEMORY_MB,
+    SEQUENCE_STORE_SNAPSHOT_PATH,
+    SEQUENCE_STORE_SNAPSHOT_INTERVAL_S,
+    WORKER_EXPORTS_DIR,
+    WORKER_EXPORTS_INTERVAL_S,
+)
+from src.serving.batcher import MicroBatcher
+from src.serving.metrics import BATCH_SIZE_BUCKETS, MetricsRegistry
+from src.serving.prefork import WorkerExports, memory_report
+from src.serving.registry import ModelRegistry
+from src.serving.score_cache import ScoreCache, SharedScoreCache, score_key
+from src.serving.sequence_store import SequenceStore
+from src.serving.features import (
+    FEATURE_NAMES,
+    SEQUENCE_LENGTH,
+    FeatureError,
+    columns_to_matrix,
+    customer_ids,
+    parse_ndjson,
+    record_customer_ids,
+    record_to_matrix,
+    records_to_matrix,
+    to_river_inputs,
+)
 
 app = Flask(__name__)
 
-# Load models
-with open("artifact/meta_model.pkl", "rb") as f:
-    meta_model = pickle.load(f)
+# Set by serve.py before importing the app: the process is then a pre-fork master that
+# loads only what its workers can share, and each worker finishes setup in init_worker().
+PREFORK = os.getenv("SERVING_PREFORK", "0") == "1"
+# The PreforkServer when running under serve.py, for /stats/workers, and this worker's
+# published metrics and batcher stats, through which it reports its siblings'.
+prefork_server = None
+worker_exports = None
+
+max_batch_size = int(os.getenv("PREDICT_MAX_BATCH_SIZE", PREDICT_MAX_BATCH_SIZE))
+max_wait_ms = float(os.getenv("PREDICT_MAX_WAIT_MS", PREDICT_MAX_WAIT_MS))
 
-with open("artifact/hk/model_trainer/model.pkl", "rb") as f:
-    river_model = pickle.load(f)
+metrics = MetricsRegistry(enabled=os.getenv("METRICS_ENABLED", str(METRICS_ENABLED)).lower() in ("1", "true"))
+requests_total = metrics.counter("requests_total", "HTTP requests by endpoint and status.", ("endpoint", "status"))
+request_errors_total = metrics.counter(
+    "request_errors_total", "HTTP responses with status >= 400.", ("endpoint", "status")
+)
+request_seconds = metrics.histogram("request_seconds", "Request latency up to the response (first byte when streamed).", ("endpoint",))
+batch_rows = metrics.histogram(
+    "scored_batch_rows", "Rows per model call (micro-batches and /predict_batch chunks).",
+    buckets=BATCH_SIZE_BUCKETS
+)
+# Bound once so the hot path skips the label lookup.
+stage_parse = metrics.stage_seconds.labels("parse")
+stage_sequence = metrics.stage_seconds.labels("sequence")
+stage_cache = metrics.stage_seconds.labels("cache_lookup")
+stage_batched = metrics.stage_seconds.labels("batched_scoring")
+stage_river = metrics.stage_seconds.labels("river")
+stage_bilstm = metrics.stage_seconds.labels("bilstm")
+stage_meta = metrics.stage_seconds.labels("meta")
+
+# Models load and warm up in the background; /readyz flips once they are done.
+models = ModelRegistry(
+    warmup_batch_sizes=(1, max_batch_size),
+    meta_scoring=os.getenv("META_SCORING_MODE", META_SCORING_MODE)
+)
+if not PREFORK:
+    models.start()
 
-bilstm_model = load_model(
-    "artifacts/model_trainer/best_bilstm_model.keras",
-    compile=False
+# Retried and duplicate /predict payloads reuse the first result; reloading the models clears it.
+# Pre-forked workers share one cache, so a retry hits whichever worker it lands on.
+score_cache = (SharedScoreCache if PREFORK else ScoreCache)(
+    max_entries=int(os.getenv("SCORE_CACHE_MAX_ENTRIES", SCORE_CACHE_MAX_ENTRIES)),
+    ttl_s=float(os.getenv("SCORE_CACHE_TTL_S", SCORE_CACHE_TTL_S))
 )
+models.add_reload_listener(score_cache.invalidate)
+
+metrics.callback("models_ready", "1 once every model is loaded and warmed up.", lambda: int(models.ready))
+# A pre-forked cache is shared by every worker, so it is reported once, without a worker label.
+for counter in ("hits", "misses", "evictions", "expirations"):
+    metrics.callback(
+        f"score_cache_{counter}_total", f"Score cache {counter}.",
+        lambda counter=counter: getattr(score_cache, counter), kind="counter", shared=PREFORK
+    )
+metrics.callback("score_cache_entries", "Results currently cached.", lambda: len(score_cache), shared=PREFORK)
+
+# Rolling per-customer history that feeds real sequences to the BiLSTM; in shared memory
+# when pre-forked, so every worker extends the same histories.
+sequence_store = SequenceStore(
+    sequence_length=SEQUENCE_LENGTH,
+    num_features=len(FEATURE_NAMES),
+    max_memory_mb=float(os.getenv("SEQUENCE_STORE_MAX_MEMORY_MB", SEQUENCE_STORE_MAX_MEMORY_MB)),
+    shared=PREFORK
+)
+if os.path.exists(SEQUENCE_STORE_SNAPSHOT_PATH):
+    sequence_store.load(SEQUENCE_STORE_SNAPSHOT_PATH)
+if not PREFORK:
+    sequence_store.snapshot_periodically(SEQUENCE_STORE_SNAPSHOT_PATH, SEQUENCE_STORE_SNAPSHOT_INTERVAL_S)
+    atexit.register(sequence_store.save, SEQUENCE_STORE_SNAPSHOT_PATH)
+
+
+def score_matrix(matrix, sequences):
+    """
+    Score an (n, 8) feature matrix and its (n, 30, 8) BiLSTM sequences with
+    one BiLSTM forward pass and one meta-model call. Returns one result dict per row.
+    """
+    batch_rows.observe(len(matrix))
+    with stage_river.time():
+        river_probs = [
+            models.river_model.predict_proba_one(river_input).get(1, 0.0)
+            for river_input in to_river_inputs(matrix)
+        ]
+
+    with stage_bilstm.time():
+        bilstm_probs = models.bilstm_model.predict_proba(sequences)
+
+    with stage_meta.time():
+        combined_probs = np.column_stack([river_probs, bilstm_probs])
+        meta_proba = models.meta_model.predict_proba(combined_probs)
+        meta_probs = meta_proba[:, 1]
+        # Same decision as meta_model.predict without walking the trees twice.
+        pred_labels = models.meta_model.classes_[np.argmax(meta_proba, axis=1)]
+
+    return [
+        {
+            "Prediction": "FRAUD" if pred_label else "NON-FRAUD",
+            "Confidence": meta_prob * 100,
+            "RiverProbability": river_prob,
+            "BiLSTMProbability": bilstm_prob,
+            "MetaProbability": meta_prob
+        }
+        for river_prob, bilstm_prob, pred_label, meta_prob in zip(
+            river_probs, bilstm_probs.tolist(), pred_labels.tolist(), meta_probs.tolist()
+        )
+    ]
+
+
+def score_batch(items):
+    """
+    Batch function for the micro-batcher: one (row, sequence) pair per queued request.
+    """
+    return score_matrix(
+        np.vstack([matrix for matrix, _ in items]),
+        np.concatenate([sequences for _, sequences in items])
+    )
+
+
+def start_batcher() -> MicroBatcher:
+    return MicroBatcher(
+        score_batch,
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms
+    )
+
+
+# Its worker thread would not survive fork(); pre-forked workers start their own.
+batcher = None if PREFORK else start_batcher()
+metrics.callback(
+    "batcher_queue_depth", "Requests waiting for the micro-batcher.", lambda: batcher.stats()["queue_depth"]
+)
+
+
+def init_worker(worker_id: int, server=None) -> None:
+    """
+    Finish setting up a pre-forked worker (see serve.py): load the BiLSTM,
+    whose TensorFlow runtime cannot be started before the fork, and start
+    the threads the master did not. The sequence store is shared, so
+    worker 0 alone snapshots it periodically; serve.py saves the final
+    snapshot once every worker has stopped.
+    """
+    global batcher, prefork_server, worker_exports
+    prefork_server = server
+    models.load(["bilstm"])
+    batcher = start_batcher()
+    metrics.set_constant_labels(worker=worker_id)
+    worker_exports = WorkerExports(
+        WORKER_EXPORTS_DIR,
+        worker_id,
+        lambda: {"metrics": metrics.collect(include_shared=False), "batcher": batcher.stats()},
+        WORKER_EXPORTS_INTERVAL_S
+    ).start()
+    if worker_id == 0:
+        sequence_store.snapshot_periodically(SEQUENCE_STORE_SNAPSHOT_PATH, SEQUENCE_STORE_SNAPSHOT_INTERVAL_S)
+
+
+def shutdown_worker(worker_id: int) -> None:
+    """
+    Serve the requests still queued in the batcher.
+    """
+    batcher.close()
+
+
+@app.before_request
+def start_request_timer():
+    if metrics.enabled:
+        g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    if metrics.enabled and "request_start" in g:
+        endpoint = request.endpoint or "unknown"
+        status = str(response.status_code)
+        request_seconds.labels(endpoint).observe(time.perf_counter() - g.request_start)
+        requests_total.labels(endpoint, status).inc()
+        if response.status_code >= 400:
+            request_errors_total.labels(endpoint, status).inc()
+    return response
+
+
+def not_ready_response():
+    return jsonify({"error": "Models are still loading"}), 503
 
 
 @app.route("/")
@@ -30,51 +235,144 @@ def app_page():
 
 @app.route("/predict", methods=["POST"])
 def predict():
-    data = request.get_json()
-    if not data:
+    if not models.ready:
+        return not_ready_response()
+
+    with stage_parse.time():
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "No input data provided"}), 400
+
+        try:
+            matrix = record_to_matrix(data)
+        except FeatureError as e:
+            return jsonify({"error": str(e)}), 400
+
+    ids = record_customer_ids([data])
+    customer_id = None if ids is None else ids[0]
+
+    key = None
+    if score_cache.enabled:
+        with stage_cache.time():
+            # With a customer_id the score also depends on that customer's history, read
+            # without recording anything: a cached retry must not count as a new transaction.
+            history = None if customer_id is None else sequence_store.peek(customer_id)
+            key = score_key(matrix[0], models.version, history, customer_id)
+            cached = score_cache.get(key)
+        if cached is not None:
+            return jsonify(cached)
+
+    with stage_sequence.time():
+        sequences = sequence_store.build_sequences(ids, matrix)
+
+    # Queue wait plus this request's share of one batched model call.
+    with stage_batched.time():
+        result = batcher.submit((matrix, sequences))
+    if key is not None:
+        if customer_id is not None:
+            # Keyed by the history this request left behind, which is what a retry will peek.
+            key = score_key(matrix[0], models.version, sequences[0], customer_id)
+        score_cache.put(key, result)
+    return jsonify(result)
+
+
+@app.route("/predict_batch", methods=["POST"])
+def predict_batch():
+    """
+    Score many transactions in one request.
+
+    Accepts either a columnar JSON object (one array per feature) or
+    newline-delimited JSON records, and streams one NDJSON result per row.
+    Rows carrying a customer_id update that customer's history in order.
+    """
+    if not models.ready:
+        return not_ready_response()
+
+    try:
+        with stage_parse.time():
+            if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+                records = parse_ndjson(request.get_data(as_text=True))
+                matrix = records_to_matrix(records)
+                ids = record_customer_ids(records)
+            else:
+                columns = request.get_json(silent=True)
+                if not isinstance(columns, dict):
+                    raise FeatureError("Expected a JSON object with one array per feature")
+                matrix = columns_to_matrix(columns)
+                ids = customer_ids(columns)
+    except FeatureError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if len(matrix) == 0:
         return jsonify({"error": "No input data provided"}), 400
 
-    # River input with lowercase keys
-    river_input = {
-        "Amount": data["amount"],
-        "HourOfDay": data["hour_of_day"],
-        "CustomerTenureMonths": data["customer_tenure"],
-        "NumTransactionsLast24h": data["num_tx_last_24h"],
-        "AvgTransactionAmount7d": data["avg_tx_amount_7d"],
-        "CardPresent": int(data["card_present"]),
-        "IsInternational": int(data["is_international"]),
-        "IsNewDevice": int(data["is_new_device"])
-    }
-
-    river_prob = river_model.predict_proba_one(river_input)
-    river_prob = river_prob.get(1, 0.0)
-
-    # BiLSTM input
-    bilstm_features = np.array([
-        data["amount"],
-        data["hour_of_day"],
-        data["customer_tenure"],
-        data["num_tx_last_24h"],
-        data["avg_tx_amount_7d"],
-        int(data["card_present"]),
-        int(data["is_international"]),
-        int(data["is_new_device"])
-    ], dtype=np.float32)
-
-    bilstm_input = np.tile(bilstm_features, (30, 1)).reshape(1, 30, -1)
-    bilstm_prob = float(bilstm_model.predict(bilstm_input)[0][0])
-
-    combined_probs = np.array([[river_prob, bilstm_prob]])
-    pred_label = int(meta_model.predict(combined_probs)[0])
-    pred_prob = float(meta_model.predict_proba(combined_probs)[0][1])
-
-    return jsonify({
-        "Prediction": "FRAUD" if pred_label else "NON-FRAUD",
-        "Confidence": pred_prob * 100,
-        "RiverProbability": river_prob,
-        "BiLSTMProbability": bilstm_prob,
-        "MetaProbability": pred_prob
-    })
+    def generate():
+        for start in range(0, len(matrix), PREDICT_BATCH_CHUNK_SIZE):
+            stop = start + PREDICT_BATCH_CHUNK_SIZE
+            chunk = matrix[start:stop]
+            sequences = sequence_store.build_sequences(None if ids is None else ids[start:stop], chunk)
+            for result in score_matrix(chunk, sequences):
+                yield json.dumps(result) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@app.route("/healthz")
+def healthz():
+    """
+    Liveness probe: answers as soon as the process is serving HTTP.
+    """
+    return jsonify({"status": "alive"})
+
+
+@app.route("/readyz")
+def readyz():
+    """
+    Readiness probe: 200 only once every model is loaded and warmed up.
+    """
+    report = models.startup_report()
+    return jsonify(report), 200 if models.ready else 503
+
+
+@app.route("/stats/batcher")
+def batcher_stats():
+    """
+    Micro-batcher stats; pre-forked, one entry per worker id (the others'
+    as of their last export).
+    """
+    if worker_exports is None:
+        return jsonify(batcher.stats())
+    workers = {worker_id: state["batcher"] for worker_id, state in worker_exports.others().items()}
+    workers[worker_exports.worker_id] = batcher.stats()
+    return jsonify({"workers": {str(worker_id): workers[worker_id] for worker_id in sorted(workers)}})
+
+
+@app.route("/stats/cache")
+def cache_stats():
+    return jsonify(score_cache.stats())
+
+
+@app.route("/stats/workers")
+def worker_stats():
+    """
+    Memory per serving process: the master and every pre-forked worker
+    under serve.py, otherwise just this process.
+    """
+    if prefork_server is not None:
+        return jsonify(prefork_server.memory_report())
+    return jsonify(memory_report(None, [os.getpid()]))
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """
+    Prometheus text exposition of the counters and latency histograms.
+    Pre-forked, every worker's series are included, labelled by worker.
+    """
+    if not metrics.enabled:
+        return jsonify({"error": "Metrics are disabled (METRICS_ENABLED=0)"}), 404
+    others = [] if worker_exports is None else [state["metrics"] for state in worker_exports.others().values()]
+    return Response(metrics.render(others), mimetype="text/plain; version=0.0.4")
 
 
 if __name__ == "__main__":
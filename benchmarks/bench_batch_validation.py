@@ -0,0 +1,45 @@
+"""
+Validation throughput (rows/sec): per-record `DataValidation.check` vs the
+vectorized `BatchValidator` over the same DataFrame.
+
+Usage:
+    python -m benchmarks.bench_batch_validation --csv-path credit_card_fraud_dataset.csv --repeat 10
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.components.data_validation import DataValidation
+from src.entity.config_entity import DataValidationConfig
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv-path", default="credit_card_fraud_dataset.csv")
+    parser.add_argument("--repeat", type=int, default=1, help="Tile the CSV this many times")
+    args = parser.parse_args()
+
+    df = pd.concat([pd.read_csv(args.csv_path)] * args.repeat, ignore_index=True)
+    validation = DataValidation(DataValidationConfig(), ingestion_artifact=None)
+
+    labels = df["IsFraud"].tolist()
+    records = list(zip(df.drop(columns="IsFraud").to_dict("records"), labels))
+    start = time.perf_counter()
+    record_mask = np.array([validation.check(x_y) is None for x_y in records])
+    record_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = validation.validate_batch(df)
+    batch_s = time.perf_counter() - start
+
+    print(f"rows:             {len(df)}")
+    print(f"per-record:       {len(df) / record_s:>12,.0f} rows/sec")
+    print(f"vectorized:       {len(df) / batch_s:>12,.0f} rows/sec  ({record_s / batch_s:.1f}x)")
+    print(f"masks identical:  {np.array_equal(record_mask, result.mask)}")
+    print(f"violations:       {result.failures}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Per-call BiLSTM latency: Keras `Model.predict` vs the compiled serving wrapper.
+
+Usage:
+    python -m benchmarks.bench_bilstm_inference --iterations 200 --batch-sizes 1 8 32
+"""
+import argparse
+import time
+
+import numpy as np
+from tensorflow.keras.models import load_model
+
+from src.serving.inference import CompiledBiLSTM
+
+
+def time_calls(fn, x, iterations):
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(x)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-path", default="artifacts/model_trainer/best_bilstm_model.keras")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    model = load_model(args.model_path, compile=False)
+    compiled = CompiledBiLSTM(model, warmup_batch_sizes=args.batch_sizes)
+    _, steps, features = model.input_shape
+
+    paths = {
+        "Model.predict": lambda x: model.predict(x, verbose=0),
+        "CompiledBiLSTM": compiled.predict_proba,
+    }
+
+    print(f"{'path':<16} {'batch':>5} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for batch_size in args.batch_sizes:
+        x = np.random.default_rng(0).random((batch_size, steps, features), dtype=np.float32)
+        for name, fn in paths.items():
+            fn(x)  # exclude first-call tracing from the timings
+            latencies = time_calls(fn, x, args.iterations)
+            print(
+                f"{name:<16} {batch_size:>5} {latencies.mean():>9.3f} "
+                f"{np.percentile(latencies, 50):>9.3f} {np.percentile(latencies, 95):>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
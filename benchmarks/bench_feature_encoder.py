@@ -0,0 +1,85 @@
+"""
+Per-record feature encoding cost: the hand-written dict -> np.array
+extraction previously repeated in app.py and the meta pipelines vs the
+shared `FeatureEncoder` (single record and batch), plus the River dict view.
+
+Usage:
+    python -m benchmarks.bench_feature_encoder --csv-path credit_card_fraud_dataset.csv
+"""
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from src.utils.feature_encoder import FeatureEncoder
+
+
+def handwritten(raw_features):
+    return np.array([
+        raw_features["Amount"],
+        raw_features["HourOfDay"],
+        raw_features["CustomerTenureMonths"],
+        raw_features["NumTransactionsLast24h"],
+        raw_features["AvgTransactionAmount7d"],
+        int(raw_features["CardPresent"]),
+        int(raw_features["IsInternational"]),
+        int(raw_features["IsNewDevice"])
+    ], dtype=np.float32)
+
+
+def handwritten_river(raw_features):
+    return {
+        "Amount": raw_features["Amount"],
+        "HourOfDay": raw_features["HourOfDay"],
+        "CustomerTenureMonths": raw_features["CustomerTenureMonths"],
+        "NumTransactionsLast24h": raw_features["NumTransactionsLast24h"],
+        "AvgTransactionAmount7d": raw_features["AvgTransactionAmount7d"],
+        "CardPresent": int(raw_features["CardPresent"]),
+        "IsInternational": int(raw_features["IsInternational"]),
+        "IsNewDevice": int(raw_features["IsNewDevice"]),
+    }
+
+
+def handwritten_both(raw_features):
+    handwritten(raw_features)
+    return handwritten_river(raw_features)
+
+
+def per_record_us(fn, records, repeat):
+    seconds = min(timeit.repeat(lambda: [fn(r) for r in records], number=1, repeat=repeat))
+    return seconds / len(records) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv-path", default="credit_card_fraud_dataset.csv")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    records = pd.read_csv(args.csv_path).drop(columns="IsFraud").to_dict("records")
+    encoder = FeatureEncoder()
+
+    old_one = per_record_us(handwritten, records, args.repeat)
+    new_one = per_record_us(encoder.encode_one, records, args.repeat)
+    old_batch = min(timeit.repeat(
+        lambda: np.stack([handwritten(r) for r in records]), number=1, repeat=args.repeat
+    )) / len(records) * 1e6
+    new_batch = min(timeit.repeat(
+        lambda: encoder.encode_many(records), number=1, repeat=args.repeat
+    )) / len(records) * 1e6
+    old_river = per_record_us(handwritten_both, records, args.repeat)
+    new_river = per_record_us(lambda r: encoder.river_dict(encoder.encode_one(r)), records, args.repeat)
+
+    identical = np.array_equal(np.stack([handwritten(r) for r in records]), encoder.encode_many(records))
+
+    print(f"records: {len(records)}  (us per record)")
+    print(f"{'path':<24} {'before':>8} {'after':>8}")
+    print(f"{'single record':<24} {old_one:>8.2f} {new_one:>8.2f}")
+    print(f"{'batch':<24} {old_batch:>8.2f} {new_batch:>8.2f}")
+    print(f"{'array + River dict':<24} {old_river:>8.2f} {new_river:>8.2f}")
+    print(f"outputs identical: {identical}")
+
+
+if __name__ == "__main__":
+    main()
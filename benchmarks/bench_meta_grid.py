@@ -0,0 +1,88 @@
+"""
+Meta model as a RandomForest vs its compiled MetaGrid: deviation, artifact
+size and scoring latency for one row and for a batch.
+
+The grid is calibrated on 80% of the meta dataset built from the CSV and
+checked on the other 20%. Pass `--save-path` to write the grid compiled at
+the first `--resolutions` entry for an already-trained meta model.
+
+Usage:
+    python -m benchmarks.bench_meta_grid --csv-path credit_card_fraud_dataset.csv
+"""
+import argparse
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from src.serving.meta_grid import MetaGrid
+from src3.components.meta_trainer import MetaModelTrainer
+
+
+def per_call_us(fn, X, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(X)
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv-path", default="credit_card_fraud_dataset.csv")
+    parser.add_argument("--meta-model-path", default="artifact/meta_model.pkl")
+    parser.add_argument("--river-model-path", default="artifact/hk/model_trainer/model.pkl")
+    parser.add_argument("--bilstm-model-path", default="artifacts/model_trainer/best_bilstm_model.keras")
+    parser.add_argument("--resolutions", type=int, nargs="+", default=[65, 257, 1025])
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--retrain", action="store_true",
+                        help="Fit a fresh meta model on the 80% split instead of loading --meta-model-path")
+    parser.add_argument("--save-path", default=None)
+    args = parser.parse_args()
+
+    trainer = MetaModelTrainer(
+        river_model_path=args.river_model_path,
+        bilstm_model_path=args.bilstm_model_path
+    )
+    values, labels = trainer.load_arrays_from_csv(args.csv_path)
+    X_meta, y_meta = trainer.create_meta_dataset_from_arrays(values, labels)
+    X_train, X_val, y_train, y_val = train_test_split(
+        X_meta, y_meta, test_size=0.2, random_state=42, stratify=y_meta
+    )
+
+    if args.retrain:
+        meta_model = trainer.train_meta_model(X_train, y_train)
+    else:
+        with open(args.meta_model_path, "rb") as f:
+            meta_model = pickle.load(f)
+    model_bytes = len(pickle.dumps(meta_model))
+
+    one, batch = X_val[:1], X_val[:args.batch_size]
+    print(f"validation rows: {len(X_val)}, forest pickle: {model_bytes / 1024:.0f} KB")
+    print(f"forest:  1 row {per_call_us(meta_model.predict_proba, one, 200):>9.1f} us   "
+          f"{len(batch)} rows {per_call_us(meta_model.predict_proba, batch, 20):>9.1f} us")
+
+    for i, resolution in enumerate(args.resolutions):
+        for X_calibration in (None, X_train):
+            grid = MetaGrid.compile(meta_model, resolution=resolution, X_calibration=X_calibration)
+            report = grid.deviation_report(meta_model, X_val, y_val)
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "grid.npz")
+                grid.save(path)
+                grid_bytes = os.path.getsize(path)
+            label = f"grid {resolution}{' +quantiles' if X_calibration is not None else ''}"
+            print(f"{label:<20} shape {report['shape']}  {grid_bytes / 1024:>6.0f} KB  "
+                  f"1 row {per_call_us(grid.predict_proba, one, 2000):>6.1f} us  "
+                  f"{len(batch)} rows {per_call_us(grid.predict_proba, batch, 200):>7.1f} us")
+            print(f"{'':<20} |dev| max {report['max_abs_deviation']:.4f} mean {report['mean_abs_deviation']:.5f}  "
+                  f"labels agree {report['label_agreement']:.2%}  "
+                  f"AUC {report.get('model_auc', float('nan')):.4f} -> {report.get('grid_auc', float('nan')):.4f}")
+            if args.save_path and i == 0 and X_calibration is not None:
+                grid.save(args.save_path)
+                print(f"{'':<20} saved to {args.save_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+MongoDB ingestion throughput (docs/sec): the single projected cursor vs
+parallel `_id`-range cursors yielding row or columnar batches.
+
+Runs against an in-memory mongomock collection loaded from the CSV unless
+--mongodb-url is given, in which case the CSV is loaded into a scratch
+collection on that server (dropped afterwards).
+
+Usage:
+    python -m benchmarks.bench_mongo_ingestion --csv-path credit_card_fraud_dataset.csv --partitions 1 4
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from src.data_access.credit_data import CreditData
+
+
+def timed(label, batches, count):
+    start = time.perf_counter()
+    seen = sum(count(batch) for batch in batches)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {seen:>8} {seen / elapsed:>12,.0f}")
+    return seen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv-path", default="credit_card_fraud_dataset.csv")
+    parser.add_argument("--mongodb-url", default=None)
+    parser.add_argument("--collection", default="bench_ingestion")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--partitions", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    if args.mongodb_url:
+        import pymongo
+        client = pymongo.MongoClient(args.mongodb_url)
+    else:
+        import mongomock
+        client = mongomock.MongoClient()
+    database = client["bench"]
+    collection = database[args.collection]
+    collection.drop()
+    collection.insert_many(pd.read_csv(args.csv_path).to_dict("records"))
+
+    try:
+        credit_data = CreditData(database=database)
+        print(f"{'mode':<32} {'docs':>8} {'docs/sec':>12}")
+        timed("stream (batch_size=100)", credit_data.stream_collection_as_dict(args.collection), lambda _: 1)
+        timed(
+            f"stream (batch_size={args.batch_size})",
+            credit_data.stream_collection_as_dict(args.collection, batch_size=args.batch_size),
+            lambda _: 1
+        )
+        for partitions in args.partitions:
+            for as_columns in (False, True):
+                batches = credit_data.stream_collection_in_batches(
+                    args.collection, batch_size=args.batch_size,
+                    num_partitions=partitions, as_columns=as_columns
+                )
+                count = (lambda block: len(block[1])) if as_columns else len
+                timed(f"parallel x{partitions} ({'columns' if as_columns else 'rows'})", batches, count)
+    finally:
+        collection.drop()
+
+
+if __name__ == "__main__":
+    main()
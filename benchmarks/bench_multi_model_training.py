@@ -0,0 +1,94 @@
+"""
+Wall-clock of the three training demos run back to back (each reading the
+data itself) vs `MultiModelTrainPipeline` (one read, River and BiLSTM in
+parallel processes, then meta training).
+
+Each mode runs in a fresh interpreter, so both pay the same import costs.
+Writes the same model artifacts as the demos.
+
+Usage:
+    python -m benchmarks.bench_multi_model_training --csv-path credit_card_fraud_dataset.csv --bilstm-epochs 2
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from src.entity.config_entity import MultiModelTrainingConfig, training_pipeline_config
+from src.pipline.multi_model_pipeline import MultiModelTrainPipeline, _train_bilstm, _train_river
+
+
+def run_sequential(csv_path: str, bilstm_epochs: int) -> dict:
+    artifact_dir = training_pipeline_config.artifact_dir
+    stage_seconds = {}
+
+    # demo.py and demo2.py each read the data before training.
+    for stage, train in (("river", _train_river), ("bilstm", _train_bilstm)):
+        start = time.perf_counter()
+        config = MultiModelTrainingConfig(csv_path=csv_path)
+        config.snapshot_dir = os.path.join(config.snapshot_dir, f"sequential_{stage}")
+        snapshot_dir = MultiModelTrainPipeline(config).prepare_snapshot()
+        args = (artifact_dir, snapshot_dir) + ((bilstm_epochs,) if stage == "bilstm" else ())
+        result, _ = train(*args)
+        stage_seconds[stage] = time.perf_counter() - start
+        if stage == "bilstm":
+            bilstm_model_path = result.model_path
+
+    # demo3.py reads the CSV once more.
+    from src3.components.meta_trainer import MetaModelTrainer
+    start = time.perf_counter()
+    MetaModelTrainer(
+        river_model_path=MultiModelTrainingConfig().serving_river_model_path,
+        bilstm_model_path=bilstm_model_path
+    ).run_meta_training(csv_path=csv_path)
+    stage_seconds["meta"] = time.perf_counter() - start
+    return stage_seconds
+
+
+def run_mode(mode: str, csv_path: str, bilstm_epochs: int) -> dict:
+    start = time.perf_counter()
+    if mode == "sequential":
+        stage_seconds = run_sequential(csv_path, bilstm_epochs)
+    else:
+        config = MultiModelTrainingConfig(csv_path=csv_path, bilstm_epochs=bilstm_epochs)
+        stage_seconds = MultiModelTrainPipeline(config).run_pipeline()["stage_seconds"]
+    return {"stage_seconds": stage_seconds, "wall_seconds": time.perf_counter() - start}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv-path", default="credit_card_fraud_dataset.csv")
+    parser.add_argument("--bilstm-epochs", type=int, default=2)
+    parser.add_argument("--mode", choices=("sequential", "orchestrated"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        result = run_mode(args.mode, args.csv_path, args.bilstm_epochs)
+        print("RESULT " + json.dumps(result))
+        return
+
+    results = {}
+    for mode in ("sequential", "orchestrated"):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_multi_model_training", "--mode", mode,
+             "--csv-path", args.csv_path, "--bilstm-epochs", str(args.bilstm_epochs)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.rsplit("RESULT ", 1)[1])
+        result["process_seconds"] = time.perf_counter() - start
+        results[mode] = result
+
+    print(f"CPUs:                 {os.cpu_count()}")
+    for mode, result in results.items():
+        stages = ", ".join(f"{k} {v:.2f}s" for k, v in result["stage_seconds"].items())
+        print(f"{mode + ':':<21} {stages}")
+        print(f"{'':<21} total {result['process_seconds']:.2f}s (including interpreter start-up)")
+    speedup = results["sequential"]["process_seconds"] / results["orchestrated"]["process_seconds"]
+    print(f"speedup:              {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+River training throughput (records/sec): per-record vs mini-batch learning.
+
+The CSV is transformed once up front so only the learning loop is timed.
+
+Usage:
+    python -m benchmarks.bench_river_training --csv-path credit_card_fraud_dataset.csv --batch-sizes 64 512
+"""
+import argparse
+import time
+
+import pandas as pd
+from river.linear_model import LogisticRegression as RiverLogisticRegression
+from river.optim import SGD
+from river.metrics import Accuracy, ClassificationReport
+
+from src.components.data_transformation import DataTransformer
+from src.components.model_trainer import ModelTrainer
+from src.entity.artifact_entity import DataTransformationArtifact
+from src.entity.config_entity import DataTransformationConfig, ModelTrainerConfig
+
+
+def run(transformed, learning_mode, mini_batch_size=512):
+    config = ModelTrainerConfig(learning_mode=learning_mode, mini_batch_size=mini_batch_size)
+    artifact = DataTransformationArtifact(transformed_stream=iter(transformed), pipeline_path="")
+    trainer = ModelTrainer(config, artifact)
+
+    model = RiverLogisticRegression(optimizer=SGD())
+    accuracy = Accuracy()
+    start = time.perf_counter()
+    seen = trainer.learn_stream(model, accuracy, ClassificationReport())
+    elapsed = time.perf_counter() - start
+    return seen / elapsed, accuracy.get()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv-path", default="credit_card_fraud_dataset.csv")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[64, 512, 2048])
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv_path)
+    labels = df.pop("IsFraud").astype(int).tolist()
+    records = list(zip(df.to_dict("records"), labels))
+
+    transformed_stream, _ = DataTransformer(DataTransformationConfig()).fit_transform_stream(iter(records))
+    transformed = list(transformed_stream)
+
+    print(f"{'mode':<20} {'records/sec':>12} {'accuracy':>9}")
+    throughput, acc = run(transformed, "per_record")
+    print(f"{'per_record':<20} {throughput:>12,.0f} {acc:>9.4f}")
+    for batch_size in args.batch_sizes:
+        throughput, acc = run(transformed, "mini_batch", batch_size)
+        print(f"{f'mini_batch ({batch_size})':<20} {throughput:>12,.0f} {acc:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Load test for the scoring endpoints: replays transactions against the Flask
+app and reports throughput, latency percentiles and error rate as JSON.
+
+Transactions come from the training CSV (mapped to /predict payloads) or
+from a JSONL file with one payload per line. Every combination of
+--targets, --modes and --concurrency is run in turn, so serving setups can
+be compared from one command:
+
+    # in-process, single vs batch endpoint at 1 and 8 concurrent clients
+    python -m benchmarks.bench_serving --modes predict predict_batch --concurrency 1 8
+
+    # two running servers (e.g. different worker counts), paced at 200 req/s
+    python -m benchmarks.bench_serving --targets http://127.0.0.1:5000 http://127.0.0.1:5001 --rate 200
+
+With --rate the load is open-loop: request i is due at start + i / rate,
+and its latency is measured from that due time, so queueing behind a slow
+server is counted instead of hidden.
+"""
+import argparse
+import csv
+import http.client
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+
+from src.utils.feature_encoder import FEATURE_SPEC
+
+
+def _typed(value: str):
+    # CSV cells are strings; payloads carry JSON numbers and booleans like the web form.
+    if value in ("True", "False"):
+        return value == "True"
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def load_payloads(path: str, limit: Optional[int], with_customer_id: bool) -> List[Dict[str, Any]]:
+    """
+    /predict payloads from the training CSV or a JSONL file.
+    """
+    payloads = []
+    with open(path, newline="") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    payloads.append(json.loads(line))
+                if limit and len(payloads) >= limit:
+                    break
+        else:
+            for row in csv.DictReader(f):
+                payload = {key: _typed(row[name]) for name, key in FEATURE_SPEC}
+                if with_customer_id:
+                    payload["customer_id"] = row["CustomerID"]
+                payloads.append(payload)
+                if limit and len(payloads) >= limit:
+                    break
+    if not payloads:
+        raise ValueError(f"No payloads in {path}")
+    return payloads
+
+
+class TestClientTarget:
+    """
+    Calls the app in-process through Flask's test client (one per thread).
+    """
+
+    name = "test-client"
+
+    def __init__(self):
+        import app as serving_app
+
+        self.app = serving_app.app
+        if not serving_app.models.wait_until_ready(timeout=600):
+            raise RuntimeError("Models did not load within 600s")
+        self._local = threading.local()
+
+    def post(self, path: str, body: bytes, content_type: str):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.post(path, data=body, content_type=content_type)
+        return response.status_code, response.get_data()
+
+
+class HttpTarget:
+    """
+    Calls a running server over HTTP/1.1 with one keep-alive connection per thread.
+    """
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        parsed = urlparse(url)
+        self.name = url
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def post(self, path: str, body: bytes, content_type: str):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+        try:
+            connection.request("POST", path, body=body, headers={"Content-Type": content_type})
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self._local.connection = None
+            raise
+
+
+def build_requests(payloads: List[Dict[str, Any]], mode: str, batch_size: int):
+    """
+    (path, body, content_type, transactions) tuples for one mode.
+    """
+    if mode == "predict":
+        return [("/predict", json.dumps(p).encode(), "application/json", 1) for p in payloads]
+    return [
+        (
+            "/predict_batch",
+            "\n".join(json.dumps(p) for p in payloads[start:start + batch_size]).encode(),
+            "application/x-ndjson",
+            len(payloads[start:start + batch_size]),
+        )
+        for start in range(0, len(payloads), batch_size)
+    ]
+
+
+def run_load(target, requests, num_requests: int, concurrency: int, rate: Optional[float]) -> Dict[str, Any]:
+    latencies = np.zeros(num_requests)
+    statuses: Dict[str, int] = {}
+    transactions = 0
+    counter = itertools.count()
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def worker():
+        nonlocal transactions
+        while True:
+            i = next(counter)
+            if i >= num_requests:
+                return
+            path, body, content_type, n_tx = requests[i % len(requests)]
+            due = start + i / rate if rate else time.perf_counter()
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                status, content = target.post(path, body, content_type)
+                status = str(status)
+                if status == "200" and path == "/predict_batch" and content.count(b"\n") != n_tx:
+                    status = "incomplete"
+            except Exception as e:
+                status = type(e).__name__
+            latencies[i] = time.perf_counter() - due
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == "200":
+                    transactions += n_tx
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    errors = num_requests - statuses.get("200", 0)
+    latency_ms = latencies * 1000.0
+    return {
+        "requests": num_requests,
+        "transactions": transactions,
+        "errors": errors,
+        "error_rate": errors / num_requests,
+        "status_counts": statuses,
+        "duration_s": round(elapsed, 3),
+        "requests_per_s": round(num_requests / elapsed, 2),
+        "transactions_per_s": round(transactions / elapsed, 2),
+        "latency_ms": {
+            "mean": round(float(latency_ms.mean()), 3),
+            "p50": round(float(np.percentile(latency_ms, 50)), 3),
+            "p95": round(float(np.percentile(latency_ms, 95)), 3),
+            "p99": round(float(np.percentile(latency_ms, 99)), 3),
+            "max": round(float(latency_ms.max()), 3),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-path", default="credit_card_fraud_dataset.csv", help="CSV or .jsonl payload file")
+    parser.add_argument("--limit", type=int, default=2000, help="Read at most this many transactions")
+    parser.add_argument("--with-customer-id", action="store_true", help="Send CustomerID as customer_id (CSV only)")
+    parser.add_argument("--targets", nargs="+", default=["test-client"],
+                        help="'test-client' for in-process calls, or base URLs of running servers")
+    parser.add_argument("--modes", nargs="+", choices=("predict", "predict_batch"), default=["predict"])
+    parser.add_argument("--batch-size", type=int, default=64, help="Transactions per /predict_batch request")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--rate", type=float, default=None, help="Requests per second (default: as fast as possible)")
+    parser.add_argument("--requests", type=int, default=None,
+                        help="Requests per run (default: one pass over the transactions)")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests before each run")
+    parser.add_argument("--score-cache", choices=("on", "off"), default="off",
+                        help="Score cache of the in-process app; start HTTP servers with "
+                             "SCORE_CACHE_MAX_ENTRIES=0 to compare them without it")
+    parser.add_argument("--output", default=os.path.join("artifacts", "benchmarks", "serving_report.json"))
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.data_path, args.limit, args.with_customer_id)
+    if args.score_cache == "off":
+        # Read when the app module is imported by TestClientTarget.
+        os.environ["SCORE_CACHE_MAX_ENTRIES"] = "0"
+    runs = []
+    print(f"{'target':<24} {'mode':<14} {'conc':>4} {'req/s':>9} {'tx/s':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for target_name in args.targets:
+        target = TestClientTarget() if target_name == "test-client" else HttpTarget(target_name)
+        for mode in args.modes:
+            requests = build_requests(payloads, mode, args.batch_size)
+            num_requests = args.requests or len(requests)
+            for concurrency in args.concurrency:
+                run_load(target, requests, min(args.warmup, num_requests), concurrency, None)
+                result = run_load(target, requests, num_requests, concurrency, args.rate)
+                result.update({
+                    "target": target.name,
+                    "mode": mode,
+                    "concurrency": concurrency,
+                    "rate": args.rate,
+                    "batch_size": args.batch_size if mode == "predict_batch" else 1,
+                })
+                runs.append(result)
+                latency = result["latency_ms"]
+                print(f"{target.name[-24:]:<24} {mode:<14} {concurrency:>4} {result['requests_per_s']:>9.1f} "
+                      f"{result['transactions_per_s']:>9.1f} {latency['p50']:>8.2f} {latency['p95']:>8.2f} "
+                      f"{latency['p99']:>8.2f} {result['error_rate']:>7.2%}")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({
+            "data_path": args.data_path,
+            "transactions_loaded": len(payloads),
+            "cpu_count": os.cpu_count(),
+            "score_cache": args.score_cache,
+            "runs": runs,
+        }, f, indent=2)
+    print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
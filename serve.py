@@ -0,0 +1,63 @@
+"""
+Production entry point: load the models once, then fork the serving workers.
+
+The master loads the River and meta models and imports TensorFlow, and the
+forked workers share those pages copy-on-write. Customer histories and the
+score cache live in shared memory, so every worker sees the same state.
+Each worker then loads its own BiLSTM (TensorFlow cannot run before the
+fork) with its thread pools sized to its share of the CPUs, and serves on
+the shared port.
+
+Usage:
+    python serve.py                   # one worker per CPU on 0.0.0.0:5000
+    python serve.py --workers 4 --port 8000
+"""
+import os
+import shutil
+import argparse
+
+# Must be set before the app is imported; see app.PREFORK.
+os.environ["SERVING_PREFORK"] = "1"
+
+import app as serving_app
+from src.constants import APP_HOST, APP_PORT, SEQUENCE_STORE_SNAPSHOT_PATH, SERVING_WORKERS, WORKER_EXPORTS_DIR
+from src.serving.prefork import PreforkServer
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("APP_HOST", APP_HOST))
+    parser.add_argument("--port", type=int, default=int(os.getenv("APP_PORT", APP_PORT)))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SERVING_WORKERS", SERVING_WORKERS)),
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--tf-threads", type=int, default=None,
+                        help="TensorFlow threads per worker (default: CPUs / workers, at least 1)")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    workers = args.workers or cpus
+    tf_threads = args.tf_threads or max(1, cpus // workers)
+
+    serving_app.models.load_for_fork()
+    # Exports left by a previous run would show up as extra workers.
+    shutil.rmtree(WORKER_EXPORTS_DIR, ignore_errors=True)
+
+    def post_fork(worker_id: int) -> None:
+        from src.serving.inference import configure_threads
+
+        configure_threads(tf_threads)
+        serving_app.init_worker(worker_id, server)
+
+    server = PreforkServer(
+        serving_app.app,
+        args.host,
+        args.port,
+        workers,
+        post_fork=post_fork,
+        worker_exit=serving_app.shutdown_worker
+    )
+    try:
+        server.serve_forever()
+    finally:
+        # Histories live in shared memory, so the master sees every worker's appends.
+        serving_app.sequence_store.save(SEQUENCE_STORE_SNAPSHOT_PATH)
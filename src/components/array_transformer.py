@@ -0,0 +1,286 @@
+from operator import itemgetter
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src.components.hashing_encoder import hash_bucket, hashed_column
+
+
+OUTPUT_MODES = ("dict", "dense", "sparse")
+
+
+class ArrayTransformer:
+    """
+    Array-backed equivalent of the River TransformerUnion used by
+    `DataTransformer`: StandardScaler over the numeric fields, OneHotEncoder
+    over the categorical fields, `HashingEncoder` over the hashed fields and
+    an int cast of the boolean fields.
+
+    Running means/variances live in NumPy arrays and every category gets a
+    fixed column index when it is learned, so batches can be transformed
+    into dense or sparse matrices without building per-record dicts. Dense
+    and sparse rows follow `feature_names`: one-hot columns come last, so a
+    newly learned category appends a column and never moves existing ones,
+    and categories not learned yet encode as all zeros. With
+    `output="dict"`, `transform_one` returns exactly what the River union
+    returns (the seen-category zeros included), so it is a drop-in
+    replacement for `pipeline.pkl`.
+    """
+
+    def __init__(
+        self,
+        numeric_fields: Sequence[str],
+        categorical_fields: Sequence[str],
+        boolean_fields: Sequence[str],
+        output: str = "dict",
+        hashed_fields: Optional[Mapping[str, int]] = None,
+        signed_hashing: bool = True,
+        hash_seed: int = 0
+    ):
+        if output not in OUTPUT_MODES:
+            raise ValueError(f"output must be one of {OUTPUT_MODES}, got {output!r}")
+        self.numeric_fields = tuple(numeric_fields)
+        self.categorical_fields = tuple(categorical_fields)
+        self.boolean_fields = tuple(boolean_fields)
+        self.output = output
+        self.hashed_fields = dict(hashed_fields or {})
+        self.signed_hashing = signed_hashing
+        self.hash_seed = hash_seed
+
+        # Hashed fields own a fixed block of columns: field -> first column of its block.
+        self.hash_offsets: Dict[str, int] = {}
+        self.hash_names: List[str] = []
+        for field, n_buckets in self.hashed_fields.items():
+            self.hash_offsets[field] = len(self.hash_names)
+            self.hash_names.extend(hashed_column(field, bucket) for bucket in range(n_buckets))
+
+        n_numeric = len(self.numeric_fields)
+        self.counts = np.zeros(n_numeric, dtype=np.int64)
+        self.means = np.zeros(n_numeric, dtype=np.float64)
+        self.vars = np.zeros(n_numeric, dtype=np.float64)
+
+        # field -> {value: one-hot column}; columns are numbered in learned order.
+        self.categories: Dict[str, Dict[Hashable, int]] = {field: {} for field in self.categorical_fields}
+        self.category_names: List[str] = []
+        self._zero_dict: Dict[str, int] = {}
+
+    # ---------------------------------------------------------------- state
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_numeric_getter", None)
+        return state
+
+    @property
+    def _getter(self):
+        # itemgetter is rebuilt lazily so pickles do not depend on it.
+        getter = self.__dict__.get("_numeric_getter")
+        if getter is None:
+            getter = itemgetter(*self.numeric_fields)
+            if len(self.numeric_fields) == 1:
+                single = getter
+                getter = lambda x: (single(x),)
+            self.__dict__["_numeric_getter"] = getter
+        return getter
+
+    def _add_category(self, field: str, value: Hashable) -> None:
+        name = f"{field}_{value}"
+        self.categories[field][value] = len(self.category_names)
+        self.category_names.append(name)
+        self._zero_dict[name] = 0
+
+    @property
+    def feature_names(self) -> List[str]:
+        """
+        Dense/sparse output columns for the current fitted state, in order.
+        """
+        return list(self.boolean_fields) + self.hash_names + list(self.numeric_fields) + self.category_names
+
+    def _hash(self, field: str, value: Hashable):
+        return hash_bucket(field, value, self.hashed_fields[field], self.hash_seed, self.signed_hashing)
+
+    def _scale(self, values: np.ndarray) -> np.ndarray:
+        # Same expression as River: (x - mean) / var ** 0.5, or 0 while the variance is 0.
+        # The std is taken with Python's ** (libm pow), which can differ from
+        # np.sqrt in the last bit, to keep outputs bit-identical to River.
+        stds = np.array([var ** 0.5 for var in self.vars.tolist()], dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scaled = (values - self.means) / stds
+        return np.where(self.vars != 0, scaled, 0.0)
+
+    # ---------------------------------------------------------- one record
+
+    def learn_one(self, x: Mapping[str, Any]) -> None:
+        values = np.array(self._getter(x), dtype=np.float64)
+        self.counts += 1
+        old_means = self.means.copy()
+        self.means += (values - old_means) / self.counts
+        self.vars += ((values - old_means) * (values - self.means) - self.vars) / self.counts
+
+        for field in self.categorical_fields:
+            value = x[field]
+            if value not in self.categories[field]:
+                self._add_category(field, value)
+
+    def transform_one(self, x: Mapping[str, Any]) -> Union[Dict[str, Any], np.ndarray]:
+        scaled = self._scale(np.array(self._getter(x), dtype=np.float64))
+
+        if self.output != "dict":
+            n_bool, n_hash = len(self.boolean_fields), len(self.hash_names)
+            start = n_bool + n_hash + len(scaled)
+            row = np.zeros(start + len(self.category_names), dtype=np.float64)
+            row[:n_bool] = [int(x[field]) for field in self.boolean_fields]
+            for field, offset in self.hash_offsets.items():
+                bucket, weight = self._hash(field, x[field])
+                row[n_bool + offset + bucket] = weight
+            row[n_bool + n_hash:start] = scaled
+            for field in self.categorical_fields:
+                column = self.categories[field].get(x[field])
+                if column is not None:
+                    row[start + column] = 1.0
+            return row
+
+        result = {field: int(x[field]) for field in self.boolean_fields}
+        for field in self.hashed_fields:
+            bucket, weight = self._hash(field, x[field])
+            result[hashed_column(field, bucket)] = weight
+        one_hot = self._zero_dict.copy()
+        for field in self.categorical_fields:
+            one_hot[f"{field}_{x[field]}"] = 1
+        result.update(one_hot)
+        result.update(zip(self.numeric_fields, scaled.tolist()))
+        return result
+
+    # ------------------------------------------------------------- batches
+
+    @staticmethod
+    def _as_frame(X: Union[pd.DataFrame, Mapping[str, Sequence[Any]]]) -> pd.DataFrame:
+        return X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+
+    def learn_many(self, X: Union[pd.DataFrame, Mapping[str, Sequence[Any]]]) -> None:
+        """
+        Update the statistics with a whole batch (Chan et al. merge of the
+        batch mean/variance into the running ones) and register new categories.
+        """
+        X = self._as_frame(X)
+        if len(X) == 0:
+            return
+
+        values = X[list(self.numeric_fields)].to_numpy(dtype=np.float64)
+        n_a, n_b = self.counts, len(values)
+        n = n_a + n_b
+        batch_means = values.mean(axis=0)
+        batch_vars = values.var(axis=0)
+        delta = batch_means - self.means
+        self.vars = (self.vars * n_a + batch_vars * n_b + delta ** 2 * n_a * n_b / n) / n
+        self.means = self.means + delta * n_b / n
+        self.counts = n
+
+        for field in self.categorical_fields:
+            known = self.categories[field]
+            for value in pd.unique(X[field].to_numpy()):
+                if value not in known:
+                    self._add_category(field, value)
+
+    @staticmethod
+    def _sparse_block(columns, weights, n_rows: int, n_columns: int) -> sparse.csr_matrix:
+        """
+        CSR block with `weights[i][r]` at (r, `columns[i][r]`); negative columns are skipped.
+        """
+        rows = np.tile(np.arange(n_rows), len(columns))
+        cols = np.concatenate(columns) if columns else np.empty(0, dtype=np.int64)
+        data = np.concatenate(weights) if weights else np.empty(0)
+        keep = cols >= 0
+        return sparse.csr_matrix((data[keep], (rows[keep], cols[keep])), shape=(n_rows, n_columns))
+
+    def transform_many(self, X: Union[pd.DataFrame, Mapping[str, Sequence[Any]]]) -> pd.DataFrame:
+        """
+        Transform a batch with the current statistics. Columns follow
+        `feature_names`; categories not learned yet encode as all zeros.
+        `output="sparse"` returns a pandas sparse frame.
+        """
+        X = self._as_frame(X)
+        n_rows = len(X)
+
+        hash_cols, hash_weights = [], []
+        for field, offset in self.hash_offsets.items():
+            values = X[field].astype(object)
+            buckets = {value: self._hash(field, value) for value in pd.unique(values.to_numpy())}
+            hash_cols.append(values.map({value: offset + b for value, (b, _) in buckets.items()}).to_numpy(dtype=np.int64))
+            hash_weights.append(values.map({value: w for value, (_, w) in buckets.items()}).to_numpy(dtype=np.float64))
+        # Categories not learned yet map to column -1, which `_sparse_block` skips.
+        category_cols = [
+            X[field].astype(object).map(self.categories[field]).fillna(-1).to_numpy(dtype=np.int64)
+            for field in self.categorical_fields
+        ]
+
+        n_bool = len(self.boolean_fields)
+        booleans = X[list(self.boolean_fields)].to_numpy(dtype=np.float64) if n_bool else np.empty((n_rows, 0))
+        scaled = self._scale(X[list(self.numeric_fields)].to_numpy(dtype=np.float64))
+        blocks = [
+            sparse.csr_matrix(booleans),
+            self._sparse_block(hash_cols, hash_weights, n_rows, len(self.hash_names)),
+            sparse.csr_matrix(scaled),
+            self._sparse_block(category_cols, [np.ones(n_rows)] * len(category_cols), n_rows, len(self.category_names)),
+        ]
+
+        columns = self.feature_names
+        if self.output == "sparse":
+            # Built column by column: DataFrame.sparse.from_spmatrix fills with NaN on newer pandas.
+            matrix = sparse.hstack(blocks, format="csc")
+            frame = pd.DataFrame(
+                {j: pd.arrays.SparseArray.from_spmatrix(matrix[:, [j]]) for j in range(matrix.shape[1])},
+                index=X.index
+            )
+            frame.columns = columns
+            return frame
+
+        matrix = np.hstack([booleans, blocks[1].toarray(), scaled, blocks[3].toarray()])
+        return pd.DataFrame(matrix, index=X.index, columns=columns)
+
+    # -------------------------------------------------------------- River
+
+    @classmethod
+    def from_river(cls, union, output: str = "dict") -> "ArrayTransformer":
+        """
+        Warm-start from a fitted River union as built by `DataTransformer`
+        (e.g. an existing pipeline.pkl), keeping its statistics and categories.
+        """
+        from river.preprocessing import StandardScaler, OneHotEncoder
+        from river import compose
+        from src.components.hashing_encoder import HashingEncoder
+
+        numeric, categorical, boolean = [], [], []
+        scaler = encoder = hasher = None
+        for pipeline in union.transformers.values():
+            steps = list(pipeline.steps.values())
+            select, last = steps[0], steps[-1]
+            if isinstance(last, StandardScaler):
+                numeric, scaler = sorted(select.keys), last
+            elif isinstance(last, OneHotEncoder):
+                categorical, encoder = sorted(select.keys), last
+            elif isinstance(last, HashingEncoder):
+                hasher = last
+            elif isinstance(last, compose.FuncTransformer):
+                boolean = sorted(select.keys)
+
+        hashing = {} if hasher is None else {
+            "hashed_fields": hasher.buckets, "signed_hashing": hasher.signed, "hash_seed": hasher.seed
+        }
+        transformer = cls(numeric, categorical, boolean, output=output, **hashing)
+        if scaler is not None:
+            transformer.counts = np.array([scaler.counts[f] for f in numeric], dtype=np.int64)
+            transformer.means = np.array([scaler.means[f] for f in numeric], dtype=np.float64)
+            transformer.vars = np.array([scaler.vars[f] for f in numeric], dtype=np.float64)
+        if encoder is not None:
+            # River's zero dict preserves first-seen order across fields.
+            by_name = {
+                f"{field}_{value}": (field, value)
+                for field, values in encoder.values.items() for value in values
+            }
+            for name in encoder._zero_dict:
+                field, value = by_name[name]
+                transformer._add_category(field, value)
+        return transformer
@@ -6,6 +6,7 @@ from src.entity.artifact_entity import DataIngestionArtifact
 from src.exception import MyException
 from src.logger import logging
 from src.data_access.credit_data import CreditData
+from src.data_access.feature_store import FeatureStore
 
 
 class DataIngestion:
@@ -18,12 +19,41 @@ class DataIngestion:
     def stream_data_from_mongo(self) -> Iterator[Tuple[Dict[str, Any], int]]:
         """
         Streams MongoDB documents one-by-one as (x, y) tuples for River.
+        In "parallel" read mode the collection is read by several cursors at
+        once, so records no longer arrive in insertion order.
         """
         try:
             logging.info("Streaming data from MongoDB collection for River model")
+            config = self.data_ingestion_config
             credit_data = CreditData()
-            return credit_data.stream_collection_as_dict(self.data_ingestion_config.collection_name)
+            if config.read_mode == "parallel":
+                batches = credit_data.stream_collection_in_batches(
+                    config.collection_name,
+                    batch_size=config.batch_size,
+                    num_partitions=config.num_partitions
+                )
+                return (record for batch in batches for record in batch)
+            return credit_data.stream_collection_as_dict(
+                config.collection_name, batch_size=config.batch_size
+            )
+
+        except Exception as e:
+            raise MyException(e, sys)
 
+    def sync_feature_store(self) -> FeatureStore:
+        """
+        Bring the local feature store up to date with the collection: only
+        documents past the stored watermark are pulled when incremental.
+        """
+        try:
+            config = self.data_ingestion_config
+            feature_store = FeatureStore(config.feature_store_file_path)
+            feature_store.sync(
+                config.collection_name,
+                incremental=config.incremental,
+                batch_size=config.batch_size
+            )
+            return feature_store
         except Exception as e:
             raise MyException(e, sys)
 
@@ -31,11 +61,17 @@ class DataIngestion:
         logging.info("Initiating River-style streaming data ingestion")
 
         try:
-            data_stream = self.stream_data_from_mongo()
+            feature_store_file_path = ""
+            if self.data_ingestion_config.use_feature_store:
+                feature_store = self.sync_feature_store()
+                feature_store_file_path = feature_store.root_dir
+                data_stream = feature_store.iter_records()
+            else:
+                data_stream = self.stream_data_from_mongo()
 
             data_ingestion_artifact = DataIngestionArtifact(
                 data_stream=data_stream,
-                feature_store_file_path="",          
+                feature_store_file_path=feature_store_file_path,
                 train_file_path="",                  
                 test_file_path="",                   
                 streaming_data_generator=data_stream
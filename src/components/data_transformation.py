@@ -1,11 +1,14 @@
 import os
 import sys
 import pickle
-from typing import Tuple, Iterator, Dict, Any
+from typing import Tuple, Iterator, Dict, Any, Union, Sequence
 
+import yaml
 from river import compose
 from river.preprocessing import StandardScaler, OneHotEncoder
 
+from src.components.array_transformer import ArrayTransformer
+from src.components.hashing_encoder import HashingEncoder, hash_bucket
 from src.entity.config_entity import DataTransformationConfig
 from src.entity.artifact_entity import DataValidationArtifact, DataTransformationArtifact
 from src.logger import logging
@@ -17,6 +20,43 @@ def bool_to_int_dict(d: Dict[str, Any]) -> Dict[str, int]:
     return {k: int(v) for k, v in d.items()}
 
 
+class EncodingStats:
+    """
+    Distinct values per categorical field and output size over one run.
+    The values are only kept for the report, never in the pickled pipeline.
+
+    At most `max_distinct` values are kept per field; a field that reaches
+    the cap stops being tracked and is reported as "<cap>+". Output bytes
+    are measured on every `sample_every`-th record and scaled up.
+    """
+
+    def __init__(self, categorical_fields: Sequence[str], max_distinct: int = 10000, sample_every: int = 100):
+        self.max_distinct = max_distinct
+        self.sample_every = max(1, sample_every)
+        self.distinct = {field: set() for field in categorical_fields}
+        self._open = list(self.distinct.items())
+        self.records = 0
+        self.output_features = 0
+        self.sampled_records = 0
+        self.sampled_bytes = 0
+
+    def observe(self, features: Dict[str, Any], transformed) -> None:
+        if self._open:
+            for field, values in self._open:
+                values.add(features.get(field))
+            if any(len(values) >= self.max_distinct for _, values in self._open):
+                self._open = [(f, v) for f, v in self._open if len(v) < self.max_distinct]
+        if self.records % self.sample_every == 0:
+            self.sampled_records += 1
+            self.sampled_bytes += sys.getsizeof(transformed)
+        self.records += 1
+        self.output_features += len(transformed)
+
+    def distinct_count(self, field: str) -> Union[int, str]:
+        count = len(self.distinct[field])
+        return f"{count}+" if count >= self.max_distinct else count
+
+
 class DataTransformer:
     def __init__(self, config: DataTransformationConfig):
         self.config = config
@@ -50,41 +90,126 @@ class DataTransformer:
             "IsNewDevice"
         ]
 
-       
-        numeric_pipeline = compose.Select(*self.numeric_fields) | StandardScaler()
-        categorical_pipeline = compose.Select(*self.categorical_fields) | OneHotEncoder()
-        boolean_pipeline = compose.Select(*self.boolean_fields) | compose.FuncTransformer(bool_to_int_dict)
+        try:
+            unknown = set(self.config.hashed_fields) - set(self.categorical_fields)
+            if unknown:
+                raise ValueError(f"Hashed fields must be categorical fields: {sorted(unknown)}")
+        except Exception as e:
+            raise MyException(e, sys)
 
-        
-        self.pipeline = compose.TransformerUnion(
-            numeric_pipeline,
-            categorical_pipeline,
-            boolean_pipeline
-        )
+        # High-cardinality fields are hashed into a fixed number of buckets instead of one-hot encoded.
+        self.hashed_fields = {field: int(n) for field, n in self.config.hashed_fields.items()}
+        self.one_hot_fields = [field for field in self.categorical_fields if field not in self.hashed_fields]
+
+        if self.config.engine == "array":
+            self.pipeline = ArrayTransformer(
+                self.numeric_fields,
+                self.one_hot_fields,
+                self.boolean_fields,
+                output=self.config.output,
+                hashed_fields=self.hashed_fields,
+                signed_hashing=self.config.signed_hashing,
+                hash_seed=self.config.hash_seed
+            )
+            return
+
+        pipelines = [compose.Select(*self.numeric_fields) | StandardScaler()]
+        if self.one_hot_fields:
+            pipelines.append(compose.Select(*self.one_hot_fields) | OneHotEncoder())
+        if self.hashed_fields:
+            pipelines.append(
+                compose.Select(*self.hashed_fields)
+                | HashingEncoder(self.hashed_fields, signed=self.config.signed_hashing, seed=self.config.hash_seed)
+            )
+        pipelines.append(compose.Select(*self.boolean_fields) | compose.FuncTransformer(bool_to_int_dict))
+
+        self.pipeline = compose.TransformerUnion(*pipelines)
+
+    def encoding_report(self, stats: EncodingStats) -> Dict[str, Any]:
+        """
+        Distinct categories per field, the columns each field produces and
+        the resulting per-record and pipeline memory footprint. For a field
+        past the distinct-value cap, `columns` is a lower bound.
+        """
+        fields = {}
+        for field, values in stats.distinct.items():
+            if field in self.hashed_fields:
+                n_buckets = self.hashed_fields[field]
+                used = {hash_bucket(field, value, n_buckets, self.config.hash_seed)[0] for value in values}
+                fields[field] = {
+                    "encoding": "hashed",
+                    "distinct_values": stats.distinct_count(field),
+                    "columns": n_buckets,
+                    "buckets_used": len(used),
+                }
+            else:
+                fields[field] = {
+                    "encoding": "one_hot",
+                    "distinct_values": stats.distinct_count(field),
+                    "columns": len(values),
+                }
+
+        records = max(stats.records, 1)
+        return {
+            "records": stats.records,
+            "fields": fields,
+            "output_columns": len(self.numeric_fields) + len(self.boolean_fields)
+            + sum(spec["columns"] for spec in fields.values()),
+            "mean_features_per_record": round(stats.output_features / records, 2),
+            "mean_record_bytes": round(stats.sampled_bytes / max(stats.sampled_records, 1), 2),
+            "pipeline_bytes": len(pickle.dumps(self.pipeline)),
+        }
+
+    def _save_pipeline(self) -> None:
+        with open(self.config.pipeline_path, "wb") as f:
+            pickle.dump(self.pipeline, f)
+        logging.info(f"Transformation pipeline saved at: {self.config.pipeline_path}")
+
+    def _write_report(self, stats: EncodingStats) -> None:
+        report = self.encoding_report(stats)
+        os.makedirs(os.path.dirname(self.config.report_file_path), exist_ok=True)
+        with open(self.config.report_file_path, "w") as f:
+            yaml.safe_dump(report, f, sort_keys=False)
+        logging.info(f"Encoding report: {report}")
 
     def fit_transform_stream(
         self, validated_stream: Iterator[Tuple[Dict[str, Any], int]]
-    ) -> Tuple[Iterator[Tuple[Dict[str, float], int]], compose.TransformerUnion]:
+    ) -> Tuple[Iterator[Tuple[Dict[str, float], int]], Union[compose.TransformerUnion, ArrayTransformer]]:
         """
         Applies transformation pipeline (scaling + encoding).
         """
         try:
             logging.info("Applying transformation pipeline (numeric scaling + categorical encoding...")
 
-            def transformed_generator():
-                for features, label in validated_stream:
-                    try:
-                        if not isinstance(features, dict):
-                            raise ValueError("Features must be a dict.")
-
-                        transformed = self.pipeline.transform_one(features)
-                        self.pipeline.learn_one(features)
-
-                        yield transformed, label
+            stats = None
+            if self.config.encoding_report:
+                stats = EncodingStats(
+                    self.categorical_fields,
+                    max_distinct=self.config.report_max_distinct,
+                    sample_every=self.config.report_sample_every
+                )
 
-                    except Exception as e:
-                        logging.error(f"Error processing sample in transformation: {e}")
-                        continue
+            def transformed_generator():
+                try:
+                    for features, label in validated_stream:
+                        try:
+                            if not isinstance(features, dict):
+                                raise ValueError("Features must be a dict.")
+
+                            transformed = self.pipeline.transform_one(features)
+                            self.pipeline.learn_one(features)
+                            if stats is not None:
+                                stats.observe(features, transformed)
+
+                            yield transformed, label
+
+                        except Exception as e:
+                            logging.error(f"Error processing sample in transformation: {e}")
+                            continue
+                finally:
+                    self._save_pipeline()
+                    if stats is not None:
+                        self._write_report(stats)
 
             return transformed_generator(), self.pipeline
 
@@ -95,23 +220,21 @@ class DataTransformer:
         self, validation_artifact: DataValidationArtifact
     ) -> DataTransformationArtifact:
         """
-        Executes transformation and saves pipeline.
+        Executes transformation. The pipeline is learned while the stream is
+        consumed, so it is saved (with the encoding report, if enabled) once
+        the stream ends.
         """
         try:
             logging.info("Starting data transformation...")
 
-            transformed_stream, pipeline = self.fit_transform_stream(
+            transformed_stream, _ = self.fit_transform_stream(
                 validation_artifact.validated_stream
             )
 
-            
-            with open(self.config.pipeline_path, "wb") as f:
-                pickle.dump(pipeline, f)
-                logging.info(f"Transformation pipeline saved at: {self.config.pipeline_path}")
-
             artifact = DataTransformationArtifact(
                 transformed_stream=transformed_stream,
-                pipeline_path=self.config.pipeline_path
+                pipeline_path=self.config.pipeline_path,
+                report_file_path=self.config.report_file_path if self.config.encoding_report else None
             )
 
             logging.info("Data transformation completed.")
@@ -1,99 +1,375 @@
 import os
 import sys
-import hashlib
+import csv
+import json
 import math
-from typing import Dict, Iterator, Tuple, Any
+import numbers
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Any, Union
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from src.constants import SCHEMA_FILE_PATH
 from src.entity.artifact_entity import DataValidationArtifact
 from src.entity.config_entity import DataValidationConfig
 from src.exception import MyException
 from src.logger import logging
+from src.utils.common import read_yaml
+
+
+Checker = Callable[[Any], Optional[str]]
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _is_int(value) -> bool:
+    if isinstance(value, float):
+        # CSV int columns with gaps are read as floats; keep the whole values.
+        return value.is_integer()
+    return isinstance(value, numbers.Integral) and not isinstance(value, (bool, np.bool_))
+
+
+def _is_float(value) -> bool:
+    return isinstance(value, numbers.Real) and not isinstance(value, (bool, np.bool_))
+
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "int": _is_int,
+    "float": _is_float,
+    "bool": lambda value: isinstance(value, (bool, np.bool_)),
+    "str": lambda value: isinstance(value, str),
+}
+
+
+def compile_column_checker(spec: Dict[str, Any]) -> Checker:
+    """
+    Build one checker per schema column. The checker returns the name of
+    the first failed rule ("type", "range", "domain") or None.
+    """
+    type_check = _TYPE_CHECKS[spec["type"]]
+    numeric = spec["type"] in ("int", "float")
+    low = spec.get("min", -math.inf)
+    high = spec.get("max", math.inf)
+    allowed = frozenset(spec["allowed"]) if "allowed" in spec else None
+
+    def check(value) -> Optional[str]:
+        if not type_check(value):
+            return "type"
+        if numeric and not (low <= value <= high):
+            return "range"
+        if allowed is not None and value not in allowed:
+            return "domain"
+        return None
+
+    return check
+
+
+def _type_mask(values: np.ndarray, type_name: str) -> np.ndarray:
+    """
+    Rows whose value has the schema type, decided from the dtype when the
+    column is homogeneous and per value only for mixed object columns.
+    """
+    kind = values.dtype.kind
+    if (type_name == "bool" and kind == "b") or (type_name == "float" and kind in "iuf") \
+            or (type_name == "int" and kind in "iu"):
+        return np.ones(len(values), dtype=bool)
+    if type_name == "int" and kind == "f":
+        return np.isnan(values) | (np.mod(values, 1) == 0)
+    if type_name == "str" and (kind in "UT" or (
+            kind == "O" and pd.api.types.infer_dtype(values, skipna=True) in ("string", "empty"))):
+        return np.ones(len(values), dtype=bool)
+    if kind == "O":
+        type_check = _TYPE_CHECKS[type_name]
+        return np.fromiter((type_check(value) for value in values), dtype=bool, count=len(values))
+    return np.zeros(len(values), dtype=bool)
+
+
+@dataclass
+class BatchValidationResult:
+    """
+    `mask` marks the valid rows. `failures` counts every violation per
+    "<column>:<rule>", so one row may be counted under several rules.
+    """
+    mask: np.ndarray
+    failures: Dict[str, int]
+    null_rates: Dict[str, float]
+
+    @property
+    def valid_records(self) -> int:
+        return int(self.mask.sum())
+
+    @property
+    def invalid_records(self) -> int:
+        return len(self.mask) - self.valid_records
+
+
+class BatchValidator:
+    """
+    Vectorized counterpart of `DataValidation.check` for columnar blocks
+    (a DataFrame or a dict of NumPy arrays): the same schema rules, applied
+    as one boolean mask per column and rule.
+    """
+
+    def __init__(self, schema: Dict[str, Any]):
+        self.columns: Dict[str, Dict[str, Any]] = schema["columns"]
+        self.label_name: str = schema["label"]["name"]
+        self.label_domain = list(schema["label"]["allowed"])
+
+    @classmethod
+    def from_yaml(cls, schema_file_path: str = SCHEMA_FILE_PATH) -> "BatchValidator":
+        return cls(read_yaml(schema_file_path))
+
+    def validate(
+        self,
+        block: Union[pd.DataFrame, Mapping[str, np.ndarray]],
+        labels: Optional[np.ndarray] = None
+    ) -> BatchValidationResult:
+        try:
+            if labels is None and self.label_name in block:
+                labels = block[self.label_name]
+            if labels is not None:
+                n_rows = len(labels)
+            elif isinstance(block, pd.DataFrame):
+                n_rows = len(block)
+            else:
+                n_rows = len(next(iter(block.values())))
+
+            mask = np.ones(n_rows, dtype=bool)
+            failures: Dict[str, int] = {}
+            null_rates: Dict[str, float] = {}
+
+            def fail(rule: str, violated: np.ndarray) -> None:
+                count = int(violated.sum())
+                if count:
+                    failures[rule] = failures.get(rule, 0) + count
+                    np.logical_and(mask, ~violated, out=mask)
+
+            if labels is not None:
+                labels = np.asarray(labels)
+                label_ok = _type_mask(labels, "int") \
+                    & pd.Series(labels, copy=False).isin(self.label_domain).to_numpy()
+                fail("label:domain", ~label_ok)
+
+            for name, spec in self.columns.items():
+                if name not in block:
+                    null_rates[name] = 1.0
+                    if spec.get("required", True):
+                        fail(f"{name}:missing", np.ones(n_rows, dtype=bool))
+                    continue
+
+                values = np.asarray(block[name])
+                null = pd.isna(values)
+                null_rates[name] = float(null.mean()) if n_rows else 0.0
+                if spec.get("required", True):
+                    fail(f"{name}:missing", null)
+
+                present = ~null
+                type_ok = _type_mask(values, spec["type"]) & present
+                fail(f"{name}:type", present & ~type_ok)
+
+                if spec["type"] in ("int", "float") and ("min" in spec or "max" in spec):
+                    numeric = np.where(type_ok, values, 0).astype(np.float64)
+                    in_range = (numeric >= spec.get("min", -math.inf)) & (numeric <= spec.get("max", math.inf))
+                    fail(f"{name}:range", type_ok & ~in_range)
+
+                if "allowed" in spec:
+                    in_domain = pd.Series(values, copy=False).isin(spec["allowed"]).to_numpy()
+                    fail(f"{name}:domain", type_ok & ~in_domain)
+
+            return BatchValidationResult(mask=mask, failures=failures, null_rates=null_rates)
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+
+@dataclass
+class ValidationReport:
+    """
+    Running counts for one validated stream; `finalized` is set once the
+    stream has been consumed and the report written.
+    """
+    valid_records: int = 0
+    invalid_records: int = 0
+    failures: Dict[str, int] = field(default_factory=dict)
+    finalized: bool = False
+
+    @property
+    def total_records(self) -> int:
+        return self.valid_records + self.invalid_records
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "valid_records": self.valid_records,
+            "invalid_records": self.invalid_records,
+            "total_records": self.total_records,
+            "failures": dict(sorted(self.failures.items())),
+            "finalized": self.finalized,
+        }
+
+
+class InvalidRecordLog:
+    """
+    Appends rejected records to a CSV in batches of `buffer_size` rows.
+    """
+
+    def __init__(self, file_path: str, buffer_size: int = 1000):
+        self.file_path = file_path
+        self.buffer_size = buffer_size
+        self._buffer: List[List[Any]] = []
+        self._started = False
+
+    def add(self, reason: str, x: Any, y: Any) -> None:
+        self._buffer.append([reason, y, json.dumps(x, default=str)])
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer and self._started:
+            return
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+        with open(self.file_path, "a" if self._started else "w", newline="") as f:
+            writer = csv.writer(f)
+            if not self._started:
+                writer.writerow(["reason", "label", "record"])
+                self._started = True
+            writer.writerows(self._buffer)
+        self._buffer = []
+
 
 class DataValidation:
     def __init__(self,data_validation_config, ingestion_artifact):
           self.data_validation_config = data_validation_config
           self.ingestion_artifact = ingestion_artifact
 
+          schema = read_yaml(data_validation_config.schema_file_path)
+          self.batch_validator = BatchValidator(schema)
+          self.label_domain = frozenset(schema["label"]["allowed"])
+          self.required_columns = [
+              name for name, spec in schema["columns"].items() if spec.get("required", True)
+          ]
+          self.checkers: Dict[str, Checker] = {
+              name: compile_column_checker(spec) for name, spec in schema["columns"].items()
+          }
+
 
     def initiate_data_validation(self):
         """
-        Runs data validation and returns a DataValidationArtifact.
-        This is a placeholder function. You should implement actual validation logic here.
+        Returns a DataValidationArtifact pointing at the schema and the
+        report written once a validated stream has been consumed. Nothing
+        is validated here; see `run_validation`.
+        """
+        report_file_path = self.data_validation_config.report_file_path
+        return DataValidationArtifact(
+            schema_file_path=self.data_validation_config.schema_file_path,
+            report_file_path=report_file_path,
+            report_page_file_path=report_file_path
+        )
+
+
+    def check(self, x_y: Tuple[Dict[str, Any], int]) -> Optional[str]:
+        """
+        Return the first failed rule as "<column>:<rule>", or None if valid.
         """
-        # Example: you might validate schema, nulls, data types, etc.
-        # For now, let's create dummy artifact paths.
+        x, y = x_y
 
-        schema_file_path = "artifacts/schema/schema.yaml"
-        report_file_path = "artifacts/validation/report.yaml"
-        report_page_file_path = "artifacts/validation/report.html"
+        # Validate label
+        if not _is_int(y) or y not in self.label_domain:
+            return "label:domain"
 
-        # Log for clarity
-        print(f"[DataValidation] Validation completed. "
-              f"Schema: {schema_file_path}, Report: {report_file_path}")
+        for name in self.required_columns:
+            if _is_missing(x.get(name)):
+                return f"{name}:missing"
 
-        # Return the artifact
-        validation_artifact = DataValidationArtifact(
-            schema_file_path=schema_file_path,
-            report_file_path=report_file_path,
-            report_page_file_path=report_page_file_path
-        )
+        for name, value in x.items():
+            checker = self.checkers.get(name)
+            if checker is not None and not _is_missing(value):
+                failed = checker(value)
+                if failed is not None:
+                    return f"{name}:{failed}"
 
-        return validation_artifact      
-        
+        return None
 
     def is_valid(self, x_y: Tuple[Dict[str, Any], int]) -> bool:
         """
         Validate a single (features, label) tuple.
         """
         try:
-            x, y = x_y
-
-            # Validate label
-            if not isinstance(y, int) or y not in [0, 1]:
-                return False
+            return self.check(x_y) is None
+        except Exception as e:
+            raise MyException(e, sys)
 
-            # Optionally, validate fields in x
-            # For example:
-            if "Amount" not in x or not isinstance(x["Amount"], (int, float)):
-                return False
+    def validate_batch(
+        self,
+        block: Union[pd.DataFrame, Mapping[str, np.ndarray]],
+        labels: Optional[np.ndarray] = None
+    ) -> BatchValidationResult:
+        """
+        Validate a whole columnar block at once; see `BatchValidator`.
+        """
+        return self.batch_validator.validate(block, labels)
 
-            return True
+    def _write_report(self, report: ValidationReport) -> None:
+        report_file_path = self.data_validation_config.report_file_path
+        os.makedirs(os.path.dirname(report_file_path), exist_ok=True)
+        with open(report_file_path, "w") as f:
+            yaml.safe_dump(report.to_dict(), f, sort_keys=False)
 
+    def _validated(
+        self,
+        data_stream: Iterator[Tuple[Dict[str, Any], int]],
+        report: ValidationReport,
+        invalid_log: InvalidRecordLog
+    ) -> Iterator[Tuple[Dict[str, Any], int]]:
+        try:
+            for x_y in data_stream:
+                failed = self.check(x_y)
+                if failed is None:
+                    report.valid_records += 1
+                    yield x_y
+                else:
+                    report.invalid_records += 1
+                    report.failures[failed] = report.failures.get(failed, 0) + 1
+                    invalid_log.add(failed, *x_y)
+            report.finalized = True
         except Exception as e:
             raise MyException(e, sys)
+        finally:
+            invalid_log.flush()
+            self._write_report(report)
+            if report.finalized:
+                logging.info(
+                    f"Data validation completed: {report.to_dict()}. "
+                    f"Report: {self.data_validation_config.report_file_path}"
+                )
+            else:
+                logging.info(f"Data validation stopped before the end of the stream: {report.to_dict()}")
 
     def validate_stream(
         self, data_stream: Iterator[Tuple[Dict[str, Any], int]]
-    ) -> Tuple[Iterator[Tuple[Dict[str, Any], int]], Dict[str, Any]]:
+    ) -> Tuple[Iterator[Tuple[Dict[str, Any], int]], ValidationReport]:
         """
-        Validates the incoming data stream and yields only valid records.
-        Also returns a validation report.
+        Lazily yields only valid records; nothing is buffered beyond the
+        invalid-record log batch. The returned report fills in as the stream
+        is consumed and is written to `report_file_path` when it ends.
         """
         try:
-            valid_count = 0
-            invalid_count = 0
-            validated_data = []
-
-            for x_y in data_stream:
-                if self.is_valid(x_y):
-                    validated_data.append(x_y)
-                    valid_count += 1
-                else:
-                    invalid_count += 1
-
-            report = {
-                "valid_records": valid_count,
-                "invalid_records": invalid_count,
-                "total_records": valid_count + invalid_count
-            }
-
-            return iter(validated_data), report
+            report = ValidationReport()
+            invalid_log = InvalidRecordLog(
+                self.data_validation_config.invalid_log_file_path,
+                self.data_validation_config.invalid_log_buffer_size
+            )
+            return self._validated(data_stream, report, invalid_log), report
 
         except Exception as e:
             raise MyException(e, sys)
 
     def run_validation(
         self, data_stream: Iterator[Tuple[Dict[str, Any], int]]
-    ) -> Tuple[Iterator[Tuple[Dict[str, Any], int]], Dict[str, Any]]:
+    ) -> Tuple[Iterator[Tuple[Dict[str, Any], int]], ValidationReport]:
         """
         Entry point to perform validation.
         """
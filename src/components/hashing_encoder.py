@@ -0,0 +1,42 @@
+from typing import Any, Dict, Mapping, Tuple
+
+from river import base
+from river.preprocessing.feature_hasher import feature_hash
+
+
+def hashed_column(field: str, bucket: int) -> str:
+    return f"{field}_h{bucket}"
+
+
+def hash_bucket(field: str, value: Any, n_buckets: int, seed: int, signed: bool = True) -> Tuple[int, int]:
+    """
+    (bucket, weight) for one categorical value: MurmurHash3 of "field=value",
+    the same token River's FeatureHasher uses. With `signed`, the weight is
+    -1 for half of the tokens so collisions tend to cancel out.
+    """
+    (bucket, weight), = feature_hash({field: str(value)}, n_buckets, seed, signed).items()
+    return bucket, weight
+
+
+class HashingEncoder(base.Transformer):
+    """
+    Feature hashing for high-cardinality categoricals. Each field maps to
+    its own `buckets[field]` columns named "<field>_h<bucket>", so the output
+    size stays fixed however many distinct values show up. Stateless: no
+    categories are stored, and `learn_one` is a no-op.
+    """
+
+    def __init__(self, buckets: Mapping[str, int], signed: bool = True, seed: int = 0):
+        self.buckets = dict(buckets)
+        self.signed = signed
+        self.seed = seed
+
+    def transform_one(self, x: Dict[str, Any]) -> Dict[str, int]:
+        out = {}
+        for field, n_buckets in self.buckets.items():
+            value = x.get(field)
+            if value is None:
+                continue
+            bucket, weight = hash_bucket(field, value, n_buckets, self.seed, self.signed)
+            out[hashed_column(field, bucket)] = weight
+        return out
@@ -1,6 +1,8 @@
 import os
 import sys
 import joblib
+import numpy as np
+import pandas as pd
 from typing import Iterator, Tuple, Dict, Any
 
 from river.linear_model import LogisticRegression as RiverLogisticRegression
@@ -33,12 +35,98 @@ class ModelTrainer:
         except Exception as e:
             raise MyException(e, sys)
 
+    @staticmethod
+    def _records_to_frame(records) -> pd.DataFrame:
+        """
+        Dense float frame from sparse feature dicts. One-hot keys vary a lot
+        between records, so filling a preallocated array is much cheaper than
+        letting pandas align every dict. Zero entries are dropped: they add
+        nothing to a linear model's prediction or gradient.
+        """
+        columns: Dict[str, int] = {}
+        entries = []
+        for row, features in enumerate(records):
+            for key, value in features.items():
+                if value:
+                    entries.append((row, columns.setdefault(key, len(columns)), value))
+
+        matrix = np.zeros((len(records), len(columns)))
+        if entries:
+            rows, cols, values = zip(*entries)
+            matrix[rows, cols] = values
+        return pd.DataFrame(matrix, columns=list(columns))
+
+    def load_batches(self) -> Iterator[Tuple[pd.DataFrame, pd.Series]]:
+        """
+        Generator yielding transformed samples grouped into DataFrames of
+        `mini_batch_size` rows. Features missing from a record are 0, as
+        River's linear models treat absent dict keys.
+        """
+        try:
+            batch_size = self.config.mini_batch_size
+            features_batch, labels_batch = [], []
+
+            for features, label in self.transformation_artifact.transformed_stream:
+                features_batch.append(features)
+                labels_batch.append(label)
+                if len(labels_batch) == batch_size:
+                    yield self._records_to_frame(features_batch), pd.Series(labels_batch)
+                    features_batch, labels_batch = [], []
+
+            if labels_batch:
+                yield self._records_to_frame(features_batch), pd.Series(labels_batch)
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def learn_stream(self, model, accuracy: Accuracy, report: ClassificationReport) -> int:
+        """
+        Progressive validation over the transformed stream: every sample is
+        predicted before the model learns from it. Returns samples seen.
+        """
+        seen = 0
+        mini_batch = (
+            self.config.learning_mode == "mini_batch"
+            and hasattr(model, "predict_many")
+            and hasattr(model, "learn_many")
+        )
+        if self.config.learning_mode == "mini_batch" and not mini_batch:
+            logging.warning(f"{type(model).__name__} has no predict_many/learn_many; learning per record.")
+
+        if mini_batch:
+            for X, y in self.load_batches():
+                try:
+                    y_pred = model.predict_many(X)
+                    for y_true, y_hat in zip(y.tolist(), y_pred.tolist()):
+                        accuracy.update(y_true, y_hat)
+                        report.update(y_true, y_hat)
+                    model.learn_many(X, y)
+                    seen += len(y)
+
+                except Exception as batch_error:
+                    logging.error(f"Error processing batch: {batch_error}")
+                    continue
+            return seen
+
+        for features, label in self.load_data():
+            try:
+                y_pred = model.predict_one(features)
+                accuracy.update(label, y_pred)
+                report.update(label, y_pred)
+                model.learn_one(features, label)
+                seen += 1
+
+            except Exception as sample_error:
+                logging.error(f"Error processing sample: {sample_error}")
+                continue
+        return seen
+
     def train_model(self) -> ModelTrainerArtifact:
         """
         Trains the River Logistic Regression model.
         """
         try:
-            logging.info(" Starting online model training...")
+            logging.info(f" Starting online model training ({self.config.learning_mode})...")
 
             # Initialize model and metrics
             model = RiverLogisticRegression(optimizer=SGD())
@@ -46,16 +134,7 @@ class ModelTrainer:
             report = ClassificationReport()
 
             # Process stream
-            for features, label in self.load_data():
-                try:
-                    y_pred = model.predict_one(features)
-                    accuracy.update(label, y_pred)
-                    report.update(label, y_pred)
-                    model.learn_one(features, label)
-
-                except Exception as sample_error:
-                    logging.error(f"Error processing sample: {sample_error}")
-                    continue
+            self.learn_stream(model, accuracy, report)
 
             final_accuracy = accuracy.get()
             logging.info(f" Training completed. Final Accuracy: {final_accuracy:.4f}")
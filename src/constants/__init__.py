@@ -9,6 +9,10 @@ MONGODB_URL_KEY = "MONGODB_URL_KEY"
 # ---------------------- Pipeline ----------------------
 PIPELINE_NAME = "smartfraudx_pipeline"
 ARTIFACT_DIR = "artifact"
+PIPELINE_EXECUTION_MODE = "pipelined"  # or "sequential"
+PIPELINE_QUEUE_SIZE = 8  # chunks buffered between two stages
+PIPELINE_CHUNK_SIZE = 256  # records per queued chunk
+PIPELINE_REPORT_FILE_NAME = "pipeline_report.yaml"
 
 # ---------------------- Model & Preprocessing ----------------------
 MODEL_FILE_NAME = "model.pkl"  # Generic usage
@@ -33,17 +37,37 @@ MODEL_PUSHER_S3_KEY = "model-registry"
 DATA_INGESTION_COLLECTION_NAME = COLLECTION_NAME
 DATA_INGESTION_DIR_NAME = "data_ingestion"
 DATA_INGESTION_FEATURE_STORE_DIR = "feature_store"
+DATA_INGESTION_READ_MODE = "stream"
+DATA_INGESTION_BATCH_SIZE = 5000
+DATA_INGESTION_NUM_PARTITIONS = 4
+DATA_INGESTION_USE_FEATURE_STORE = True
+DATA_INGESTION_INCREMENTAL = True
 
 # ---------------------- Data Validation ----------------------
 DATA_VALIDATION_DIR_NAME = "data_validation"
 DATA_VALIDATION_REPORT_FILE_NAME = "report.yaml"
 INVALID_RECORD_LOG_FILE = "invalid_records.csv"
+DATA_VALIDATION_INVALID_LOG_BUFFER_SIZE = 1000
 
 # ---------------------- Data Transformation ----------------------
 DATA_TRANSFORMATION_DIR_NAME = "data_transformation"
 DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR = "transformed"
 DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR = "transformed_object"
 PIPELINE_FILE_NAME = "pipeline.pkl"
+DATA_TRANSFORMATION_ENGINE = "river"  # "river" or "array"
+DATA_TRANSFORMATION_OUTPUT = "dict"  # array engine only: "dict", "dense" or "sparse"
+DATA_TRANSFORMATION_REPORT_FILE_NAME = "encoding_report.yaml"
+# Categorical fields to feature-hash instead of one-hot encode: field -> number of buckets,
+# e.g. {"GeoLocation": 256}. Empty keeps one-hot encoding for every field.
+DATA_TRANSFORMATION_HASHED_FIELDS = {}
+DATA_TRANSFORMATION_SIGNED_HASHING = True
+DATA_TRANSFORMATION_HASH_SEED = 42
+# The encoding report is opt-in: it watches every record's categorical values.
+DATA_TRANSFORMATION_ENCODING_REPORT = False
+# Distinct values kept per field; beyond this the report shows "<cap>+".
+DATA_TRANSFORMATION_REPORT_MAX_DISTINCT = 10000
+# Measure the size of one transformed record in this many.
+DATA_TRANSFORMATION_REPORT_SAMPLE_EVERY = 100
 
 
 # ---------------------- Model Trainer ----------------------
@@ -58,6 +82,20 @@ MODEL_TRAINER_MIN_SAMPLES_LEAF = 6
 MODEL_TRAINER_MAX_DEPTH = 10
 MODEL_TRAINER_CRITERION = 'entropy'
 MODEL_TRAINER_RANDOM_STATE = 101
+MODEL_TRAINER_LEARNING_MODE = "per_record"
+MODEL_TRAINER_MINI_BATCH_SIZE = 512
+
+# ---------------------- Multi-model Training ----------------------
+MULTI_MODEL_SNAPSHOT_DIR_NAME = "training_snapshot"
+MULTI_MODEL_REPORT_FILE_NAME = "training_report.yaml"
+# River model the meta stage scores with; it sees the 8 raw features, as in serving.
+# None trains one on this run's snapshot and publishes it to the serving path with the meta model.
+MULTI_MODEL_META_RIVER_MODEL_PATH = None
+MULTI_MODEL_META_RIVER_DIR_NAME = "meta_river"
+SERVING_RIVER_MODEL_PATH = os.path.join("artifact", "hk", "model_trainer", "model.pkl")
+MULTI_MODEL_MAX_WORKERS = 2
+# "in_sample" scores the meta dataset with the trained base models; "oof" uses out-of-fold models.
+MULTI_MODEL_META_STACKING = "in_sample"
 
 # ---------------------- Model Evaluation ----------------------
 MODEL_EVALUATION_CHANGED_THRESHOLD_SCORE = 0.02
@@ -65,3 +103,27 @@ MODEL_EVALUATION_CHANGED_THRESHOLD_SCORE = 0.02
 # ---------------------- App Config ----------------------
 APP_HOST = "0.0.0.0"
 APP_PORT = 5000
+
+# ---------------------- Serving ----------------------
+PREDICT_MAX_BATCH_SIZE = 32
+PREDICT_MAX_WAIT_MS = 2.0
+PREDICT_BATCH_CHUNK_SIZE = 1024
+SEQUENCE_STORE_MAX_MEMORY_MB = 64
+SEQUENCE_STORE_SNAPSHOT_PATH = os.path.join("artifacts", "serving", "sequence_store.npz")
+SEQUENCE_STORE_SNAPSHOT_INTERVAL_S = 60
+META_GRID_PATH = os.path.join("artifact", "meta_model_grid.npz")
+META_GRID_RESOLUTION = 257
+# "auto" serves the compiled grid when it exists and agreed with the meta model on at least
+# META_GRID_MIN_AGREEMENT of its validation labels; "grid" and "forest" force one or the other.
+META_SCORING_MODE = "auto"
+META_GRID_MIN_AGREEMENT = 0.99
+# Results of /predict for identical inputs are reused for SCORE_CACHE_TTL_S seconds; 0 entries disables.
+SCORE_CACHE_MAX_ENTRIES = 10000
+SCORE_CACHE_TTL_S = 30.0
+# Per-stage latency histograms and request counters, served at /metrics. Off: timers are no-ops.
+METRICS_ENABLED = True
+# Pre-forked worker processes for serve.py; 0 starts one per CPU.
+SERVING_WORKERS = 0
+# Pre-forked workers publish their metrics and batcher stats here so any worker can report all of them.
+WORKER_EXPORTS_DIR = os.path.join("artifacts", "serving", "workers")
+WORKER_EXPORTS_INTERVAL_S = 1.0
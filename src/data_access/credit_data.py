@@ -1,50 +1,199 @@
 import sys
-from typing import Iterator, Tuple, Dict, Any
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Tuple, Dict, Any, List, Union
+
+import numpy as np
 from pymongo.errors import PyMongoError
 
 from src.configuration.mongo_db_connection import MongoDBClient
 from src.constants import DATABASE_NAME
 from src.exception import MyException
+from src.logger import logging
+
+
+LABEL_FIELD = "IsFraud"
+# Projected out server-side, so they never cross the wire.
+EXCLUDED_FIELDS = ("_id", "Time")
+
+Record = Tuple[Dict[str, Any], int]
+ColumnBlock = Tuple[Dict[str, np.ndarray], np.ndarray]
 
 
 class CreditData:
-    def __init__(self) -> None:
+    def __init__(self, database=None) -> None:
         """
         Initialize MongoDB client connection.
+        Pass `database` (e.g. a mongomock database) to bypass MONGODB_URL_KEY.
         """
         try:
-            self.mongo_client = MongoDBClient(database_name=DATABASE_NAME)
+            self.mongo_client = None
+            if database is None:
+                self.mongo_client = MongoDBClient(database_name=DATABASE_NAME)
+                database = self.mongo_client.database
+            self.database = database
         except Exception as e:
             raise MyException(e, sys)
 
-    def stream_collection_as_dict(self, collection_name: str) -> Iterator[Tuple[Dict[str, Any], int]]:
+    @staticmethod
+    def _projection() -> Dict[str, int]:
+        return {field: 0 for field in EXCLUDED_FIELDS}
+
+    @staticmethod
+    def _split_label(doc: Dict[str, Any]) -> Record:
+        y = doc.pop(LABEL_FIELD)
+        return doc, y
+
+    def stream_collection_as_dict(
+        self, collection_name: str, batch_size: int = 100
+    ) -> Iterator[Record]:
         """
         Stream records from a MongoDB collection as (features_dict, label).
         Uses batch_size for stability. Handles timeout/cancellation gracefully.
         """
         try:
-            db = self.mongo_client.database
-            collection = db[collection_name]
+            collection = self.database[collection_name]
 
-            # Use batching to avoid timeouts on large collections
-            cursor = collection.find({}, batch_size=100)
+            # The server skips unlabelled documents and drops unused fields.
+            cursor = collection.find(
+                {LABEL_FIELD: {"$exists": True}}, self._projection(), batch_size=batch_size
+            )
 
             for doc in cursor:
-                # Ensure the target field exists
-                if "IsFraud" not in doc:
-                    continue
+                yield self._split_label(doc)
+
+        except PyMongoError as e:
+            raise MyException(f"MongoDB operation error: {e}", sys)
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def stream_collection_after(
+        self, collection_name: str, after_id: Any = None, batch_size: int = 5000
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Labelled documents with `_id` greater than `after_id`, in `_id` order,
+        as lists of up to `batch_size` raw documents (`_id` kept as watermark).
+        """
+        try:
+            collection = self.database[collection_name]
+            query = {LABEL_FIELD: {"$exists": True}}
+            if after_id is not None:
+                query["_id"] = {"$gt": after_id}
+            projection = {field: 0 for field in EXCLUDED_FIELDS if field != "_id"}
+
+            docs = []
+            for doc in collection.find(query, projection, batch_size=batch_size).sort("_id", 1):
+                docs.append(doc)
+                if len(docs) == batch_size:
+                    yield docs
+                    docs = []
+            if docs:
+                yield docs
+
+        except PyMongoError as e:
+            raise MyException(f"MongoDB operation error: {e}", sys)
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def _id_boundaries(self, collection, num_partitions: int) -> List[Any]:
+        """
+        `_id` values splitting the collection into roughly equal ranges.
+        """
+        total = collection.estimated_document_count()
+        boundaries = []
+        for i in range(1, num_partitions):
+            doc = next(
+                collection.find({}, {"_id": 1}).sort("_id", 1).skip(total * i // num_partitions).limit(1),
+                None
+            )
+            if doc is not None and (not boundaries or doc["_id"] != boundaries[-1]):
+                boundaries.append(doc["_id"])
+        return boundaries
+
+    @staticmethod
+    def _to_columns(docs: List[Dict[str, Any]]) -> ColumnBlock:
+        labels = np.asarray([doc.pop(LABEL_FIELD) for doc in docs])
+        fields = {field for doc in docs for field in doc}
+        return {field: np.asarray([doc.get(field) for doc in docs]) for field in fields}, labels
+
+    def stream_collection_in_batches(
+        self,
+        collection_name: str,
+        batch_size: int = 5000,
+        num_partitions: int = 4,
+        as_columns: bool = False
+    ) -> Iterator[Union[List[Record], ColumnBlock]]:
+        """
+        Read the collection with `num_partitions` parallel cursors over
+        disjoint `_id` ranges, yielding one batch per `batch_size` documents.
+
+        Batches are lists of (features_dict, label), or with `as_columns`
+        (dict of field -> NumPy array, labels array). Batches from different
+        partitions interleave, so global document order is not preserved.
+        """
+        try:
+            collection = self.database[collection_name]
+            boundaries = self._id_boundaries(collection, num_partitions)
+            edges = [None] + boundaries + [None]
+            ranges = list(zip(edges[:-1], edges[1:]))
+
+            # Bounded so fast readers cannot run ahead of the consumer.
+            batches: "queue.Queue" = queue.Queue(maxsize=2 * len(ranges))
+            done = object()
+            stop = threading.Event()
+
+            def read_range(lower, upper):
+                try:
+                    id_filter = {}
+                    if lower is not None:
+                        id_filter["$gte"] = lower
+                    if upper is not None:
+                        id_filter["$lt"] = upper
+                    query = {LABEL_FIELD: {"$exists": True}}
+                    if id_filter:
+                        query["_id"] = id_filter
 
-                # Extract target label
-                y = doc["IsFraud"]
+                    docs = []
+                    for doc in collection.find(query, self._projection(), batch_size=batch_size):
+                        docs.append(doc)
+                        if len(docs) == batch_size:
+                            if stop.is_set():
+                                return
+                            batches.put(docs)
+                            docs = []
+                    if docs:
+                        batches.put(docs)
+                except Exception as e:
+                    batches.put(e)
+                finally:
+                    batches.put(done)
 
-                # Prepare feature dictionary, excluding unwanted fields
-                x = {
-                    k: v
-                    for k, v in doc.items()
-                    if k not in ["_id", "IsFraud", "Time"]
-                }
+            logging.info(
+                f"Reading '{collection_name}' with {len(ranges)} parallel cursors, batch size {batch_size}"
+            )
+            with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix="mongo-reader") as pool:
+                for lower, upper in ranges:
+                    pool.submit(read_range, lower, upper)
 
-                yield x, y
+                remaining = len(ranges)
+                try:
+                    while remaining:
+                        item = batches.get()
+                        if item is done:
+                            remaining -= 1
+                        elif isinstance(item, Exception):
+                            raise item
+                        elif as_columns:
+                            yield self._to_columns(item)
+                        else:
+                            yield [self._split_label(doc) for doc in item]
+                finally:
+                    # Unblock readers if the consumer stops early.
+                    stop.set()
+                    while remaining:
+                        if batches.get() is done:
+                            remaining -= 1
 
         except PyMongoError as e:
             raise MyException(f"MongoDB operation error: {e}", sys)
@@ -0,0 +1,76 @@
+import sys
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.components.data_validation import BatchValidator
+from src.constants import SCHEMA_FILE_PATH
+from src.exception import MyException
+from src.logger import logging
+
+
+TIMESTAMP_COLUMNS = ("TransactionTimestamp",)
+
+# Parse-time dtypes tolerate gaps (ints as float64, nullable booleans) so
+# validation sees bad rows instead of read_csv failing on them.
+_PARSE_DTYPES = {"int": "float64", "float": "float64", "bool": "boolean", "str": "str"}
+_FINAL_DTYPES = {"int": "int32", "float": "float64", "bool": "bool"}
+
+
+def _apply_types(chunk: pd.DataFrame, validator: BatchValidator) -> pd.DataFrame:
+    columns: Dict[str, pd.Series] = {}
+    for name, spec in validator.columns.items():
+        if name not in chunk:
+            continue
+        if name in TIMESTAMP_COLUMNS:
+            columns[name] = pd.to_datetime(chunk[name], format="ISO8601")
+        elif "allowed" in spec:
+            columns[name] = chunk[name].astype(pd.CategoricalDtype(spec["allowed"]))
+        elif spec["type"] in _FINAL_DTYPES:
+            columns[name] = chunk[name].astype(_FINAL_DTYPES[spec["type"]])
+    columns[validator.label_name] = chunk[validator.label_name].astype(np.int64)
+    return chunk.assign(**columns)
+
+
+def read_transactions_csv(
+    csv_path: str,
+    chunksize: Optional[int] = None,
+    schema_file_path: str = SCHEMA_FILE_PATH
+) -> pd.DataFrame:
+    """
+    Read a transactions CSV in one pass with explicit dtypes from the schema.
+    Invalid rows are dropped by `BatchValidator`. The result has
+    int32/float64/bool numerics, categoricals for columns with an allowed
+    domain, parsed timestamps and an int64 label.
+
+    With `chunksize`, the file is parsed and validated chunk by chunk.
+    """
+    try:
+        validator = BatchValidator.from_yaml(schema_file_path)
+        dtypes = {name: _PARSE_DTYPES[spec["type"]] for name, spec in validator.columns.items()}
+        dtypes[validator.label_name] = "float64"
+
+        if chunksize:
+            chunks = pd.read_csv(csv_path, dtype=dtypes, chunksize=chunksize)
+        else:
+            chunks = [pd.read_csv(csv_path, dtype=dtypes)]
+
+        frames, invalid, failures = [], 0, {}
+        for chunk in chunks:
+            result = validator.validate(chunk)
+            if result.invalid_records:
+                invalid += result.invalid_records
+                for rule, count in result.failures.items():
+                    failures[rule] = failures.get(rule, 0) + count
+                chunk = chunk[result.mask]
+            frames.append(_apply_types(chunk, validator))
+
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
+        if invalid:
+            logging.info(f"Dropped {invalid} invalid rows from {csv_path}: {failures}")
+        logging.info(f"Loaded {len(df)} rows from {csv_path} ({df.memory_usage(deep=True).sum() / 1e6:.1f} MB)")
+        return df
+
+    except Exception as e:
+        raise MyException(e, sys)
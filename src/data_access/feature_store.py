@@ -0,0 +1,256 @@
+import os
+import sys
+import json
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+from bson import json_util
+
+from src.components.data_validation import BatchValidator
+from src.constants import SCHEMA_FILE_PATH
+from src.data_access.credit_data import CreditData, LABEL_FIELD
+from src.exception import MyException
+from src.logger import logging
+
+
+MANIFEST_FILE_NAME = "_manifest.json"
+
+_ARROW_TYPES = {"str": pa.string(), "float": pa.float64(), "int": pa.int64(), "bool": pa.bool_()}
+
+
+def arrow_schema(schema_file_path: str = SCHEMA_FILE_PATH) -> pa.Schema:
+    """
+    Arrow schema of a synced document: the schema.yaml columns, then the label.
+    """
+    validator = BatchValidator.from_yaml(schema_file_path)
+    fields = [pa.field(name, _ARROW_TYPES[spec["type"]]) for name, spec in validator.columns.items()]
+    return pa.schema(fields + [pa.field(validator.label_name, pa.int64())])
+
+
+class FeatureStore:
+    """
+    Columnar snapshot of a MongoDB collection as Arrow IPC part files.
+
+    Each sync appends one part holding the documents newer than the
+    watermark (the largest `_id` already stored), or replaces every part on
+    a full refresh. Synced parts share the Arrow schema derived from
+    `schema_file_path`, so a field that is all null in one batch keeps its
+    type. The manifest lists the live parts and is swapped
+    atomically, so readers never see a half-written snapshot. Parts are
+    read memory-mapped, so concurrent pipelines share one copy in the page
+    cache.
+    """
+
+    def __init__(self, root_dir: str, schema_file_path: str = SCHEMA_FILE_PATH):
+        self.root_dir = root_dir
+        self.schema_file_path = schema_file_path
+        self.manifest_path = os.path.join(root_dir, MANIFEST_FILE_NAME)
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        if not os.path.exists(self.manifest_path):
+            return {"parts": [], "rows": 0, "watermark": None}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    @property
+    def parts(self) -> List[str]:
+        return [os.path.join(self.root_dir, part) for part in self._read_manifest()["parts"]]
+
+    @property
+    def num_rows(self) -> int:
+        return self._read_manifest()["rows"]
+
+    @property
+    def watermark(self) -> Any:
+        watermark = self._read_manifest()["watermark"]
+        return None if watermark is None else json_util.loads(watermark)
+
+    @property
+    def snapshot_id(self) -> str:
+        """
+        Identifies the current snapshot: changes whenever a sync or import
+        writes a part, since part names are never reused.
+        """
+        manifest = self._read_manifest()
+        return json.dumps([manifest["parts"], manifest["rows"], manifest["watermark"]])
+
+    def exists(self) -> bool:
+        return bool(self._read_manifest()["parts"])
+
+    def _schema(self) -> Optional[pa.Schema]:
+        parts = self.parts
+        if not parts:
+            return None
+        with pa.memory_map(parts[0]) as source:
+            return pa.ipc.open_file(source).schema
+
+    def sync(
+        self,
+        collection_name: str,
+        credit_data: Optional[CreditData] = None,
+        incremental: bool = True,
+        batch_size: int = 5000
+    ) -> int:
+        """
+        Pull new documents from MongoDB into a new part file.
+        Returns the number of rows written.
+        """
+        try:
+            os.makedirs(self.root_dir, exist_ok=True)
+            credit_data = credit_data or CreditData()
+            manifest = self._read_manifest()
+            schema = arrow_schema(self.schema_file_path)
+            incremental = incremental and bool(manifest["parts"])
+            if incremental and not self._schema().equals(schema):
+                # e.g. parts from an import_table or an older schema.yaml.
+                logging.info(f"Feature store {self.root_dir} schema differs from {self.schema_file_path}; refreshing.")
+                incremental = False
+            after_id = self.watermark if incremental else None
+
+            part_no = len(manifest["parts"])
+            while os.path.exists(os.path.join(self.root_dir, f"part-{part_no:05d}.arrow")):
+                part_no += 1
+            part_name = f"part-{part_no:05d}.arrow"
+            part_path = os.path.join(self.root_dir, part_name)
+
+            rows, last_id, writer = 0, after_id, None
+            tmp_path = part_path + ".tmp"
+            try:
+                for docs in credit_data.stream_collection_after(collection_name, after_id, batch_size):
+                    last_id = docs[-1]["_id"]
+                    # Fields outside the schema are dropped; missing ones are null.
+                    batch = pa.RecordBatch.from_pylist(docs, schema=schema)
+                    if writer is None:
+                        writer = pa.ipc.new_file(tmp_path, schema)
+                    writer.write_batch(batch)
+                    rows += len(docs)
+                if writer is not None:
+                    writer.close()
+                    writer = None
+                    os.replace(tmp_path, part_path)
+            finally:
+                # Only left over when the write failed.
+                if writer is not None:
+                    writer.close()
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+            if rows == 0:
+                logging.info(f"Feature store {self.root_dir} is up to date ({manifest['rows']} rows)")
+                return 0
+
+            stale = [] if incremental else manifest["parts"]
+            self._write_manifest({
+                "collection": collection_name,
+                "parts": (manifest["parts"] if incremental else []) + [part_name],
+                "rows": (manifest["rows"] if incremental else 0) + rows,
+                "watermark": json_util.dumps(last_id),
+            })
+            for part in stale:
+                os.remove(os.path.join(self.root_dir, part))
+
+            logging.info(
+                f"Feature store {self.root_dir}: wrote {rows} rows to {part_name} "
+                f"({'incremental' if incremental else 'full refresh'})"
+            )
+            return rows
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def import_table(self, table: pa.Table, source: str) -> int:
+        """
+        Replace the snapshot with an in-memory table (e.g. a parsed CSV),
+        so file-based runs are read through the same memory-mapped parts.
+        Returns the number of rows written.
+        """
+        try:
+            os.makedirs(self.root_dir, exist_ok=True)
+            manifest = self._read_manifest()
+
+            part_no = len(manifest["parts"])
+            while os.path.exists(os.path.join(self.root_dir, f"part-{part_no:05d}.arrow")):
+                part_no += 1
+            part_name = f"part-{part_no:05d}.arrow"
+            tmp_path = os.path.join(self.root_dir, part_name + ".tmp")
+            try:
+                with pa.ipc.new_file(tmp_path, table.schema) as writer:
+                    writer.write_table(table)
+                os.replace(tmp_path, os.path.join(self.root_dir, part_name))
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+            self._write_manifest({
+                "collection": source,
+                "parts": [part_name],
+                "rows": table.num_rows,
+                "watermark": None,
+            })
+            for part in manifest["parts"]:
+                os.remove(os.path.join(self.root_dir, part))
+
+            logging.info(f"Feature store {self.root_dir}: imported {table.num_rows} rows from {source}")
+            return table.num_rows
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def iter_batches(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        validator=None
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Record batches from every part, memory-mapped and in insertion order.
+        With a `BatchValidator`, each batch is filtered to its valid rows.
+        """
+        try:
+            invalid, failures = 0, {}
+            for path in self.parts:
+                reader = pa.ipc.open_file(pa.memory_map(path))
+                for i in range(reader.num_record_batches):
+                    batch = reader.get_batch(i)
+                    if validator is not None:
+                        result = validator.validate({
+                            name: batch.column(name).to_numpy(zero_copy_only=False)
+                            for name in batch.schema.names
+                        })
+                        if result.invalid_records:
+                            invalid += result.invalid_records
+                            for rule, count in result.failures.items():
+                                failures[rule] = failures.get(rule, 0) + count
+                            batch = batch.filter(pa.array(result.mask))
+                    yield batch if columns is None else batch.select(list(columns))
+            if invalid:
+                logging.info(f"Feature store {self.root_dir}: skipped {invalid} invalid rows: {failures}")
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def read_table(self, columns: Optional[Sequence[str]] = None) -> pa.Table:
+        """
+        The whole snapshot as one zero-copy Arrow table.
+        """
+        try:
+            tables = []
+            for path in self.parts:
+                table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+                tables.append(table if columns is None else table.select(list(columns)))
+            return pa.concat_tables(tables)
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def iter_records(self, validator=None) -> Iterator[Tuple[Dict[str, Any], int]]:
+        """
+        (features_dict, label) records, as streamed from MongoDB.
+        """
+        for batch in self.iter_batches(validator=validator):
+            labels = batch.column(LABEL_FIELD).to_pylist()
+            features = batch.select([name for name in batch.schema.names if name != LABEL_FIELD])
+            yield from zip(features.to_pylist(), labels)
@@ -15,12 +15,15 @@ class DataValidationArtifact:
     schema_file_path: str
     report_file_path: str
     report_page_file_path: str
+    validated_stream: Optional[Iterator[Tuple[Dict[str, Any], int]]] = None
+    validation_report: Any = None
 
 
 @dataclass
 class DataTransformationArtifact:
     transformed_stream: Iterator[Tuple[Dict[str, float], int]]
     pipeline_path: str  
+    report_file_path: Optional[str] = None
 
 
 @dataclass
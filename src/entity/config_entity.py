@@ -1,22 +1,50 @@
 from dataclasses import dataclass, field
 import os
+from typing import Optional
 from datetime import datetime
 
 from src.constants import (
     PIPELINE_NAME,
     ARTIFACT_DIR,
+    PIPELINE_EXECUTION_MODE,
+    PIPELINE_QUEUE_SIZE,
+    PIPELINE_CHUNK_SIZE,
+    PIPELINE_REPORT_FILE_NAME,
     DATA_INGESTION_DIR_NAME,
     DATA_INGESTION_FEATURE_STORE_DIR,
-    FILE_NAME,
     DATA_INGESTION_COLLECTION_NAME,
+    DATA_INGESTION_READ_MODE,
+    DATA_INGESTION_BATCH_SIZE,
+    DATA_INGESTION_NUM_PARTITIONS,
+    DATA_INGESTION_USE_FEATURE_STORE,
+    DATA_INGESTION_INCREMENTAL,
     DATA_VALIDATION_DIR_NAME,
     DATA_VALIDATION_REPORT_FILE_NAME,
     INVALID_RECORD_LOG_FILE,
+    DATA_VALIDATION_INVALID_LOG_BUFFER_SIZE,
     DATA_TRANSFORMATION_DIR_NAME,
     PIPELINE_FILE_NAME,
+    DATA_TRANSFORMATION_ENGINE,
+    DATA_TRANSFORMATION_OUTPUT,
+    DATA_TRANSFORMATION_REPORT_FILE_NAME,
+    DATA_TRANSFORMATION_HASHED_FIELDS,
+    DATA_TRANSFORMATION_SIGNED_HASHING,
+    DATA_TRANSFORMATION_HASH_SEED,
+    DATA_TRANSFORMATION_ENCODING_REPORT,
+    DATA_TRANSFORMATION_REPORT_MAX_DISTINCT,
+    DATA_TRANSFORMATION_REPORT_SAMPLE_EVERY,
     MODEL_TRAINER_DIR_NAME,
     MODEL_FILE_NAME,
-    SCHEMA_FILE_PATH
+    MODEL_TRAINER_LEARNING_MODE,
+    MODEL_TRAINER_MINI_BATCH_SIZE,
+    SCHEMA_FILE_PATH,
+    MULTI_MODEL_SNAPSHOT_DIR_NAME,
+    MULTI_MODEL_REPORT_FILE_NAME,
+    MULTI_MODEL_META_RIVER_MODEL_PATH,
+    MULTI_MODEL_META_RIVER_DIR_NAME,
+    SERVING_RIVER_MODEL_PATH,
+    MULTI_MODEL_META_STACKING,
+    MULTI_MODEL_MAX_WORKERS
 )
 
 from src.utils.common import read_yaml
@@ -30,6 +58,13 @@ class TrainingPipelineConfig:
     pipeline_name: str = PIPELINE_NAME
     artifact_dir: str = os.path.join(ARTIFACT_DIR, TIMESTAMP)
     timestamp: str = TIMESTAMP
+    execution_mode: str = PIPELINE_EXECUTION_MODE
+    queue_size: int = PIPELINE_QUEUE_SIZE
+    chunk_size: int = PIPELINE_CHUNK_SIZE
+    report_file_path: str = field(init=False)
+
+    def __post_init__(self):
+        self.report_file_path = os.path.join(self.artifact_dir, PIPELINE_REPORT_FILE_NAME)
 
 
 
@@ -41,16 +76,23 @@ class DataIngestionConfig:
     data_ingestion_dir: str = field(init=False)
     feature_store_file_path: str = field(init=False)
     collection_name: str = DATA_INGESTION_COLLECTION_NAME
+    read_mode: str = DATA_INGESTION_READ_MODE  # "stream" or "parallel"
+    batch_size: int = DATA_INGESTION_BATCH_SIZE
+    num_partitions: int = DATA_INGESTION_NUM_PARTITIONS
+    use_feature_store: bool = DATA_INGESTION_USE_FEATURE_STORE
+    incremental: bool = DATA_INGESTION_INCREMENTAL
 
     def __post_init__(self):
         self.data_ingestion_dir = os.path.join(
             training_pipeline_config.artifact_dir,
             DATA_INGESTION_DIR_NAME
         )
+        # Shared by every run (not under the timestamped artifact dir) so
+        # incremental syncs and the River/BiLSTM/meta pipelines reuse it.
         self.feature_store_file_path = os.path.join(
-            self.data_ingestion_dir,
+            ARTIFACT_DIR,
             DATA_INGESTION_FEATURE_STORE_DIR,
-            FILE_NAME
+            self.collection_name.strip()
         )
 
 
@@ -59,6 +101,8 @@ class DataValidationConfig:
     data_validation_dir: str = field(init=False)
     report_file_path: str = field(init=False)
     invalid_log_file_path: str = field(init=False)
+    schema_file_path: str = SCHEMA_FILE_PATH
+    invalid_log_buffer_size: int = DATA_VALIDATION_INVALID_LOG_BUFFER_SIZE
 
     def __post_init__(self):
         self.data_validation_dir = os.path.join(
@@ -80,6 +124,15 @@ class DataTransformationConfig:
     data_transformation_dir: str = field(init=False)
     transformed_data_dir: str = field(init=False)
     pipeline_path: str = field(init=False)  # renamed from scaler_path
+    engine: str = DATA_TRANSFORMATION_ENGINE
+    output: str = DATA_TRANSFORMATION_OUTPUT
+    hashed_fields: dict = field(default_factory=lambda: dict(DATA_TRANSFORMATION_HASHED_FIELDS))
+    signed_hashing: bool = DATA_TRANSFORMATION_SIGNED_HASHING
+    hash_seed: int = DATA_TRANSFORMATION_HASH_SEED
+    encoding_report: bool = DATA_TRANSFORMATION_ENCODING_REPORT
+    report_max_distinct: int = DATA_TRANSFORMATION_REPORT_MAX_DISTINCT
+    report_sample_every: int = DATA_TRANSFORMATION_REPORT_SAMPLE_EVERY
+    report_file_path: str = field(init=False)
 
     def __post_init__(self):
         
@@ -100,6 +153,11 @@ class DataTransformationConfig:
             PIPELINE_FILE_NAME
         )
 
+        self.report_file_path = os.path.join(
+            self.data_transformation_dir,
+            DATA_TRANSFORMATION_REPORT_FILE_NAME
+        )
+
 
 @dataclass
 class ModelTrainerConfig:
@@ -107,6 +165,10 @@ class ModelTrainerConfig:
     model_path: str = field(init=False)
     pipeline_path: str = field(init=False)  
     hyperparams: dict = field(init=False)
+    # "per_record" uses predict_one/learn_one; "mini_batch" uses predict_many/learn_many
+    # on DataFrames of mini_batch_size rows where the model supports it.
+    learning_mode: str = MODEL_TRAINER_LEARNING_MODE
+    mini_batch_size: int = MODEL_TRAINER_MINI_BATCH_SIZE
 
     def __post_init__(self):
         self.model_trainer_dir = os.path.join(
@@ -125,3 +187,33 @@ class ModelTrainerConfig:
 
         schema_config = read_yaml(SCHEMA_FILE_PATH)
         self.hyperparams = schema_config.get("model_selection", {})
+
+
+@dataclass
+class MultiModelTrainingConfig:
+    # None syncs and reads the MongoDB feature store; a path imports that CSV instead.
+    csv_path: Optional[str] = None
+    snapshot_dir: str = field(init=False)
+    report_file_path: str = field(init=False)
+    # None trains the meta stage's raw-feature River model in this run; a path uses that model.
+    meta_river_model_path: Optional[str] = MULTI_MODEL_META_RIVER_MODEL_PATH
+    trained_meta_river_model_path: str = field(init=False)
+    serving_river_model_path: str = SERVING_RIVER_MODEL_PATH
+    bilstm_epochs: Optional[int] = None  # None keeps the BiLSTM trainer's default
+    max_workers: int = MULTI_MODEL_MAX_WORKERS
+    meta_stacking: str = MULTI_MODEL_META_STACKING
+
+    def __post_init__(self):
+        self.snapshot_dir = os.path.join(
+            training_pipeline_config.artifact_dir,
+            MULTI_MODEL_SNAPSHOT_DIR_NAME
+        )
+        self.report_file_path = os.path.join(
+            training_pipeline_config.artifact_dir,
+            MULTI_MODEL_REPORT_FILE_NAME
+        )
+        self.trained_meta_river_model_path = os.path.join(
+            training_pipeline_config.artifact_dir,
+            MULTI_MODEL_META_RIVER_DIR_NAME,
+            MODEL_FILE_NAME
+        )
@@ -24,3 +24,14 @@ class MyException(Exception):
 
     def __str__(self) -> str:
         return self.error_message
+
+    def __reduce__(self):
+        # Rebuild from the formatted message so errors survive a process pool.
+        return _restore_exception, (self.error_message,)
+
+
+def _restore_exception(error_message: str) -> MyException:
+    error = MyException.__new__(MyException)
+    Exception.__init__(error, error_message)
+    error.error_message = error_message
+    return error
@@ -0,0 +1,246 @@
+import os
+import sys
+import time
+import pickle
+import shutil
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import yaml
+from pyarrow import csv as pa_csv
+from river.linear_model import LogisticRegression as RiverLogisticRegression
+from river.metrics import Accuracy
+from river.optim import SGD
+
+from src.components.data_ingestion import DataIngestion
+from src.components.data_validation import BatchValidator
+from src.data_access.credit_data import LABEL_FIELD
+from src.data_access.csv_data import TIMESTAMP_COLUMNS
+from src.data_access.feature_store import FeatureStore
+from src.entity.artifact_entity import DataIngestionArtifact, ModelTrainerArtifact
+from src.entity.config_entity import (
+    training_pipeline_config,
+    DataIngestionConfig,
+    MultiModelTrainingConfig
+)
+from src.exception import MyException
+from src.logger import logging
+from src.utils.feature_encoder import FEATURE_NAMES, FeatureEncoder
+
+
+def _snapshot_artifact(snapshot_dir: str) -> DataIngestionArtifact:
+    store = FeatureStore(snapshot_dir)
+    return DataIngestionArtifact(
+        data_stream=store.iter_records(validator=BatchValidator.from_yaml()),
+        feature_store_file_path=snapshot_dir,
+        train_file_path="",
+        test_file_path="",
+        streaming_data_generator=None
+    )
+
+
+# Workers run in spawned processes, which re-import the config module with a
+# fresh timestamp; both first point it back at the parent's run directory.
+
+def _train_river(artifact_dir: str, snapshot_dir: str) -> Tuple[Any, float]:
+    training_pipeline_config.artifact_dir = artifact_dir
+    from src.pipline.training_pipeline import TrainPipeline
+
+    start = time.perf_counter()
+    artifact = TrainPipeline().run_pipeline(_snapshot_artifact(snapshot_dir))
+    return artifact, time.perf_counter() - start
+
+
+def _train_bilstm(
+    artifact_dir: str, snapshot_dir: str, epochs: Optional[int], tf_threads: Optional[int] = None
+) -> Tuple[Any, float]:
+    training_pipeline_config.artifact_dir = artifact_dir
+    if tf_threads:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(tf_threads)
+    from src2.pipeline.model_trainer import TrainPipeline
+
+    start = time.perf_counter()
+    pipeline = TrainPipeline(training_mode="in_memory")
+    if epochs is not None:
+        pipeline.model_trainer_config.epochs = epochs
+    # Keep this run's validation report apart from the River worker's.
+    validation_config = pipeline.data_validation_config
+    validation_config.data_validation_dir = os.path.join(validation_config.data_validation_dir, "bilstm")
+    validation_config.report_file_path = os.path.join(
+        validation_config.data_validation_dir, os.path.basename(validation_config.report_file_path)
+    )
+    validation_config.invalid_log_file_path = os.path.join(
+        validation_config.data_validation_dir, os.path.basename(validation_config.invalid_log_file_path)
+    )
+    artifact = pipeline.run_pipeline(_snapshot_artifact(snapshot_dir))
+    return artifact, time.perf_counter() - start
+
+
+def _train_meta_river(snapshot_dir: str, model_path: str) -> Tuple[ModelTrainerArtifact, float]:
+    """
+    River model for the meta stage. The River pipeline's model scores
+    transformed features, but the meta stage (like serving) scores the 8 raw
+    features, so this one learns from those, in order, with progressive
+    validation.
+    """
+    start = time.perf_counter()
+    model = RiverLogisticRegression(optimizer=SGD())
+    accuracy = Accuracy()
+    store = FeatureStore(snapshot_dir)
+    columns = list(FEATURE_NAMES) + [LABEL_FIELD]
+    for batch in store.iter_batches(columns=columns, validator=BatchValidator.from_yaml()):
+        values = np.column_stack([
+            batch.column(name).to_numpy(zero_copy_only=False).astype(np.float64) for name in FEATURE_NAMES
+        ])
+        labels = batch.column(LABEL_FIELD).to_pylist()
+        for features, label in zip(FeatureEncoder.river_dicts(values), labels):
+            accuracy.update(label, model.predict_one(features))
+            model.learn_one(features, label)
+
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    with open(model_path, "wb") as f:
+        pickle.dump(model, f)
+    artifact = ModelTrainerArtifact(
+        model_path=model_path,
+        pipeline_path=None,
+        best_model_name="RiverLogisticRegression",
+        best_score=accuracy.get(),
+        training_metrics={"progressive": {"accuracy": accuracy.get()}}
+    )
+    return artifact, time.perf_counter() - start
+
+
+class MultiModelTrainPipeline:
+    """
+    Trains the River, BiLSTM and meta models from one read of the data.
+
+    The data is read once into a feature store snapshot (the synced MongoDB
+    store, or an imported CSV). The River pipeline and the BiLSTM pipeline
+    then train concurrently in spawned processes, so TensorFlow and River
+    do not share a GIL, each reading the snapshot memory-mapped. Meta
+    training starts as soon as both have finished, using the new BiLSTM.
+
+    Unless `meta_river_model_path` names an existing model, a raw-feature
+    River model for the meta stage trains alongside them, and is published
+    to `serving_river_model_path` with the meta model so serving pairs the
+    meta model with the River model it was trained on.
+    """
+
+    def __init__(self, config: Optional[MultiModelTrainingConfig] = None):
+        self.config = config or MultiModelTrainingConfig()
+
+    def prepare_snapshot(self) -> str:
+        """
+        Returns the directory of a feature store holding the training data.
+        """
+        try:
+            if self.config.csv_path is None:
+                ingestion_config = DataIngestionConfig()
+                DataIngestion(ingestion_config).sync_feature_store()
+                return ingestion_config.feature_store_file_path
+
+            table = pa_csv.read_csv(
+                self.config.csv_path,
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={name: pa.string() for name in TIMESTAMP_COLUMNS}
+                )
+            )
+            FeatureStore(self.config.snapshot_dir).import_table(table, source=self.config.csv_path)
+            return self.config.snapshot_dir
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def _write_report(self, report: Dict[str, Any]) -> None:
+        os.makedirs(os.path.dirname(self.config.report_file_path), exist_ok=True)
+        with open(self.config.report_file_path, "w") as f:
+            yaml.safe_dump(report, f, sort_keys=False)
+
+        logging.info(f"Multi-model training report: {report}")
+        print("\nMulti-model training:")
+        for stage, seconds in report["stage_seconds"].items():
+            print(f"    {stage:<10} {seconds:>8.2f}s")
+        print(f"    {'wall':<10} {report['wall_seconds']:>8.2f}s "
+              f"(stages back to back: {report['sequential_seconds']:.2f}s)")
+
+    def run_pipeline(self) -> Dict[str, Any]:
+        try:
+            logging.info("Running multi-model training pipeline...")
+            wall_start = time.perf_counter()
+            artifact_dir = training_pipeline_config.artifact_dir
+            stage_seconds: Dict[str, float] = {}
+
+            start = time.perf_counter()
+            snapshot_dir = self.prepare_snapshot()
+            stage_seconds["snapshot"] = time.perf_counter() - start
+
+            # With a single core the two trainers would only time-slice, so one
+            # worker runs them back to back; otherwise TF leaves a core to River.
+            cpus = os.cpu_count() or 1
+            workers = max(1, min(self.config.max_workers, cpus))
+            tf_threads = max(1, cpus - 1) if workers > 1 else None
+            logging.info(f"Training base models with {workers} worker process(es) on {cpus} CPU(s)")
+
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                river_future = pool.submit(_train_river, artifact_dir, snapshot_dir)
+                bilstm_future = pool.submit(
+                    _train_bilstm, artifact_dir, snapshot_dir, self.config.bilstm_epochs, tf_threads
+                )
+                futures = [river_future, bilstm_future]
+                if self.config.meta_river_model_path is None:
+                    meta_river_future = pool.submit(
+                        _train_meta_river, snapshot_dir, self.config.trained_meta_river_model_path
+                    )
+                    futures.append(meta_river_future)
+                wait(futures)
+                river_artifact, stage_seconds["river"] = river_future.result()
+                bilstm_artifact, stage_seconds["bilstm"] = bilstm_future.result()
+                if self.config.meta_river_model_path is None:
+                    meta_river_artifact, stage_seconds["meta_river"] = meta_river_future.result()
+                    meta_river = {
+                        "model_path": meta_river_artifact.model_path,
+                        "source": "trained on this run's snapshot",
+                        "score": float(meta_river_artifact.best_score),
+                    }
+                else:
+                    meta_river = {"model_path": self.config.meta_river_model_path, "source": "existing model"}
+            base_models_done = time.perf_counter()
+
+            # Imported here so TensorFlow is only loaded in the parent after the workers are done.
+            from src3.components.meta_trainer import MetaModelTrainer
+
+            start = time.perf_counter()
+            meta_trainer = MetaModelTrainer(
+                river_model_path=meta_river["model_path"],
+                bilstm_model_path=bilstm_artifact.model_path
+            )
+            meta_trainer.run_meta_training(feature_store_dir=snapshot_dir, stacking=self.config.meta_stacking)
+            stage_seconds["meta"] = time.perf_counter() - start
+            if self.config.meta_river_model_path is None:
+                os.makedirs(os.path.dirname(self.config.serving_river_model_path), exist_ok=True)
+                shutil.copyfile(meta_river["model_path"], self.config.serving_river_model_path)
+                meta_river["published_to"] = self.config.serving_river_model_path
+                logging.info(f"Published the meta stage's River model to {self.config.serving_river_model_path}")
+
+            report = {
+                "snapshot_dir": snapshot_dir,
+                "workers": workers,
+                "meta_stacking": self.config.meta_stacking,
+                "stage_seconds": {stage: round(seconds, 3) for stage, seconds in stage_seconds.items()},
+                "base_models_wall_seconds": round(base_models_done - wall_start - stage_seconds["snapshot"], 3),
+                "wall_seconds": round(time.perf_counter() - wall_start, 3),
+                "sequential_seconds": round(sum(stage_seconds.values()), 3),
+                "river": {"model_path": river_artifact.model_path, "score": float(river_artifact.best_score)},
+                "bilstm": {"model_path": bilstm_artifact.model_path, "score": float(bilstm_artifact.best_score)},
+                "meta_river": meta_river,
+            }
+            self._write_report(report)
+            return report
+
+        except Exception as e:
+            raise MyException(e, sys)
@@ -0,0 +1,187 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """
+    Counters for one stage and the bounded queue it feeds. `wait_output`
+    is time spent blocked on a full queue; `consumer_wait` is time the next
+    stage spent blocked on an empty one.
+    """
+    name: str
+    queue_size: int
+    items: int = 0
+    started: float = 0.0
+    finished: float = 0.0
+    wait_output: float = 0.0
+    consumer_wait: float = 0.0
+    queue_samples: int = 0
+    queue_total: int = 0
+    queue_max: int = 0
+
+    def sample_queue(self, depth: int) -> None:
+        self.queue_samples += 1
+        self.queue_total += depth
+        self.queue_max = max(self.queue_max, depth)
+
+    @property
+    def seconds(self) -> float:
+        return max((self.finished or time.perf_counter()) - self.started, 1e-9)
+
+    @property
+    def mean_queue_occupancy(self) -> float:
+        return self.queue_total / max(self.queue_samples, 1) / self.queue_size
+
+
+class PipelinedExecutor:
+    """
+    Runs stages of a lazy record pipeline in their own threads, connected by
+    bounded queues, so e.g. MongoDB reads and decoding overlap with River
+    learning instead of alternating with it on one thread.
+
+    `stage(name, iterator)` starts draining `iterator` in a background
+    thread and returns an iterator over its output; chaining calls puts a
+    queue between each pair of stages. Records travel in chunks of
+    `chunk_size` to keep queue overhead off the per-record path. Errors in
+    a stage are re-raised in whichever thread consumes its output, and an
+    early stop by the consumer unblocks every producer.
+    """
+
+    def __init__(self, queue_size: int = 8, chunk_size: int = 256):
+        self.queue_size = queue_size
+        self.chunk_size = chunk_size
+        self.stats: List[StageStats] = []
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._threads: List[threading.Thread] = []
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    def _put(self, q: "queue.Queue", item: Any, stats: StageStats) -> bool:
+        start = time.perf_counter()
+        stats.sample_queue(q.qsize())
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                stats.wait_output += time.perf_counter() - start
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, iterator: Iterator[Any], q: "queue.Queue", stats: StageStats) -> None:
+        stats.started = time.perf_counter()
+        try:
+            chunk = []
+            for item in iterator:
+                chunk.append(item)
+                if len(chunk) == self.chunk_size:
+                    if not self._put(q, chunk, stats):
+                        return
+                    stats.items += len(chunk)
+                    chunk = []
+            if chunk and self._put(q, chunk, stats):
+                stats.items += len(chunk)
+        except BaseException as e:
+            # The first error wins; the stop flag makes every consumer raise it.
+            if self._error is None:
+                self._error = e
+            self._stop.set()
+        finally:
+            stats.finished = time.perf_counter()
+            self._put(q, _DONE, stats)
+
+    def _consume(self, q: "queue.Queue", stats: StageStats) -> Iterator[Any]:
+        completed = False
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = q.get(timeout=0.1)
+                except queue.Empty:
+                    if self._stop.is_set():
+                        if self._error is not None:
+                            raise self._error
+                        return
+                    continue
+                finally:
+                    stats.consumer_wait += time.perf_counter() - start
+                if item is _DONE:
+                    completed = True
+                    return
+                yield from item
+        finally:
+            if stats is self.stats[-1]:
+                self._finished = time.perf_counter()
+            if not completed:
+                # Consumer stopped early or failed: release every producer.
+                self._stop.set()
+
+    def stage(self, name: str, iterator: Iterator[Any]) -> Iterator[Any]:
+        if self._started is None:
+            self._started = time.perf_counter()
+        stats = StageStats(name=name, queue_size=self.queue_size)
+        self.stats.append(stats)
+        q: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        thread = threading.Thread(
+            target=self._produce, args=(iterator, q, stats), name=f"pipeline-{name}", daemon=True
+        )
+        self._threads.append(thread)
+        thread.start()
+        return self._consume(q, stats)
+
+    def close(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+
+    def report(self, sink_name: str = "sink") -> Dict[str, Any]:
+        """
+        Per-stage throughput, busy share and output-queue occupancy. The
+        stage with the highest busy share bounds the pipeline: a full queue
+        in front of a stage means it is the slow one, an empty queue means
+        it is starved by its upstream.
+        """
+        stages = []
+        for i, stats in enumerate(self.stats):
+            wait_input = self.stats[i - 1].consumer_wait if i else 0.0
+            busy = max(stats.seconds - wait_input - stats.wait_output, 0.0)
+            stages.append({
+                "stage": stats.name,
+                "items": stats.items,
+                "seconds": round(stats.seconds, 3),
+                "items_per_second": round(stats.items / stats.seconds, 1),
+                "busy_share": round(busy / stats.seconds, 3),
+                "wait_input_seconds": round(wait_input, 3),
+                "wait_output_seconds": round(stats.wait_output, 3),
+                "queue_mean_occupancy": round(stats.mean_queue_occupancy, 3),
+                "queue_max_depth": stats.queue_max,
+            })
+
+        if self.stats:
+            last = self.stats[-1]
+            seconds = max((self._finished or time.perf_counter()) - self._started, 1e-9)
+            busy = max(seconds - last.consumer_wait, 0.0)
+            stages.append({
+                "stage": sink_name,
+                "items": last.items,
+                "seconds": round(seconds, 3),
+                "items_per_second": round(last.items / seconds, 1),
+                "busy_share": round(busy / seconds, 3),
+                "wait_input_seconds": round(last.consumer_wait, 3),
+            })
+
+        bottleneck = max(stages, key=lambda stage: stage["busy_share"])["stage"] if stages else None
+        return {
+            "queue_size": self.queue_size,
+            "chunk_size": self.chunk_size,
+            "bottleneck": bottleneck,
+            "stages": stages,
+        }
@@ -1,6 +1,10 @@
+import os
 import sys
 from itertools import tee, islice
-from typing import Dict, Any, Iterator, Tuple
+
+from typing import Optional
+
+import yaml
 
 from src.exception import MyException
 from src.logger import logging
@@ -9,8 +13,10 @@ from src.components.data_ingestion import DataIngestion
 from src.components.data_validation import DataValidation
 from src.components.data_transformation import DataTransformer
 from src.components.model_trainer import ModelTrainer
+from src.pipline.pipelined_executor import PipelinedExecutor
 
 from src.entity.config_entity import (
+    training_pipeline_config,
     DataIngestionConfig,
     DataValidationConfig,
     DataTransformationConfig,
@@ -29,6 +35,7 @@ class TrainPipeline:
     def __init__(self):
         try:
             logging.info("Initializing pipeline configuration objects...")
+            self.training_pipeline_config = training_pipeline_config
             self.data_ingestion_config = DataIngestionConfig()
             self.data_validation_config = DataValidationConfig()
             self.data_transformation_config = DataTransformationConfig()
@@ -47,20 +54,20 @@ class TrainPipeline:
             raise MyException(e, sys)
 
     def start_data_validation(
-        self, data_stream: Iterator[Tuple[Dict[str, Any], int]]
+        self, data_ingestion_artifact: DataIngestionArtifact
     ) -> DataValidationArtifact:
         """
         Entry point to perform validation.
         """
         try:
             logging.info("Starting data validation...")
-            validator = DataValidation(self.data_validation_config)
-            validated_stream, report = validator.run_validation(data_stream)
-            artifact = DataValidationArtifact(
-                validated_stream=validated_stream,
-                validation_report=report
+            validator = DataValidation(self.data_validation_config, data_ingestion_artifact)
+            artifact = validator.initiate_data_validation()
+            artifact.validated_stream, artifact.validation_report = validator.run_validation(
+                data_ingestion_artifact.data_stream
             )
-            logging.info("Data validation completed.")
+            # Records are validated as the stream is consumed; `_validated` logs completion.
+            logging.info("Data validation stream ready.")
             return artifact
         except Exception as e:
             raise MyException(e, sys)
@@ -89,28 +96,69 @@ class TrainPipeline:
         except Exception as e:
             raise MyException(e, sys)
 
-    def run_pipeline(self) -> None:
+    def _write_pipeline_report(self, executor: PipelinedExecutor) -> None:
+        report = executor.report(sink_name="model_training")
+        report_file_path = self.training_pipeline_config.report_file_path
+        os.makedirs(os.path.dirname(report_file_path), exist_ok=True)
+        with open(report_file_path, "w") as f:
+            yaml.safe_dump(report, f, sort_keys=False)
+
+        logging.info(f"Pipeline stage report: {report}")
+        print(f"\nPipeline stages (bottleneck: {report['bottleneck']}):")
+        for stage in report["stages"]:
+            print(
+                f"    {stage['stage']:<16} {stage['items_per_second']:>10.1f} rec/s  "
+                f"busy {stage['busy_share']:.0%}  "
+                f"queue {stage.get('queue_mean_occupancy', 0):.0%}"
+            )
+
+    def run_pipeline(
+        self, data_ingestion_artifact: Optional[DataIngestionArtifact] = None
+    ) -> ModelTrainerArtifact:
+        """
+        Ingestion -> validation/transformation -> training. In "pipelined"
+        mode the first two stages run in their own threads behind bounded
+        queues, so MongoDB reads overlap with River learning.
+
+        Pass `data_ingestion_artifact` to train on an already-prepared stream
+        instead of running ingestion.
+        """
+        executor = None
         try:
             logging.info("Running end-to-end training pipeline...")
+            pipelined = self.training_pipeline_config.execution_mode == "pipelined"
+            if pipelined:
+                executor = PipelinedExecutor(
+                    queue_size=self.training_pipeline_config.queue_size,
+                    chunk_size=self.training_pipeline_config.chunk_size
+                )
 
-            
-            data_ingestion_artifact = self.start_data_ingestion()
+            if data_ingestion_artifact is None:
+                data_ingestion_artifact = self.start_data_ingestion()
 
            
             stream_debug, stream_real = tee(data_ingestion_artifact.data_stream)
             sample = list(islice(stream_debug, 2))
             logging.info(f"Sample records from ingestion:\n{sample}")
             data_ingestion_artifact.data_stream = stream_real
+            if pipelined:
+                data_ingestion_artifact.data_stream = executor.stage(
+                    "ingestion", data_ingestion_artifact.data_stream
+                )
 
             
             data_validation_artifact = self.start_data_validation(
-                data_ingestion_artifact.data_stream
+                data_ingestion_artifact
             )
 
            
             data_transformation_artifact = self.start_data_transformation(
                 data_validation_artifact
             )
+            if pipelined:
+                data_transformation_artifact.transformed_stream = executor.stage(
+                    "transformation", data_transformation_artifact.transformed_stream
+                )
 
             
             model_trainer_artifact = self.start_model_trainer(
@@ -122,6 +170,12 @@ class TrainPipeline:
             print("\nPipeline Execution Summary:")
             print(f"    Best Model: {model_trainer_artifact.best_model_name}")
             print(f"    Accuracy Score: {model_trainer_artifact.best_score:.4f}")
+            if pipelined:
+                self._write_pipeline_report(executor)
+            return model_trainer_artifact
 
         except Exception as e:
             raise MyException(e, sys)
+        finally:
+            if executor is not None:
+                executor.close()
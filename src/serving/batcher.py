@@ -0,0 +1,167 @@
+import sys
+import time
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from src.exception import MyException
+from src.logger import logging
+
+
+class _PendingRequest:
+    """
+    A single queued item together with the slot its result is delivered to.
+    """
+    __slots__ = ("item", "result", "error", "done")
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+
+class BatchSizeHistogram:
+    """
+    Thread-safe counter of how many batches of each size were dispatched.
+    """
+
+    def __init__(self, max_batch_size: int):
+        self._lock = threading.Lock()
+        self._counts = [0] * (max_batch_size + 1)
+
+    def observe(self, batch_size: int) -> None:
+        with self._lock:
+            self._counts[batch_size] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+
+        batches = sum(counts)
+        requests = sum(size * count for size, count in enumerate(counts))
+        return {
+            "batches": batches,
+            "requests": requests,
+            "mean_batch_size": requests / batches if batches else 0.0,
+            "histogram": {size: count for size, count in enumerate(counts) if count},
+        }
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent scoring calls into one call of `batch_fn`.
+
+    A background worker collects queued items until either `max_batch_size`
+    items are waiting or `max_wait_ms` has elapsed since the first one arrived,
+    then calls `batch_fn(items)` once and hands each caller its own result.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        name: str = "micro-batcher"
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be >= 0")
+
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.histogram = BatchSizeHistogram(max_batch_size)
+
+        self._queue: "queue.Queue[Optional[_PendingRequest]]" = queue.Queue()
+        # Guards `_closed` so nothing is queued behind the stop marker.
+        self._close_lock = threading.Lock()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+        logging.info(
+            f"MicroBatcher started: max_batch_size={max_batch_size}, max_wait_ms={max_wait_ms}"
+        )
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Queue one item and block until its batched result is available.
+        """
+        pending = _PendingRequest(item)
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put(pending)
+
+        if not pending.done.wait(timeout):
+            raise TimeoutError(f"Batched call did not complete within {timeout}s")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Batch-size histogram plus the configured knobs, for tuning.
+        """
+        report = self.histogram.snapshot()
+        report["max_batch_size"] = self.max_batch_size
+        report["max_wait_ms"] = self.max_wait * 1000.0
+        report["queue_depth"] = self._queue.qsize()
+        return report
+
+    def close(self) -> None:
+        """
+        Stop the worker once the items already queued have been served.
+        Later calls to `submit` raise RuntimeError.
+        """
+        with self._close_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        self._worker.join()
+
+    def _collect_batch(self, first: _PendingRequest) -> List[_PendingRequest]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                pending = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if pending is None:
+                # Re-queue the stop marker so the run loop exits after this batch.
+                self._queue.put(None)
+                break
+            batch.append(pending)
+
+        return batch
+
+    def _dispatch(self, batch: List[_PendingRequest]) -> None:
+        self.histogram.observe(len(batch))
+        try:
+            results = self.batch_fn([pending.item for pending in batch])
+            if len(results) != len(batch):
+                raise MyException(
+                    f"batch_fn returned {len(results)} results for {len(batch)} items", sys
+                )
+            for pending, result in zip(batch, results):
+                pending.result = result
+        except Exception as e:
+            logging.error(f"Batched call failed for {len(batch)} items: {e}")
+            for pending in batch:
+                pending.error = e
+        finally:
+            for pending in batch:
+                pending.done.set()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            self._dispatch(self._collect_batch(first))
@@ -0,0 +1,119 @@
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.utils.feature_encoder import (
+    FEATURE_NAMES,
+    REQUEST_KEYS,
+    FeatureEncoder,
+    FeatureError,
+    check_finite,
+)
+
+
+SEQUENCE_LENGTH = 30
+
+# Optional key that ties a transaction to a customer's rolling history.
+CUSTOMER_KEY = "customer_id"
+
+# Request payloads are encoded in float64 so River sees the values as sent.
+_request_encoder = FeatureEncoder(REQUEST_KEYS, dtype=np.float64)
+
+
+def columns_to_matrix(columns: Dict[str, Sequence[Any]]) -> np.ndarray:
+    """
+    Build the (n, 8) float64 feature matrix from one array per request key.
+    Single and batch scoring both go through here so they stay identical.
+    """
+    missing = [key for key in REQUEST_KEYS if key not in columns]
+    if missing:
+        raise FeatureError(f"Missing fields: {', '.join(missing)}")
+    not_lists = [
+        key for key in (*REQUEST_KEYS, CUSTOMER_KEY)
+        if key in columns and not isinstance(columns[key], list)
+    ]
+    if not_lists:
+        raise FeatureError(f"Fields must be arrays in a columnar batch: {', '.join(not_lists)}")
+
+    lengths = {len(columns[key]) for key in REQUEST_KEYS}
+    if len(lengths) != 1:
+        raise FeatureError(f"All feature columns must have the same length, got {sorted(lengths)}")
+
+    n_rows = lengths.pop()
+    if CUSTOMER_KEY in columns and len(columns[CUSTOMER_KEY]) != n_rows:
+        raise FeatureError(f"'{CUSTOMER_KEY}' must have one entry per row")
+
+    matrix = np.empty((n_rows, len(REQUEST_KEYS)), dtype=np.float64)
+    for j, key in enumerate(REQUEST_KEYS):
+        try:
+            matrix[:, j] = np.asarray(columns[key], dtype=np.float64)
+        except (TypeError, ValueError) as e:
+            raise FeatureError(f"Field '{key}' is not numeric: {e}")
+    return check_finite(matrix, REQUEST_KEYS)
+
+
+def records_to_matrix(records: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """
+    Build the feature matrix from row-oriented request payloads.
+    """
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise FeatureError(f"Record {i + 1} is not a JSON object")
+    out = np.empty((len(records), len(REQUEST_KEYS)), dtype=np.float64)
+    return _request_encoder.encode_many(records, out=out)
+
+
+def record_to_matrix(record: Dict[str, Any]) -> np.ndarray:
+    """
+    Build a single-row feature matrix from one /predict payload.
+    """
+    if not isinstance(record, dict):
+        raise FeatureError("Expected a JSON object")
+    out = np.empty((1, len(REQUEST_KEYS)), dtype=np.float64)
+    _request_encoder.encode_one(record, out=out[0])
+    return out
+
+
+def customer_ids(columns: Dict[str, Sequence[Any]]) -> Optional[List[Optional[str]]]:
+    """
+    Customer ids as strings (None where absent), or None if the payload has none.
+    """
+    if CUSTOMER_KEY not in columns:
+        return None
+    return [None if cid is None else str(cid) for cid in columns[CUSTOMER_KEY]]
+
+
+def record_customer_ids(records: Sequence[Dict[str, Any]]) -> Optional[List[Optional[str]]]:
+    """
+    `customer_ids` for row-oriented payloads.
+    """
+    if not any(CUSTOMER_KEY in record for record in records):
+        return None
+    return customer_ids({CUSTOMER_KEY: [record.get(CUSTOMER_KEY) for record in records]})
+
+
+def parse_ndjson(body: str) -> List[Dict[str, Any]]:
+    """
+    Parse newline-delimited JSON into a list of records, skipping blank lines.
+    """
+    records = []
+    for line_no, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise FeatureError(f"Invalid JSON on line {line_no}: {e}")
+        if not isinstance(record, dict):
+            raise FeatureError(f"Line {line_no} is not a JSON object")
+        records.append(record)
+    return records
+
+
+def to_river_inputs(matrix: np.ndarray) -> List[Dict[str, float]]:
+    """
+    River-ready feature dicts, one per row.
+    """
+    return FeatureEncoder.river_dicts(matrix)
+
@@ -0,0 +1,80 @@
+import os
+import sys
+from typing import Iterable
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+from src.exception import MyException
+from src.logger import logging
+
+
+def configure_threads(threads: int) -> None:
+    """
+    Size TensorFlow's intra- and inter-op thread pools (and oneDNN's
+    OpenMP pool). Only takes effect before the process runs its first op,
+    so pre-forked workers call it right after the fork: left at the
+    default, each of N workers would start one thread per core.
+    """
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(threads)
+
+
+class CompiledBiLSTM:
+    """
+    Serving wrapper around a Keras BiLSTM.
+
+    `Model.predict` builds a dataset and runs the generic predict loop on
+    every call, which dominates latency for a handful of rows. This wraps the
+    forward pass in a `tf.function` with a fixed (None, steps, features)
+    float32 signature, so it is traced once and reused for any batch size.
+    """
+
+    def __init__(self, model, warmup_batch_sizes: Iterable[int] = (1, 32)):
+        try:
+            self.model = model
+            _, self.sequence_length, self.num_features = model.input_shape
+
+            signature = tf.TensorSpec(
+                shape=(None, self.sequence_length, self.num_features), dtype=tf.float32
+            )
+            self._forward = tf.function(
+                lambda x: self.model(x, training=False),
+                input_signature=[signature]
+            )
+            self.warmup(warmup_batch_sizes)
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+    @classmethod
+    def from_path(cls, model_path: str, **kwargs) -> "CompiledBiLSTM":
+        """
+        Load a saved Keras model (.keras or .h5) and wrap it.
+        """
+        try:
+            return cls(load_model(model_path, compile=False), **kwargs)
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def warmup(self, batch_sizes: Iterable[int]) -> None:
+        """
+        Trace the graph and touch every kernel before real traffic arrives.
+        """
+        for batch_size in batch_sizes:
+            self._forward(np.zeros(
+                (batch_size, self.sequence_length, self.num_features), dtype=np.float32
+            ))
+        logging.info(
+            f"BiLSTM inference function compiled and warmed up for "
+            f"input shape (None, {self.sequence_length}, {self.num_features})."
+        )
+
+    def predict_proba(self, x: np.ndarray) -> np.ndarray:
+        """
+        Fraud probability for each sequence in an (n, steps, features) batch.
+        """
+        x = np.asarray(x, dtype=np.float32)
+        return self._forward(x).numpy()[:, 0]
@@ -0,0 +1,187 @@
+import os
+import sys
+import json
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.exception import MyException
+from src.logger import logging
+
+
+# Probabilities are stored as uint16 steps of 1 / 65535.
+_QUANT_MAX = np.iinfo(np.uint16).max
+
+
+class MetaGrid:
+    """
+    Lookup-table stand-in for a fitted two-input meta model.
+
+    The meta model only ever sees (river_prob, bilstm_prob) in [0, 1]^2, so
+    its positive-class probability is sampled once on a grid over that
+    square, quantized to uint16, and scoring becomes a bilinear
+    interpolation between the four surrounding grid points: a few array
+    operations for any batch size, instead of walking every tree.
+
+    Each axis has `resolution` evenly spaced points, plus `resolution`
+    quantiles of the calibration inputs when given, so the grid is densest
+    where real scores fall (base-model probabilities bunch up near 0).
+    `predict_proba`, `predict` and `classes_` mirror the scikit-learn API,
+    so serving code can use either object.
+    """
+
+    def __init__(
+        self,
+        river_axis: np.ndarray,
+        bilstm_axis: np.ndarray,
+        grid: np.ndarray,
+        classes: np.ndarray,
+        report: Optional[Dict[str, Any]] = None
+    ):
+        self.axes = (np.asarray(river_axis, dtype=np.float64), np.asarray(bilstm_axis, dtype=np.float64))
+        self.grid = np.asarray(grid, dtype=np.uint16)
+        self.classes_ = np.asarray(classes)
+        self.report = report or {}
+        # Dequantized once; the interpolation works on float32.
+        self._values = self.grid.astype(np.float32) / _QUANT_MAX
+
+    @staticmethod
+    def _axis(resolution: int, calibration: Optional[np.ndarray]) -> np.ndarray:
+        axis = np.linspace(0.0, 1.0, resolution)
+        if calibration is not None and len(calibration):
+            quantiles = np.quantile(np.clip(calibration, 0.0, 1.0), np.linspace(0.0, 1.0, resolution))
+            axis = np.unique(np.concatenate([axis, quantiles]))
+        return axis
+
+    @classmethod
+    def compile(
+        cls,
+        model,
+        resolution: int = 257,
+        X_calibration: Optional[np.ndarray] = None,
+        batch_size: int = 65536
+    ) -> "MetaGrid":
+        """
+        Sample `model.predict_proba` on the grid.
+        """
+        try:
+            if resolution < 2:
+                raise ValueError("The grid needs at least 2 points per axis.")
+            if len(model.classes_) != 2:
+                raise ValueError(f"Expected a binary meta model, got classes {model.classes_}.")
+
+            if X_calibration is not None:
+                X_calibration = np.asarray(X_calibration, dtype=np.float64)
+            river_axis, bilstm_axis = (
+                cls._axis(resolution, None if X_calibration is None else X_calibration[:, k])
+                for k in (0, 1)
+            )
+            river, bilstm = np.meshgrid(river_axis, bilstm_axis, indexing="ij")
+            points = np.column_stack([river.ravel(), bilstm.ravel()])
+            probs = np.concatenate([
+                model.predict_proba(points[start:start + batch_size])[:, 1]
+                for start in range(0, len(points), batch_size)
+            ])
+            grid = np.rint(probs.reshape(river.shape) * _QUANT_MAX).astype(np.uint16)
+
+            logging.info(f"Compiled meta model into a {grid.shape[0]}x{grid.shape[1]} probability grid.")
+            return cls(river_axis, bilstm_axis, grid, model.classes_)
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+    @property
+    def shape(self):
+        return self.grid.shape
+
+    def predict_positive(self, X: np.ndarray) -> np.ndarray:
+        """
+        Interpolated positive-class probability for each (river, bilstm) row.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        cells, fracs = [], []
+        for k, axis in enumerate(self.axes):
+            x = np.clip(X[:, k], 0.0, 1.0)
+            i = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, len(axis) - 2)
+            cells.append(i)
+            fracs.append(((x - axis[i]) / (axis[i + 1] - axis[i])).astype(np.float32))
+        (i, j), (fi, fj) = cells, fracs
+        values = self._values
+        top = values[i, j] * (1 - fj) + values[i, j + 1] * fj
+        bottom = values[i + 1, j] * (1 - fj) + values[i + 1, j + 1] * fj
+        return top * (1 - fi) + bottom * fi
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        positive = self.predict_positive(X).astype(np.float64)
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        # Ties go to the first class, as with argmax over predict_proba.
+        return self.classes_[(self.predict_positive(X) > 0.5).astype(np.intp)]
+
+    def deviation_report(self, model, X_val: np.ndarray, y_val: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Max/mean absolute probability difference and label agreement
+        against the original model on `X_val` (and both AUCs, given
+        `y_val`). Kept on `self.report` and saved with the grid.
+        """
+        try:
+            X_val = np.asarray(X_val, dtype=np.float64)
+            if not len(X_val):
+                raise ValueError("The deviation report needs at least one validation row.")
+            reference = model.predict_proba(X_val)
+            positive = self.predict_positive(X_val)
+            deviation = np.abs(positive - reference[:, 1])
+            agreement = self.predict(X_val) == model.classes_[np.argmax(reference, axis=1)]
+
+            self.report = {
+                "shape": list(self.shape),
+                "validation_rows": int(len(X_val)),
+                "max_abs_deviation": float(deviation.max()),
+                "mean_abs_deviation": float(deviation.mean()),
+                "p99_abs_deviation": float(np.quantile(deviation, 0.99)),
+                "label_agreement": float(agreement.mean()),
+            }
+            if y_val is not None and len(np.unique(y_val)) > 1:
+                # Imported here so serving from a saved grid never loads scikit-learn.
+                from sklearn.metrics import roc_auc_score
+                self.report["model_auc"] = float(roc_auc_score(y_val, reference[:, 1]))
+                self.report["grid_auc"] = float(roc_auc_score(y_val, positive))
+
+            logging.info(f"Meta grid deviation report: {self.report}")
+            return self.report
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def save(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = os.path.join(os.path.dirname(path), "tmp-" + os.path.basename(path))
+            with open(tmp_path, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    river_axis=self.axes[0],
+                    bilstm_axis=self.axes[1],
+                    grid=self.grid,
+                    classes=self.classes_,
+                    report=json.dumps(self.report)
+                )
+            os.replace(tmp_path, path)
+            logging.info(f"Meta grid saved to {path} ({os.path.getsize(path)} bytes).")
+        except Exception as e:
+            raise MyException(e, sys)
+
+    @classmethod
+    def load(cls, path: str) -> "MetaGrid":
+        try:
+            with np.load(path) as data:
+                return cls(
+                    data["river_axis"],
+                    data["bilstm_axis"],
+                    data["grid"],
+                    data["classes"],
+                    json.loads(str(data["report"]))
+                )
+        except Exception as e:
+            raise MyException(e, sys)
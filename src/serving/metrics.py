@@ -0,0 +1,304 @@
+import time
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+
+# Seconds; spans a cache hit (~1e-4) up to a cold BiLSTM call.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# (sample name, ((label, value), ...), value): one exposition line.
+Sample = Tuple[str, Tuple[Tuple[str, str], ...], float]
+
+
+def _format_sample(name: str, labels: Sequence[Sequence[str]], value: float) -> str:
+    pairs = ",".join(f'{label}="{_escape(label_value)}"' for label, label_value in labels)
+    return f"{name}{{{pairs}}} {_format_value(value)}" if pairs else f"{name} {_format_value(value)}"
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class _NullChild:
+    """
+    Stand-in returned by every metric of a disabled registry.
+    """
+    __slots__ = ()
+
+    def inc(self, amount: float = 1.0) -> None:
+        pass
+
+    def observe(self, value: float) -> None:
+        pass
+
+    def time(self) -> "_NullChild":
+        return self
+
+    def __enter__(self) -> "_NullChild":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_CHILD = _NullChild()
+
+
+class _CounterChild:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: "_HistogramChild"):
+        self._child = child
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._child.observe(time.perf_counter() - self._start)
+
+
+class _HistogramChild:
+    __slots__ = ("_lock", "_bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+
+class _Family:
+    """
+    A named metric with a fixed list of label names; `labels(*values)`
+    returns (and caches) the child for one combination of label values.
+    Hot paths should bind their children once and reuse them.
+    """
+    kind = ""
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str], enabled: bool):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.enabled = enabled
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        if not self.enabled:
+            return _NULL_CHILD
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _snapshot(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return sorted(self._children.items())
+
+    def _labels(self, values: Tuple[str, ...]) -> Tuple[Tuple[str, str], ...]:
+        return tuple(zip(self.label_names, values))
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def collect(self) -> List[Sample]:
+        return [(self.name, self._labels(values), child.value) for values, child in self._snapshot()]
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str], enabled: bool,
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, label_names, enabled)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def collect(self) -> List[Sample]:
+        samples = []
+        for values, child in self._snapshot():
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            labels = self._labels(values)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                samples.append((f"{self.name}_bucket", labels + (("le", le),), cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class CallbackMetric:
+    """
+    A counter or gauge whose values are read from `fn` at scrape time, for
+    state another component already tracks (cache counters, queue depth).
+    `fn` returns a number, or a dict of label value -> number. `shared`
+    marks state common to every worker process (e.g. a shared-memory
+    cache): it is reported once, without the registry's constant labels.
+    """
+
+    def __init__(self, name: str, help: str, kind: str, fn: Callable[[], Union[float, Dict[str, float]]],
+                 label_name: Optional[str] = None, shared: bool = False):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.fn = fn
+        self.label_name = label_name
+        self.shared = shared
+
+    def collect(self) -> List[Sample]:
+        value = self.fn()
+        if isinstance(value, dict):
+            return [(self.name, ((self.label_name, str(label)),), item) for label, item in sorted(value.items())]
+        return [(self.name, (), value)]
+
+
+class MetricsRegistry:
+    """
+    Minimal Prometheus-style metrics: counters, fixed-bucket histograms and
+    scrape-time callbacks, rendered in the text exposition format.
+
+    Every registry has a `<namespace>_stage_seconds{stage}` histogram, and
+    `time(stage)` times a block into it, so any scoring path can report its
+    stages the same way. A disabled registry hands out shared no-op
+    children: instrumented code then costs one attribute lookup and an
+    empty `with` block per stage.
+
+    With several worker processes, `set_constant_labels(worker=...)` tags
+    every per-process series, and `render(others)` merges the families
+    other workers collected (see `WorkerExports`) into one exposition.
+    """
+
+    def __init__(self, enabled: bool = True, namespace: str = "smartfraudx"):
+        self.enabled = enabled
+        self.namespace = namespace
+        self.constant_labels: Tuple[Tuple[str, str], ...] = ()
+        self._metrics: Dict[str, object] = {}
+        self.stage_seconds = self.histogram(
+            "stage_seconds", "Time spent in each scoring stage.", ("stage",)
+        )
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def _full_name(self, name: str) -> str:
+        return f"{self.namespace}_{name}" if self.namespace else name
+
+    def counter(self, name: str, help: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self._full_name(name), help, label_names, self.enabled))
+
+    def histogram(self, name: str, help: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(self._full_name(name), help, label_names, self.enabled, buckets))
+
+    def callback(self, name: str, help: str, fn: Callable, kind: str = "gauge",
+                 label_name: Optional[str] = None, shared: bool = False) -> Optional[CallbackMetric]:
+        if not self.enabled:
+            return None
+        return self._register(CallbackMetric(self._full_name(name), help, kind, fn, label_name, shared))
+
+    def set_constant_labels(self, **labels: str) -> None:
+        """
+        Labels added to every per-process series, e.g. worker="2".
+        """
+        self.constant_labels = tuple((name, str(value)) for name, value in labels.items())
+
+    def time(self, stage: str):
+        """
+        Context manager timing one stage into `stage_seconds`.
+        """
+        return self.stage_seconds.labels(stage).time()
+
+    def collect(self, include_shared: bool = True) -> List[Dict[str, Any]]:
+        """
+        JSON-serializable families: name, help, kind and samples.
+        """
+        families = []
+        for metric in self._metrics.values():
+            shared = getattr(metric, "shared", False)
+            if shared and not include_shared:
+                continue
+            constant = () if shared else self.constant_labels
+            families.append({
+                "name": metric.name,
+                "help": metric.help,
+                "kind": metric.kind,
+                "samples": [(name, constant + tuple(labels), value) for name, labels, value in metric.collect()],
+            })
+        return families
+
+    def render(self, others: Iterable[List[Dict[str, Any]]] = ()) -> str:
+        """
+        Text exposition of this registry, merged with families collected by
+        other processes (`collect(include_shared=False)` there).
+        """
+        merged: Dict[str, Dict[str, Any]] = {}
+        for families in [self.collect(), *others]:
+            for family in families:
+                entry = merged.setdefault(family["name"], {**family, "samples": []})
+                entry["samples"].extend(family["samples"])
+
+        lines: List[str] = []
+        for family in merged.values():
+            lines.append(f"# HELP {family['name']} {family['help']}")
+            lines.append(f"# TYPE {family['name']} {family['kind']}")
+            lines.extend(_format_sample(*sample) for sample in family["samples"])
+        return "\n".join(lines) + "\n"
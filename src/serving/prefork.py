@@ -0,0 +1,295 @@
+import gc
+import os
+import sys
+import glob
+import json
+import mmap
+import time
+import signal
+import socket
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from werkzeug.serving import make_server
+
+from src.exception import MyException
+from src.logger import logging
+
+
+_SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty", "Swap")
+
+
+def process_memory(pid: int) -> Dict[str, float]:
+    """
+    Memory of one process in MiB. `pss_mb` charges each shared page
+    1/n to each of the n processes mapping it, so summing it over the
+    master and workers gives their real combined footprint; `shared_mb`
+    and `private_mb` split `rss_mb` into pages mapped by other processes
+    too (e.g. models inherited copy-on-write) and pages only this one has.
+    Linux only; elsewhere the dict is empty.
+    """
+    kb: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in _SMAPS_FIELDS:
+                    kb[name] = int(rest.split()[0])
+    except OSError:
+        return {}
+    return {
+        "rss_mb": round(kb.get("Rss", 0) / 1024, 1),
+        "pss_mb": round(kb.get("Pss", 0) / 1024, 1),
+        "shared_mb": round((kb.get("Shared_Clean", 0) + kb.get("Shared_Dirty", 0)) / 1024, 1),
+        "private_mb": round((kb.get("Private_Clean", 0) + kb.get("Private_Dirty", 0)) / 1024, 1),
+        "swap_mb": round(kb.get("Swap", 0) / 1024, 1),
+    }
+
+
+def memory_report(master_pid: Optional[int], worker_pids: List[int]) -> Dict[str, Any]:
+    """
+    Per-process memory of the master and its workers, plus totals.
+    """
+    workers = [
+        {"worker": worker_id, "pid": pid, **process_memory(pid)}
+        for worker_id, pid in enumerate(worker_pids) if pid
+    ]
+    master = {"pid": master_pid, **process_memory(master_pid)} if master_pid else None
+    processes = workers + ([master] if master else [])
+    return {
+        "master": master,
+        "workers": workers,
+        "total_rss_mb": round(sum(p.get("rss_mb", 0.0) for p in processes), 1),
+        "total_pss_mb": round(sum(p.get("pss_mb", 0.0) for p in processes), 1),
+    }
+
+
+class WorkerExports:
+    """
+    State a worker publishes for its siblings: `export()` is written to
+    `<directory>/worker-<id>.json` every `interval_s` seconds, and
+    `others()` reads the other workers' latest files. Any worker can then
+    answer for all of them (e.g. /metrics), with the others' values at
+    most `interval_s` old.
+    """
+
+    def __init__(self, directory: str, worker_id: int, export: Callable[[], Any], interval_s: float = 1.0):
+        self.directory = directory
+        self.worker_id = worker_id
+        self.export = export
+        self.interval_s = interval_s
+        self.path = os.path.join(directory, f"worker-{worker_id}.json")
+
+    def write(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.export(), f)
+        os.replace(tmp_path, self.path)
+
+    def start(self) -> "WorkerExports":
+        def run():
+            while True:
+                try:
+                    self.write()
+                except Exception as e:
+                    logging.error(f"Worker {self.worker_id} export failed: {e}")
+                time.sleep(self.interval_s)
+
+        threading.Thread(target=run, name="worker-exports", daemon=True).start()
+        return self
+
+    def others(self) -> Dict[int, Any]:
+        """
+        Latest export of every other worker, by worker id.
+        """
+        exports = {}
+        for path in glob.glob(os.path.join(self.directory, "worker-*.json")):
+            worker_id = int(os.path.basename(path)[len("worker-"):-len(".json")])
+            if worker_id == self.worker_id:
+                continue
+            try:
+                with open(path) as f:
+                    exports[worker_id] = json.load(f)
+            except (OSError, ValueError):
+                continue  # removed while we read it (the master clears the directory at startup)
+        return exports
+
+
+class PreforkServer:
+    """
+    Pre-fork WSGI server.
+
+    The master binds the listening socket, and whatever the app loaded
+    before `serve_forever()` is inherited by `workers` forked processes,
+    which share those pages copy-on-write instead of each loading their
+    own copy. `gc.freeze()` runs just before forking so the workers'
+    garbage collector never writes to (and so copies) the inherited
+    objects. Each worker accepts on the shared socket with a threaded
+    werkzeug server.
+
+    Threads do not survive fork(): `post_fork(worker_id)` runs in each
+    new worker before it accepts connections, to start the worker's own
+    threads and load anything that cannot be shared, and
+    `worker_exit(worker_id)` runs when it stops. The master restarts
+    workers that die after they became ready, and on SIGTERM or SIGINT
+    stops every worker (SIGTERM, then SIGKILL after `graceful_timeout`).
+    """
+
+    def __init__(
+        self,
+        app,
+        host: str,
+        port: int,
+        workers: int,
+        post_fork: Optional[Callable[[int], None]] = None,
+        worker_exit: Optional[Callable[[int], None]] = None,
+        backlog: int = 2048,
+        graceful_timeout: float = 30.0
+    ):
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.post_fork = post_fork
+        self.worker_exit = worker_exit
+        self.backlog = backlog
+        self.graceful_timeout = graceful_timeout
+        self.master_pid: Optional[int] = None  # set by serve_forever, which may run in a child
+
+        # (pid, ready) per worker slot in an anonymous shared mapping, so the
+        # master and every worker see the same table.
+        self._table_buffer = mmap.mmap(-1, workers * 2 * np.dtype(np.int64).itemsize)
+        self._table = np.frombuffer(self._table_buffer, dtype=np.int64).reshape(workers, 2)
+        self._socket: Optional[socket.socket] = None
+        self._stopping = False
+
+    def worker_pids(self) -> List[int]:
+        return [int(pid) for pid in self._table[:, 0]]
+
+    def memory_report(self) -> Dict[str, Any]:
+        report = memory_report(self.master_pid, self.worker_pids())
+        for worker in report["workers"]:
+            worker["ready"] = bool(self._table[worker["worker"], 1])
+        return report
+
+    def _bind(self) -> None:
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        self._socket = socket.create_server((self.host, self.port), family=family, backlog=self.backlog)
+        # Every worker polls the same socket; the ones that lose the race for a
+        # connection must get EAGAIN from accept() instead of blocking in it.
+        self._socket.setblocking(False)
+        self.port = self._socket.getsockname()[1]
+
+    def _spawn(self, worker_id: int) -> None:
+        self._table[worker_id] = 0
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = self._run_worker(worker_id)
+            finally:
+                # Never return into the master's code path.
+                os._exit(code)
+        self._table[worker_id, 0] = pid
+        logging.info(f"Started worker {worker_id} (pid {pid}).")
+
+    def _run_worker(self, worker_id: int) -> int:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        # Ctrl-C reaches the whole process group; the master turns it into SIGTERM.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        try:
+            if self.post_fork is not None:
+                self.post_fork(worker_id)
+            server = make_server(self.host, self.port, self.app, threaded=True, fd=self._socket.fileno())
+            # shutdown() waits for serve_forever() to return, so it cannot run in the handler itself.
+            signal.signal(
+                signal.SIGTERM,
+                lambda *_: threading.Thread(target=server.shutdown, daemon=True).start()
+            )
+            self._table[worker_id, 1] = 1
+            server.serve_forever()
+            if self.worker_exit is not None:
+                self.worker_exit(worker_id)
+            return 0
+        except Exception as e:
+            logging.error(f"Worker {worker_id} (pid {os.getpid()}) failed: {e}")
+            return 1
+        finally:
+            logging.shutdown()
+
+    def _stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            for worker_id, (worker_pid, ready) in enumerate(self._table.tolist()):
+                if worker_pid != pid:
+                    continue
+                self._table[worker_id, 0] = 0
+                if self._stopping:
+                    break
+                code = os.waitstatus_to_exitcode(status)
+                if not ready:
+                    raise RuntimeError(f"Worker {worker_id} exited with {code} before it was ready")
+                logging.error(f"Worker {worker_id} (pid {pid}) exited with {code}; restarting it.")
+                self._spawn(worker_id)
+
+    def _stop_workers(self) -> None:
+        self._stopping = True
+        for pid in self.worker_pids():
+            if pid:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+        deadline = time.monotonic() + self.graceful_timeout
+        while any(self.worker_pids()) and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+        for pid in self.worker_pids():
+            if pid:
+                logging.error(f"Worker pid {pid} did not stop within {self.graceful_timeout}s; killing it.")
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+
+    def serve_forever(self) -> None:
+        """
+        Fork the workers and supervise them until SIGTERM or SIGINT.
+        """
+        self.master_pid = os.getpid()
+        try:
+            self._bind()
+            signal.signal(signal.SIGTERM, self._stop)
+            signal.signal(signal.SIGINT, self._stop)
+            gc.freeze()
+            for worker_id in range(self.workers):
+                self._spawn(worker_id)
+            logging.info(f"Serving on {self.host}:{self.port} with {self.workers} workers.")
+
+            reported = False
+            while not self._stopping:
+                self._reap()
+                if not reported and self._table[:, 1].all():
+                    logging.info(f"All workers ready; memory: {self.memory_report()}")
+                    reported = True
+                time.sleep(0.2)
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+        finally:
+            if os.getpid() == self.master_pid:
+                self._stop_workers()
+                if self._socket is not None:
+                    self._socket.close()
+                logging.info("All workers stopped.")
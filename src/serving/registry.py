@@ -0,0 +1,238 @@
+import os
+import sys
+import time
+import pickle
+import hashlib
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.constants import META_GRID_PATH, META_SCORING_MODE, META_GRID_MIN_AGREEMENT
+from src.exception import MyException
+from src.logger import logging
+from src.serving.features import FEATURE_NAMES
+from src.serving.meta_grid import MetaGrid
+
+
+class ModelRegistry:
+    """
+    Owns the three serving models and loads them concurrently.
+
+    `start()` returns immediately and loads the meta model, River model and
+    BiLSTM in a thread pool, so Flask can bind and answer liveness probes
+    while TensorFlow is still importing. `ready` only flips once every model
+    is loaded and has run a warm-up prediction.
+
+    The meta model is either the pickled forest or its compiled `MetaGrid`
+    (`meta_scoring`); both expose `predict_proba` and `classes_`. In "auto"
+    mode the grid is used when it exists and its saved deviation report
+    shows at least `meta_grid_min_agreement` label agreement.
+
+    `version` identifies the loaded model files (paths, sizes, mtimes and
+    the meta backend), for keying cached scores. `reload()` loads the
+    models again and then notifies every reload listener.
+
+    For pre-forked serving, `load_for_fork()` loads only what worker
+    processes can inherit, and each worker then calls `load(["bilstm"])`.
+    """
+
+    def __init__(
+        self,
+        meta_model_path: str = "artifact/meta_model.pkl",
+        river_model_path: str = "artifact/hk/model_trainer/model.pkl",
+        bilstm_model_path: str = "artifacts/model_trainer/best_bilstm_model.keras",
+        warmup_batch_sizes: Iterable[int] = (1, 32),
+        meta_grid_path: str = META_GRID_PATH,
+        meta_scoring: str = META_SCORING_MODE,
+        meta_grid_min_agreement: float = META_GRID_MIN_AGREEMENT
+    ):
+        if meta_scoring not in ("auto", "grid", "forest"):
+            raise ValueError(f"Unknown meta scoring mode: {meta_scoring}")
+        self.meta_model_path = meta_model_path
+        self.meta_grid_path = meta_grid_path
+        self.meta_scoring = meta_scoring
+        self.meta_grid_min_agreement = meta_grid_min_agreement
+        self.meta_backend: Optional[str] = None
+        self.version = ""
+        self._reload_listeners: List[Callable[[], None]] = []
+        self.river_model_path = river_model_path
+        self.bilstm_model_path = bilstm_model_path
+        self.warmup_batch_sizes = tuple(warmup_batch_sizes)
+
+        self.meta_model = None
+        self.river_model = None
+        self.bilstm_model = None
+
+        self.import_times: Dict[str, float] = {}
+        self.load_times: Dict[str, float] = {}
+        self.total_load_time: Optional[float] = None
+        self.error: Optional[BaseException] = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def _timed_import(self, module_name: str) -> None:
+        if module_name in self.import_times:
+            return  # already imported, e.g. by the master before forking
+        start = time.perf_counter()
+        importlib.import_module(module_name)
+        self.import_times[module_name] = time.perf_counter() - start
+
+    def _load_meta_grid(self) -> Optional[MetaGrid]:
+        if self.meta_scoring == "forest":
+            return None
+        if not os.path.exists(self.meta_grid_path):
+            if self.meta_scoring == "grid":
+                raise FileNotFoundError(f"No compiled meta grid at {self.meta_grid_path}")
+            return None
+
+        grid = MetaGrid.load(self.meta_grid_path)
+        agreement = grid.report.get("label_agreement", 0.0)
+        if self.meta_scoring == "auto" and agreement < self.meta_grid_min_agreement:
+            logging.info(
+                f"Meta grid {self.meta_grid_path} agrees with the meta model on {agreement:.2%} "
+                f"of validation labels (< {self.meta_grid_min_agreement:.2%}); serving the forest."
+            )
+            return None
+        return grid
+
+    def _load_meta(self) -> None:
+        start = time.perf_counter()
+        meta_model = self._load_meta_grid()
+        if meta_model is None:
+            self._timed_import("sklearn")
+            start = time.perf_counter()
+            with open(self.meta_model_path, "rb") as f:
+                meta_model = pickle.load(f)
+        meta_model.predict_proba(np.zeros((1, 2)))
+        self.meta_model = meta_model
+        self.meta_backend = "grid" if isinstance(meta_model, MetaGrid) else "forest"
+        self.load_times["meta"] = time.perf_counter() - start
+
+    def _load_river(self) -> None:
+        self._timed_import("river")
+        start = time.perf_counter()
+        with open(self.river_model_path, "rb") as f:
+            river_model = pickle.load(f)
+        river_model.predict_proba_one(dict.fromkeys(FEATURE_NAMES, 0.0))
+        self.river_model = river_model
+        self.load_times["river"] = time.perf_counter() - start
+
+    def _load_bilstm(self) -> None:
+        self._timed_import("tensorflow")
+        # Imported here so that importing the registry never pulls in TensorFlow.
+        from src.serving.inference import CompiledBiLSTM
+
+        start = time.perf_counter()
+        self.bilstm_model = CompiledBiLSTM.from_path(
+            self.bilstm_model_path, warmup_batch_sizes=self.warmup_batch_sizes
+        )
+        self.load_times["bilstm"] = time.perf_counter() - start
+
+    def _model_version(self) -> str:
+        meta_path = self.meta_grid_path if self.meta_backend == "grid" else self.meta_model_path
+        digest = hashlib.blake2b(self.meta_backend.encode(), digest_size=8)
+        for path in (meta_path, self.river_model_path, self.bilstm_model_path):
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+
+    def add_reload_listener(self, listener: Callable[[], None]) -> None:
+        """
+        Call `listener()` after every successful reload.
+        """
+        self._reload_listeners.append(listener)
+
+    def load(self, names: Optional[Iterable[str]] = None) -> "ModelRegistry":
+        """
+        Load and warm up the named models ("bilstm", "river", "meta"; all of
+        them by default), blocking until done. `ready` flips once all three
+        are loaded.
+        """
+        try:
+            reloading = self.ready
+            loaders = {"bilstm": self._load_bilstm, "river": self._load_river, "meta": self._load_meta}
+            names = list(loaders) if names is None else list(names)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="model-loader") as pool:
+                futures = [pool.submit(loaders[name]) for name in names]
+                for future in futures:
+                    future.result()
+            elapsed = time.perf_counter() - start
+            # A partial load (a pre-forked worker's BiLSTM) adds to the one before it.
+            partial = not reloading and self.total_load_time is not None
+            self.total_load_time = self.total_load_time + elapsed if partial else elapsed
+            if any(model is None for model in (self.bilstm_model, self.river_model, self.meta_model)):
+                return self
+            self.version = self._model_version()
+
+            self._ready.set()
+            logging.info(f"Model registry ready: {self.startup_report()}")
+            if reloading:
+                for listener in self._reload_listeners:
+                    listener()
+            return self
+
+        except Exception as e:
+            self.error = e
+            logging.error(f"Model registry failed to load: {e}")
+            raise MyException(e, sys)
+
+    def load_for_fork(self) -> "ModelRegistry":
+        """
+        Load everything forked workers can share: the River and meta
+        models, plus the TensorFlow modules. TensorFlow's runtime threads
+        do not survive fork() (a worker deadlocks on its first op once the
+        parent has run one), so the BiLSTM itself is left to each worker.
+        """
+        try:
+            self._timed_import("tensorflow")
+            importlib.import_module("src.serving.inference")
+        except Exception as e:
+            self.error = e
+            raise MyException(e, sys)
+        return self.load(["river", "meta"])
+
+    def reload(self) -> "ModelRegistry":
+        """
+        Load the model files again, e.g. after retraining. Requests keep
+        being served while the models are swapped in one by one.
+        """
+        return self.load()
+
+    def start(self) -> "ModelRegistry":
+        """
+        Load models in the background and return immediately.
+        """
+        def run():
+            try:
+                self.load()
+            except MyException:
+                pass  # already logged and kept on self.error for the readiness probe
+
+        self._thread = threading.Thread(target=run, name="model-registry", daemon=True)
+        self._thread.start()
+        return self
+
+    def startup_report(self) -> Dict[str, Any]:
+        """
+        Per-model load time and per-library import time, in seconds.
+        """
+        return {
+            "ready": self.ready,
+            "error": None if self.error is None else str(self.error),
+            "total_load_s": self.total_load_time,
+            "load_s": dict(self.load_times),
+            "import_s": dict(self.import_times),
+            "meta_backend": self.meta_backend,
+            "version": self.version,
+        }
@@ -0,0 +1,259 @@
+import time
+import pickle
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.serving.shared_memory import allocate
+
+
+def score_key(
+    row: np.ndarray,
+    version: str,
+    sequence: Optional[np.ndarray] = None,
+    customer_id: Optional[str] = None
+) -> bytes:
+    """
+    Canonical key for one scoring input: a 16-byte BLAKE2b digest of the
+    encoded feature row (so "1", 1 and true all hash alike once encoded),
+    the model version and, for rows scored against a customer's history,
+    the customer id and their BiLSTM window (None for a new customer).
+    """
+    # Adding 0.0 folds -0.0 into 0.0, which would otherwise hash differently.
+    digest = hashlib.blake2b(np.ascontiguousarray(row + 0.0).tobytes(), digest_size=16)
+    digest.update(version.encode())
+    if customer_id is not None:
+        digest.update(b"\x00customer:" + customer_id.encode())
+    if sequence is not None:
+        digest.update(np.ascontiguousarray(sequence).tobytes())
+    return digest.digest()
+
+
+class ScoreCache:
+    """
+    Thread-safe LRU cache of score results with a per-entry TTL.
+
+    At most `max_entries` results are kept; the least recently used one is
+    evicted to make room, and entries older than `ttl_s` are dropped when
+    they are next looked up. One lock guards the OrderedDict, and a lookup
+    is a dict probe plus a move-to-end, so a miss costs about as much as
+    hashing the key. `max_entries=0` disables the cache.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_s: float = 30.0):
+        if max_entries < 0:
+            raise ValueError("max_entries must be >= 0")
+        if ttl_s <= 0:
+            raise ValueError("ttl_s must be > 0")
+
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[bytes, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes) -> Optional[Any]:
+        """
+        Cached result for `key`, or None. Callers must not mutate it.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, value = entry
+            if expires <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: bytes, value: Any) -> None:
+        if not self.max_entries:
+            return
+        expires = time.monotonic() + self.ttl_s
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self) -> None:
+        """
+        Drop every entry, e.g. after the models were reloaded.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# Slots of SharedScoreCache's counter array.
+_HITS, _MISSES, _EVICTIONS, _EXPIRATIONS, _INVALIDATIONS, _CLOCK = range(6)
+
+
+class SharedScoreCache:
+    """
+    `ScoreCache` for pre-forked workers (see serve.py): the entries live in
+    shared memory created before the fork, so a retry is answered from the
+    cache whichever worker it lands on, and `stats()` covers all workers.
+
+    The table is set-associative: a key hashes to one set of `ways` slots,
+    and a full set evicts its least recently used entry, so eviction is
+    approximately LRU. Values are pickled into fixed `value_bytes` slots;
+    larger ones are not cached. A process-shared lock guards the table.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_s: float = 30.0, ways: int = 8, value_bytes: int = 512):
+        if max_entries < 0:
+            raise ValueError("max_entries must be >= 0")
+        if ttl_s <= 0:
+            raise ValueError("ttl_s must be > 0")
+
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.ways = ways
+        self.value_bytes = value_bytes
+        self.n_sets = max(1, -(-max_entries // ways))
+        self._keys = allocate((self.n_sets, ways, 2), np.uint64)
+        self._expires = allocate((self.n_sets, ways), np.float64)  # 0 marks an empty slot
+        self._last_used = allocate((self.n_sets, ways), np.int64)
+        self._lengths = allocate((self.n_sets, ways), np.int32)
+        self._values = allocate((self.n_sets, ways, value_bytes), np.uint8)
+        self._counters = allocate(6, np.int64)
+        self._lock = multiprocessing.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @property
+    def hits(self) -> int:
+        return int(self._counters[_HITS])
+
+    @property
+    def misses(self) -> int:
+        return int(self._counters[_MISSES])
+
+    @property
+    def evictions(self) -> int:
+        return int(self._counters[_EVICTIONS])
+
+    @property
+    def expirations(self) -> int:
+        return int(self._counters[_EXPIRATIONS])
+
+    @property
+    def invalidations(self) -> int:
+        return int(self._counters[_INVALIDATIONS])
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._expires > time.monotonic()))
+
+    def _locate(self, key: bytes):
+        words = np.frombuffer(key, dtype=np.uint64, count=2)
+        index = int(words[0] % np.uint64(self.n_sets))
+        ways = np.flatnonzero((self._keys[index, :, 0] == words[0]) & (self._keys[index, :, 1] == words[1]))
+        return index, words, (int(ways[0]) if len(ways) else None)
+
+    def get(self, key: bytes) -> Optional[Any]:
+        """
+        Cached result for `key`, or None.
+        """
+        now = time.monotonic()
+        with self._lock:
+            index, _, way = self._locate(key)
+            if way is None or self._expires[index, way] == 0:
+                self._counters[_MISSES] += 1
+                return None
+            if self._expires[index, way] <= now:
+                self._expires[index, way] = 0
+                self._counters[_EXPIRATIONS] += 1
+                self._counters[_MISSES] += 1
+                return None
+            self._counters[_CLOCK] += 1
+            self._last_used[index, way] = self._counters[_CLOCK]
+            self._counters[_HITS] += 1
+            data = self._values[index, way, :self._lengths[index, way]].tobytes()
+        return pickle.loads(data)
+
+    def put(self, key: bytes, value: Any) -> None:
+        if not self.max_entries:
+            return
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.value_bytes:
+            return
+        now = time.monotonic()
+        with self._lock:
+            index, words, way = self._locate(key)
+            if way is None:
+                live = self._expires[index] > now
+                if live.all():
+                    way = int(np.argmin(self._last_used[index]))
+                    self._counters[_EVICTIONS] += 1
+                else:
+                    way = int(np.argmin(live))
+            self._keys[index, way] = words
+            self._values[index, way, :len(data)] = np.frombuffer(data, dtype=np.uint8)
+            self._lengths[index, way] = len(data)
+            self._expires[index, way] = now + self.ttl_s
+            self._counters[_CLOCK] += 1
+            self._last_used[index, way] = self._counters[_CLOCK]
+
+    def invalidate(self) -> None:
+        """
+        Drop every entry, e.g. after the models were reloaded.
+        """
+        with self._lock:
+            self._expires[...] = 0
+            self._counters[_INVALIDATIONS] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+            return {
+                "entries": len(self),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "shared": True,
+            }
@@ -0,0 +1,315 @@
+import os
+import sys
+import time
+import hashlib
+import threading
+import multiprocessing
+from typing import Hashable, Optional, Sequence
+
+import numpy as np
+
+from src.exception import MyException
+from src.logger import logging
+from src.serving.shared_memory import allocate
+
+
+def customer_key(customer_id: Hashable) -> int:
+    """
+    Non-zero 64-bit key for a customer id; ids compare as strings.
+    """
+    digest = hashlib.blake2b(str(customer_id).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+# Slots of the shared state array; _HEAD/_TAIL are the most and least
+# recently seen slots, -1 while the store is empty.
+_SIZE, _APPENDS, _EVICTIONS, _HEAD, _TAIL = range(5)
+
+
+class SequenceStore:
+    """
+    Per-customer history of the last `sequence_length` scored transactions.
+
+    All buffers live in one preallocated float32 slab of shape
+    (capacity, sequence_length, num_features). Each customer owns one slot
+    used as a ring buffer, so an append is a single row write plus a head
+    increment. When the slab is full the least recently seen customer is
+    evicted and its slot reused.
+
+    The index is array-based too: each slot holds the 64-bit key of its
+    customer, and the slots form a doubly-linked list in recency order
+    (`_prev`/`_next` hold slot numbers), so refreshing a customer and
+    finding the eviction victim are both O(1). Keys are found through an
+    open-addressing hash table with linear probing (`_index`, slot + 1 per
+    entry, 0 for empty) at most half full. With `shared=True` every array,
+    the table included, lives in shared memory behind a process-shared
+    lock, so workers forked after construction (see serve.py) read and
+    extend the same histories and see each other's customers.
+    """
+
+    # Per-slot bookkeeping besides the buffer itself: head, count, key, list links and index entry.
+    _SLOT_OVERHEAD_BYTES = 128
+
+    def __init__(
+        self,
+        sequence_length: int = 30,
+        num_features: int = 8,
+        max_customers: Optional[int] = None,
+        max_memory_mb: float = 64.0,
+        shared: bool = False
+    ):
+        self.sequence_length = sequence_length
+        self.num_features = num_features
+        self.shared = shared
+
+        slot_bytes = sequence_length * num_features * np.dtype(np.float32).itemsize
+        capacity = int(max_memory_mb * 1024 * 1024) // (slot_bytes + self._SLOT_OVERHEAD_BYTES)
+        if max_customers is not None:
+            capacity = min(capacity, max_customers)
+        if capacity < 1:
+            raise ValueError("Memory cap is too small to hold a single customer sequence")
+        self.capacity = capacity
+
+        self._buffers = allocate((capacity, sequence_length, num_features), np.float32, shared)
+        self._heads = allocate(capacity, np.int64, shared)
+        self._counts = allocate(capacity, np.int64, shared)
+        self._keys = allocate(capacity, np.uint64, shared)
+        self._prev = allocate(capacity, np.int64, shared)
+        self._next = allocate(capacity, np.int64, shared)
+        self._state = allocate(5, np.int64, shared)
+        self._state[_HEAD] = self._state[_TAIL] = -1
+        self._index = allocate(1 << (2 * capacity - 1).bit_length(), np.int64, shared)
+        self._mask = len(self._index) - 1
+        self._lock = multiprocessing.Lock() if shared else threading.Lock()
+        self._offsets = np.arange(sequence_length)
+
+        logging.info(
+            f"SequenceStore allocated for {capacity} customers "
+            f"({self._buffers.nbytes / (1024 * 1024):.1f} MiB{', shared' if shared else ''})."
+        )
+
+    def __len__(self) -> int:
+        return int(self._state[_SIZE])
+
+    @property
+    def appends(self) -> int:
+        return int(self._state[_APPENDS])
+
+    @property
+    def evictions(self) -> int:
+        return int(self._state[_EVICTIONS])
+
+    def _probe(self, key: int) -> int:
+        """
+        Index position holding `key`, or the empty position where it would go.
+        """
+        position = key & self._mask
+        while True:
+            entry = self._index[position]
+            if entry == 0 or self._keys[entry - 1] == key:
+                return position
+            position = (position + 1) & self._mask
+
+    def _find(self, key: int) -> Optional[int]:
+        entry = self._index[self._probe(key)]
+        return int(entry) - 1 if entry else None
+
+    def _remove(self, key: int) -> None:
+        """
+        Drop `key` from the index, shifting later entries of its probe run
+        back so lookups never stop early at the hole (no tombstones).
+        """
+        hole = self._probe(key)
+        position = hole
+        while True:
+            position = (position + 1) & self._mask
+            entry = self._index[position]
+            if entry == 0:
+                break
+            home = int(self._keys[entry - 1]) & self._mask
+            # Move the entry into the hole unless its home lies cyclically in (hole, position].
+            if (position - home) & self._mask >= (position - hole) & self._mask:
+                self._index[hole] = entry
+                hole = position
+        self._index[hole] = 0
+
+    def _unlink(self, slot: int) -> None:
+        prev, next_ = self._prev[slot], self._next[slot]
+        if prev >= 0:
+            self._next[prev] = next_
+        else:
+            self._state[_HEAD] = next_
+        if next_ >= 0:
+            self._prev[next_] = prev
+        else:
+            self._state[_TAIL] = prev
+
+    def _push_front(self, slot: int) -> None:
+        head = self._state[_HEAD]
+        self._prev[slot] = -1
+        self._next[slot] = head
+        if head >= 0:
+            self._prev[head] = slot
+        else:
+            self._state[_TAIL] = slot
+        self._state[_HEAD] = slot
+
+    def _touch(self, slot: int) -> None:
+        """
+        Mark `slot` as the most recently seen.
+        """
+        if self._state[_HEAD] != slot:
+            self._unlink(slot)
+            self._push_front(slot)
+
+    def _slot_for(self, key: int) -> int:
+        slot = self._find(key)
+        if slot is not None:
+            self._touch(slot)
+            return slot
+
+        size = int(self._state[_SIZE])
+        if size < self.capacity:
+            slot = size
+            self._state[_SIZE] = size + 1
+            self._push_front(slot)
+        else:
+            slot = int(self._state[_TAIL])
+            self._remove(int(self._keys[slot]))
+            self._state[_EVICTIONS] += 1
+            self._touch(slot)
+        self._heads[slot] = 0
+        self._counts[slot] = 0
+        self._keys[slot] = key
+        self._index[self._probe(key)] = slot + 1
+        return slot
+
+    def _window(self, slot: int) -> np.ndarray:
+        # Oldest-to-newest positions; short histories are front-padded with
+        # their earliest event, so an empty history matches the old tiling.
+        length = self.sequence_length
+        count = self._counts[slot]
+        k = np.maximum(self._offsets - (length - count), 0)
+        return self._buffers[slot, (self._heads[slot] - count + k) % length]
+
+    def peek(self, customer_id: Hashable) -> Optional[np.ndarray]:
+        """
+        Copy of the customer's current window, or None for an unknown
+        customer. Read-only: neither records anything nor refreshes LRU order.
+        """
+        key = customer_key(customer_id)
+        with self._lock:
+            slot = self._find(key)
+            return None if slot is None else self._window(slot)
+
+    def append(self, customer_id: Hashable, features: np.ndarray) -> np.ndarray:
+        """
+        Record one transaction and return the customer's window including it,
+        as a (sequence_length, num_features) float32 array.
+        """
+        key = customer_key(customer_id)
+        with self._lock:
+            slot = self._slot_for(key)
+            head = self._heads[slot]
+            self._buffers[slot, head] = features
+            self._heads[slot] = (head + 1) % self.sequence_length
+            self._counts[slot] = min(self._counts[slot] + 1, self.sequence_length)
+            self._state[_APPENDS] += 1
+            return self._window(slot)
+
+    def build_sequences(
+        self, customer_ids: Optional[Sequence[Optional[Hashable]]], matrix: np.ndarray
+    ) -> np.ndarray:
+        """
+        (n, sequence_length, num_features) BiLSTM input for a batch of rows.
+
+        Rows with a customer id are appended to that customer's history in
+        order; rows without one fall back to repeating the row over the window.
+        """
+        features = np.asarray(matrix, dtype=np.float32)
+        sequences = np.repeat(features[:, np.newaxis, :], self.sequence_length, axis=1)
+        if customer_ids is not None:
+            for i, customer_id in enumerate(customer_ids):
+                if customer_id is not None:
+                    sequences[i] = self.append(customer_id, features[i])
+        return sequences
+
+    def save(self, path: str) -> None:
+        """
+        Snapshot all customer histories to an .npz file, replacing it atomically.
+        """
+        try:
+            with self._lock:
+                # Least recently seen first, so `load` restores the LRU order.
+                slots = []
+                slot = self._state[_TAIL]
+                while slot >= 0:
+                    slots.append(slot)
+                    slot = self._prev[slot]
+                state = {
+                    "keys": self._keys[slots],
+                    "buffers": self._buffers[slots],
+                    "heads": self._heads[slots],
+                    "counts": self._counts[slots],
+                }
+
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **state)
+            os.replace(tmp_path, path)
+            logging.info(f"SequenceStore snapshot of {len(slots)} customers saved to {path}")
+
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def snapshot_periodically(self, path: str, interval_s: float) -> threading.Thread:
+        """
+        Save a snapshot every `interval_s` seconds from a daemon thread,
+        skipping intervals in which nothing was appended.
+        """
+        def run():
+            saved_at = self.appends
+            while True:
+                time.sleep(interval_s)
+                if self.appends == saved_at:
+                    continue
+                try:
+                    saved_at = self.appends
+                    self.save(path)
+                except Exception as e:
+                    logging.error(f"SequenceStore snapshot failed: {e}")
+
+        thread = threading.Thread(target=run, name="sequence-store-snapshot", daemon=True)
+        thread.start()
+        return thread
+
+    def load(self, path: str) -> None:
+        """
+        Restore histories from a snapshot written by `save`, oldest customers
+        first so LRU order survives the restart.
+        """
+        try:
+            with np.load(path) as state:
+                keys = state["keys"].tolist()
+                buffers, heads, counts = state["buffers"], state["heads"], state["counts"]
+
+            if buffers.shape[1:] != self._buffers.shape[1:]:
+                raise ValueError(
+                    f"Snapshot sequence shape {buffers.shape[1:]} does not match "
+                    f"store shape {self._buffers.shape[1:]}"
+                )
+
+            # Keep the most recent customers if the snapshot exceeds capacity.
+            start = max(len(keys) - self.capacity, 0)
+            with self._lock:
+                for i in range(start, len(keys)):
+                    slot = self._slot_for(int(keys[i]))
+                    self._buffers[slot] = buffers[i]
+                    self._heads[slot] = heads[i]
+                    self._counts[slot] = counts[i]
+
+            logging.info(f"SequenceStore restored {len(keys) - start} customers from {path}")
+
+        except Exception as e:
+            raise MyException(e, sys)
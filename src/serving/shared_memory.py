@@ -0,0 +1,15 @@
+import mmap
+
+import numpy as np
+
+
+def allocate(shape, dtype, shared: bool = True) -> np.ndarray:
+    """
+    Zeroed array, in an anonymous shared mapping when `shared` so that
+    processes forked afterwards read and write the same memory.
+    """
+    if not shared:
+        return np.zeros(shape, dtype=dtype)
+    count = int(np.prod(shape))
+    buffer = mmap.mmap(-1, max(count * np.dtype(dtype).itemsize, 1))
+    return np.frombuffer(buffer, dtype=dtype, count=count).reshape(shape)
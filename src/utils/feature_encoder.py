@@ -0,0 +1,139 @@
+import math
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+
+# (model feature name, request key) in the column order the BiLSTM was trained on.
+FEATURE_SPEC = (
+    ("Amount", "amount"),
+    ("HourOfDay", "hour_of_day"),
+    ("CustomerTenureMonths", "customer_tenure"),
+    ("NumTransactionsLast24h", "num_tx_last_24h"),
+    ("AvgTransactionAmount7d", "avg_tx_amount_7d"),
+    ("CardPresent", "card_present"),
+    ("IsInternational", "is_international"),
+    ("IsNewDevice", "is_new_device"),
+)
+
+FEATURE_NAMES = tuple(name for name, _ in FEATURE_SPEC)
+REQUEST_KEYS = tuple(key for _, key in FEATURE_SPEC)
+
+
+def _river_view(values: Sequence[float]) -> Dict[str, float]:
+    """
+    River view of an encoded row, keyed by model feature name.
+    """
+    return dict(zip(FEATURE_NAMES, values))
+
+
+class FeatureError(ValueError):
+    """
+    Raised when a payload cannot be mapped onto the model features.
+    """
+
+
+def check_finite(matrix: np.ndarray, keys: Sequence[str]) -> np.ndarray:
+    """
+    Raise FeatureError if any value of `matrix` (one column per key) is
+    missing or non-finite. Nulls encode as NaN, which would otherwise reach
+    the models and their outputs unnoticed.
+    """
+    # A NaN or inf anywhere makes the sum non-finite; summing a single row
+    # in Python is much cheaper than a NumPy call on it.
+    if matrix.ndim == 1 and math.isfinite(sum(matrix.tolist())):
+        return matrix
+    finite = np.isfinite(matrix)
+    if not finite.all():
+        bad = ~finite.reshape(-1, len(keys))
+        row = int(np.flatnonzero(bad.any(axis=1))[0])
+        fields = ", ".join(key for key, is_bad in zip(keys, bad[row]) if is_bad)
+        where = f" in row {row + 1}" if matrix.ndim > 1 else ""
+        raise FeatureError(f"Missing or non-finite values{where}: {fields}")
+    return matrix
+
+
+class FeatureEncoder:
+    """
+    Encodes records (dicts keyed by `keys`) into rows of the feature matrix.
+
+    The key lookup is compiled once into an `itemgetter`, and values are
+    written straight into a preallocated buffer, so encoding one record
+    costs one C-level lookup and one row assignment. Booleans become 0/1;
+    nulls and NaN/inf values are rejected with FeatureError.
+
+    Without `out`, results are views into the encoder's own buffer and are
+    overwritten by the next call; pass `out` to keep them (and to share one
+    encoder across threads).
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str] = FEATURE_NAMES,
+        dtype=np.float32,
+        capacity: int = 1024
+    ):
+        self.keys = tuple(keys)
+        self.dtype = np.dtype(dtype)
+        getter = itemgetter(*self.keys)
+        self._getter = getter if len(self.keys) > 1 else (lambda record: (getter(record),))
+        self._buffer = np.empty((capacity, len(self.keys)), dtype=self.dtype)
+
+    @property
+    def num_features(self) -> int:
+        return len(self.keys)
+
+    def _fill(self, out: np.ndarray, values) -> np.ndarray:
+        try:
+            out[...] = values
+        except (TypeError, ValueError) as e:
+            raise FeatureError(f"Features are not numeric: {e}")
+        return check_finite(out, self.keys)
+
+    def encode_one(self, record: Mapping[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        (num_features,) row for one record.
+        """
+        row = self._buffer[0] if out is None else out
+        try:
+            row[:] = self._getter(record)
+        except KeyError as e:
+            raise FeatureError(f"Missing fields: {e.args[0]}")
+        except (TypeError, ValueError) as e:
+            raise FeatureError(f"Features are not numeric: {e}")
+        return check_finite(row, self.keys)
+
+    def encode_many(
+        self, records: Iterable[Mapping[str, Any]], out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        (n, num_features) matrix for a batch of records.
+        """
+        try:
+            values = list(map(self._getter, records))
+        except KeyError as e:
+            raise FeatureError(f"Missing fields: {e.args[0]}")
+
+        n_rows = len(values)
+        if out is None:
+            if n_rows > len(self._buffer):
+                self._buffer = np.empty((max(n_rows, 2 * len(self._buffer)), self.num_features), dtype=self.dtype)
+            out = self._buffer[:n_rows]
+        if n_rows == 0:
+            return out
+        return self._fill(out, values)
+
+    @staticmethod
+    def river_dict(row: np.ndarray) -> Dict[str, float]:
+        """
+        River view of one encoded row, keyed by model feature name.
+        """
+        return _river_view(row.tolist())
+
+    @staticmethod
+    def river_dicts(matrix: np.ndarray) -> List[Dict[str, float]]:
+        """
+        River views of every row of an encoded matrix.
+        """
+        return [_river_view(row) for row in matrix.tolist()]
@@ -1,11 +1,20 @@
+import os
 import sys
 import numpy as np
-from typing import Tuple
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
 from sklearn.model_selection import train_test_split
 
 from src2.entity.config_entity import DataTransformationConfig
 from src.entity.artifact_entity import DataValidationArtifact
-from src2.entity.artifact_entity import DataTransformationArtifact
+from src.entity.config_entity import training_pipeline_config
+from src2.entity.artifact_entity import DataTransformationArtifact, StreamingTransformationArtifact
+from src2.components.sequence_builder import SequenceBuilder, SlidingWindows
+from src2.components.streaming_dataset import (
+    iter_record_chunks,
+    iter_shard_chunks,
+    read_shard_source,
+    write_shards,
+)
 from src.exception import MyException
 from src.logger import logging
 
@@ -23,55 +32,51 @@ class DataTransformation:
         self.validated_stream = validated_stream
         self.window_size = window_size
 
-    def _collect_sequences(self) -> Tuple[np.ndarray, np.ndarray]:
+    def _record_to_row(self, record, total_records: int):
+        """
+        Split a record into (features, label, group, order).
+
+        Records are either (features_dict, label) tuples from the ingestion
+        stream or flat sequences with the label last.
+        """
+        if isinstance(record, tuple) and len(record) == 2 and isinstance(record[0], dict):
+            raw_features, label = record
+            features = [float(raw_features[column]) for column in self.config.feature_columns]
+            if self.config.group_by is None:
+                return features, label, None, None
+            return (
+                features,
+                label,
+                raw_features[self.config.group_by],
+                raw_features[self.config.order_by],
+            )
+
+        record = list(record)
+        if len(record) < 2:
+            raise ValueError(
+                f"Record {total_records} has insufficient length (got {len(record)})."
+            )
+        if self.config.group_by is not None:
+            raise ValueError("Per-group windows need (features_dict, label) records.")
+        return record[:-1], record[-1], None, None
+
+    def _collect_sequences(self) -> Tuple[SlidingWindows, np.ndarray]:
         """
         Collect sequences from the validated stream for BiLSTM training.
         """
-        rolling_window = []
-        data_window = []
-        label_window = []
+        builder = SequenceBuilder(window_size=self.window_size)
         total_records = 0
-        expected_feature_len = None
 
         try:
             for record in self.validated_stream:
                 total_records += 1
-                record = list(record)
-
-                if len(record) < 2:
-                    raise ValueError(
-                        f"Record {total_records} has insufficient length (got {len(record)})."
-                    )
+                features, label, group, order = self._record_to_row(record, total_records)
+                builder.append(features, label, group, order)
 
-                label = record[-1]
-                features = record[:-1]
-
-                if expected_feature_len is None:
-                    expected_feature_len = len(features)
-                elif len(features) != expected_feature_len:
-                    raise ValueError(
-                        f"Record {total_records} has inconsistent feature length: "
-                        f"expected {expected_feature_len}, got {len(features)}."
-                    )
-
-                rolling_window.append(features)
-
-                logging.info(
-                    f"Record {total_records}: features length={len(features)}, rolling_window size={len(rolling_window)}"
-                )
-
-                if len(rolling_window) == self.window_size:
-                    data_window.append(np.array(rolling_window))
-                    label_window.append(label)
-                    rolling_window.pop(0)
-
-            if len(data_window) == 0:
-                raise ValueError(
-                    f"No sequences were created. Records processed: {total_records}, "
-                    f"window size: {self.window_size}. Reduce window size or ensure more data."
-                )
+                if total_records % 100_000 == 0:
+                    logging.info(f"Collected {total_records} records for sequence building.")
 
-            return np.array(data_window), np.array(label_window)
+            return builder.build(grouped=self.config.group_by is not None)
 
         except Exception as e:
             raise MyException(e, sys)
@@ -87,9 +92,12 @@ class DataTransformation:
             
             stratify = y if len(np.unique(y)) > 1 else None
 
-            x_train, x_val, y_train, y_val = train_test_split(
-                x, y, test_size=0.2, random_state=42, stratify=stratify
+            # Split window indices rather than arrays so no window is copied.
+            train_idx, val_idx = train_test_split(
+                np.arange(len(y)), test_size=self.config.validation_fraction, random_state=42, stratify=stratify
             )
+            x_train, x_val = x.subset(train_idx), x.subset(val_idx)
+            y_train, y_val = y[train_idx], y[val_idx]
 
             logging.info(
                 f"Data split complete. "
@@ -106,3 +114,57 @@ class DataTransformation:
 
         except Exception as e:
             raise MyException(e, sys)
+
+    def initiate_streaming_transformation(
+        self,
+        record_source: Callable[[], Iterator],
+        source_key: Optional[Dict[str, Any]] = None
+    ) -> StreamingTransformationArtifact:
+        """
+        Prepare a bounded-memory record source for streaming BiLSTM training.
+
+        `record_source()` must return a fresh validated stream on every call.
+        With `config.cache_stream` (the default), it is only called once: the
+        stream is read into on-disk shards and every pass reads the shards.
+        Existing shards are reused only if they were built from the same
+        `source_key` (e.g. a feature store snapshot id) and feature columns;
+        without a key they are always rebuilt.
+        """
+        try:
+            if self.config.group_by is not None:
+                raise ValueError("Streaming mode only supports global windows; unset group_by.")
+
+            def stream_chunks():
+                return iter_record_chunks(record_source(), self._record_to_row, self.config.chunk_size)
+
+            chunk_source = stream_chunks
+            shard_dir = None
+            if self.config.cache_stream:
+                shard_dir = self.config.shard_dir or os.path.join(
+                    training_pipeline_config.artifact_dir, "stream_cache"
+                )
+                shard_key = None if source_key is None else {
+                    "source": source_key,
+                    "feature_columns": list(self.config.feature_columns),
+                }
+                if shard_key is not None and read_shard_source(shard_dir) == shard_key:
+                    logging.info(f"[Data Transformation] Reusing record shards in {shard_dir}")
+                else:
+                    logging.info(f"[Data Transformation] Writing record shards to {shard_dir}...")
+                    write_shards(stream_chunks(), shard_dir, shard_key)
+                chunk_source = lambda: iter_shard_chunks(shard_dir)
+
+            logging.info(
+                f"[Data Transformation] Streaming source ready "
+                f"({'shards in ' + shard_dir if shard_dir else 'live stream'}), "
+                f"window size {self.window_size}."
+            )
+            return StreamingTransformationArtifact(
+                chunk_source=chunk_source,
+                window_size=self.window_size,
+                num_features=len(self.config.feature_columns),
+                validation_fraction=self.config.validation_fraction
+            )
+
+        except Exception as e:
+            raise MyException(e, sys)
@@ -1,22 +1,96 @@
 import os
 import sys
+from typing import Tuple, Union
 import numpy as np
+import tensorflow as tf
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Bidirectional, LSTM, Dense, Dropout
 from tensorflow.keras.optimizers import Adam
 from tensorflow.keras.callbacks import ModelCheckpoint
+from tensorflow.keras.utils import Sequence as KerasSequence
 
 from src2.entity.config_entity import ModelTrainerConfig
-from src2.entity.artifact_entity import DataTransformationArtifact, ModelTrainerArtifact
+from src2.entity.artifact_entity import (
+    DataTransformationArtifact,
+    StreamingTransformationArtifact,
+    ModelTrainerArtifact
+)
+from src2.components.sequence_builder import SlidingWindows
+from src2.components.streaming_dataset import iter_windows
 from src.exception import MyException
 from src.logger import logging
 
 
+class WindowBatches(KerasSequence):
+    """
+    Feeds lazy SlidingWindows to `model.fit`, materializing one batch at a time.
+    """
+
+    def __init__(self, windows: SlidingWindows, labels: np.ndarray, batch_size: int = 32,
+                 shuffle: bool = True, seed: int = 42):
+        super().__init__()
+        self.windows = windows
+        self.labels = labels
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+        self.order = np.arange(len(labels))
+        if shuffle:
+            self.rng.shuffle(self.order)
+
+    def __len__(self):
+        return int(np.ceil(len(self.labels) / self.batch_size))
+
+    def __getitem__(self, index):
+        batch = np.sort(self.order[index * self.batch_size:(index + 1) * self.batch_size])
+        return self.windows[batch], self.labels[batch]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.rng.shuffle(self.order)
+
+
 class ModelTrainer:
-    def __init__(self, config: ModelTrainerConfig, transformation_artifact: DataTransformationArtifact):
+    def __init__(
+        self,
+        config: ModelTrainerConfig,
+        transformation_artifact: Union[DataTransformationArtifact, StreamingTransformationArtifact]
+    ):
         self.config = config
         self.transformation_artifact = transformation_artifact
 
+    def build_streaming_datasets(self) -> Tuple[tf.data.Dataset, tf.data.Dataset]:
+        """
+        Train/validation tf.data pipelines over the streaming record source.
+
+        Each pass re-reads the source, so memory stays bounded by one chunk
+        plus the shuffle buffer. The split is a fixed hash of the window
+        index, so it is identical across epochs and runs.
+        """
+        artifact = self.transformation_artifact
+        signature = (
+            tf.TensorSpec(shape=(None, artifact.window_size, artifact.num_features), dtype=tf.float32),
+            tf.TensorSpec(shape=(None,), dtype=tf.int64),
+        )
+
+        def windows(validation: bool) -> tf.data.Dataset:
+            return tf.data.Dataset.from_generator(
+                lambda: iter_windows(
+                    artifact.chunk_source(), artifact.window_size,
+                    artifact.validation_fraction, validation
+                ),
+                output_signature=signature
+            ).unbatch()
+
+        train_ds = (
+            windows(validation=False)
+            .shuffle(self.config.shuffle_buffer_size, seed=42, reshuffle_each_iteration=True)
+            .batch(self.config.batch_size)
+            .prefetch(tf.data.AUTOTUNE)
+        )
+        val_ds = windows(validation=True).batch(self.config.batch_size).prefetch(tf.data.AUTOTUNE)
+        return train_ds, val_ds
+
     def build_deep_bilstm_model(self, input_shape):
         try:
             model = Sequential([
@@ -41,14 +115,29 @@ class ModelTrainer:
 
     def train_model(self) -> ModelTrainerArtifact:
         try:
-            x_train = self.transformation_artifact.x_train
-            y_train = self.transformation_artifact.y_train
-            x_val = self.transformation_artifact.x_val
-            y_val = self.transformation_artifact.y_val
+            if self.config.training_mode == "streaming":
+                if not isinstance(self.transformation_artifact, StreamingTransformationArtifact):
+                    raise ValueError("Streaming mode needs a StreamingTransformationArtifact.")
+                train_data, val_data = self.build_streaming_datasets()
+                input_shape = (self.transformation_artifact.window_size, self.transformation_artifact.num_features)
+                logging.info(f"Streaming training with window shape {input_shape}")
+            else:
+                x_train = self.transformation_artifact.x_train
+                y_train = self.transformation_artifact.y_train
+                x_val = self.transformation_artifact.x_val
+                y_val = self.transformation_artifact.y_val
+                input_shape = (x_train.shape[1], x_train.shape[2])
+
+                logging.info(f"Training data shape: {x_train.shape}, Labels shape: {y_train.shape}")
 
-            logging.info(f"Training data shape: {x_train.shape}, Labels shape: {y_train.shape}")
+                if isinstance(x_train, SlidingWindows):
+                    train_data = WindowBatches(x_train, y_train, batch_size=self.config.batch_size)
+                    val_data = WindowBatches(x_val, y_val, batch_size=self.config.batch_size, shuffle=False)
+                else:
+                    train_data = (x_train, y_train)
+                    val_data = (x_val, y_val)
 
-            model = self.build_deep_bilstm_model(input_shape=(x_train.shape[1], x_train.shape[2]))
+            model = self.build_deep_bilstm_model(input_shape=input_shape)
 
             os.makedirs(self.config.model_trainer_dir, exist_ok=True)
             checkpoint_path = os.path.join(self.config.model_trainer_dir, "best_bilstm_model.h5")
@@ -59,14 +148,23 @@ class ModelTrainer:
                 mode='max'
             )
 
-            history = model.fit(
-                x_train, y_train,
-                epochs=20,
-                batch_size=32,
-                validation_data=(x_val, y_val),
-                callbacks=[checkpoint],
-                verbose=1
-            )
+            if isinstance(train_data, tuple):
+                history = model.fit(
+                    *train_data,
+                    epochs=self.config.epochs,
+                    batch_size=self.config.batch_size,
+                    validation_data=val_data,
+                    callbacks=[checkpoint],
+                    verbose=1
+                )
+            else:
+                history = model.fit(
+                    train_data,
+                    epochs=self.config.epochs,
+                    validation_data=val_data,
+                    callbacks=[checkpoint],
+                    verbose=1
+                )
 
             final_accuracy = max(history.history['val_accuracy'])
             logging.info(f"Training complete. Best Validation Accuracy: {final_accuracy:.4f}")
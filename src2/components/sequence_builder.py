@@ -0,0 +1,156 @@
+import sys
+from typing import Any, Hashable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.exception import MyException
+from src.logger import logging
+
+
+class SlidingWindows:
+    """
+    Read-only (n_windows, window_size, n_features) collection of windows over
+    one contiguous feature matrix.
+
+    Windows are strided views selected by their start row, so holding the
+    full set costs one int per window on top of the feature matrix itself.
+    Indexing with an int returns a view; indexing with a slice or an index
+    array materializes only the requested batch.
+    """
+
+    def __init__(self, features: np.ndarray, starts: np.ndarray, window_size: int):
+        self.features = features
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.window_size = window_size
+        self._view = sliding_window_view(features, window_size, axis=0).transpose(0, 2, 1)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return len(self.starts), self.window_size, self.features.shape[1]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.features.dtype
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index) -> np.ndarray:
+        return self._view[self.starts[index]]
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        windows = self._view[self.starts]
+        return windows if dtype is None else windows.astype(dtype, copy=False)
+
+    def subset(self, indices: np.ndarray) -> "SlidingWindows":
+        """
+        Windows at `indices`, still backed by the same feature matrix.
+        """
+        return SlidingWindows(self.features, self.starts[indices], self.window_size)
+
+    def batches(self, batch_size: int) -> Iterator[np.ndarray]:
+        for start in range(0, len(self), batch_size):
+            yield self[start:start + batch_size]
+
+
+class SequenceBuilder:
+    """
+    Accumulates (features, label) records into one contiguous float32 array
+    and exposes BiLSTM training windows over it without copying them.
+
+    Windows are either global (over the stream in arrival order) or, when a
+    group key is given per record, per group ordered by the order key, e.g.
+    per CustomerID ordered by TransactionTimestamp.
+    """
+
+    def __init__(self, window_size: int = 30, initial_capacity: int = 4096):
+        self.window_size = window_size
+        self._capacity = initial_capacity
+        self._features: Optional[np.ndarray] = None
+        self._labels = np.empty(initial_capacity, dtype=np.int64)
+        self._groups: list = []
+        self._orders: list = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self) -> None:
+        self._capacity *= 2
+        features = np.empty((self._capacity, self._features.shape[1]), dtype=np.float32)
+        features[:self._size] = self._features[:self._size]
+        labels = np.empty(self._capacity, dtype=np.int64)
+        labels[:self._size] = self._labels[:self._size]
+        self._features, self._labels = features, labels
+
+    def append(
+        self,
+        features: Sequence[float],
+        label: int,
+        group: Optional[Hashable] = None,
+        order: Optional[Any] = None
+    ) -> None:
+        if self._features is None:
+            self._features = np.empty((self._capacity, len(features)), dtype=np.float32)
+        elif len(features) != self._features.shape[1]:
+            raise ValueError(
+                f"Record {self._size + 1} has inconsistent feature length: "
+                f"expected {self._features.shape[1]}, got {len(features)}."
+            )
+        if self._size == self._capacity:
+            self._grow()
+
+        self._features[self._size] = features
+        self._labels[self._size] = label
+        if group is not None:
+            self._groups.append(group)
+            self._orders.append(order)
+        self._size += 1
+
+    def build(self, grouped: bool = False) -> Tuple[SlidingWindows, np.ndarray]:
+        """
+        Return (windows, labels); each window is labelled with its last record.
+        """
+        try:
+            if self._size < self.window_size:
+                raise ValueError(
+                    f"No sequences were created. Records processed: {self._size}, "
+                    f"window size: {self.window_size}. Reduce window size or ensure more data."
+                )
+
+            features = self._features[:self._size]
+            labels = self._labels[:self._size]
+
+            if not grouped:
+                starts = np.arange(self._size - self.window_size + 1)
+            else:
+                if len(self._groups) != self._size:
+                    raise ValueError("Grouped windows need a group key on every record.")
+
+                _, group_ids = np.unique(np.asarray(self._groups), return_inverse=True)
+                _, order_ids = np.unique(np.asarray(self._orders), return_inverse=True)
+                order = np.lexsort((np.arange(self._size), order_ids, group_ids))
+
+                features = features[order]
+                labels = labels[order]
+                group_ids = group_ids[order]
+
+                # A window is valid only if it starts and ends in the same group.
+                last = self.window_size - 1
+                starts = np.flatnonzero(group_ids[:self._size - last] == group_ids[last:])
+
+            if len(starts) == 0:
+                raise ValueError(
+                    f"No group has at least {self.window_size} records to form a window."
+                )
+
+            windows = SlidingWindows(np.ascontiguousarray(features), starts, self.window_size)
+            logging.info(
+                f"Built {len(windows)} windows of size {self.window_size} from {self._size} records "
+                f"({'per group' if grouped else 'global'}); feature matrix {windows.features.nbytes / 1e6:.1f} MB."
+            )
+            return windows, labels[starts + self.window_size - 1]
+
+        except Exception as e:
+            raise MyException(e, sys)
@@ -0,0 +1,147 @@
+import os
+import sys
+import glob
+import json
+import shutil
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.exception import MyException
+from src.logger import logging
+
+
+Chunk = Tuple[np.ndarray, np.ndarray]
+
+# Fibonacci hashing constant; spreads consecutive window indices evenly over the split buckets.
+_SPLIT_HASH_MULTIPLIER = np.uint64(11400714819323198485)
+_SPLIT_BUCKETS = 10_000
+
+# Written next to the shards; holds the key of the source they were built from.
+SHARD_SOURCE_FILE_NAME = "_source.json"
+
+
+def iter_record_chunks(
+    stream: Iterator,
+    to_row: Callable,
+    chunk_size: int = 4096
+) -> Iterator[Chunk]:
+    """
+    Group a record stream into (features, labels) float32/int64 blocks.
+    `to_row(record, index)` returns (features, label, group, order).
+    """
+    features, labels = [], []
+    for index, record in enumerate(stream, start=1):
+        row, label, _, _ = to_row(record, index)
+        features.append(row)
+        labels.append(label)
+        if len(labels) == chunk_size:
+            yield np.asarray(features, dtype=np.float32), np.asarray(labels, dtype=np.int64)
+            features, labels = [], []
+    if labels:
+        yield np.asarray(features, dtype=np.float32), np.asarray(labels, dtype=np.int64)
+
+
+def write_shards(chunks: Iterator[Chunk], shard_dir: str, source_key: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Persist record chunks as numbered .npz shards, one chunk per shard,
+    along with `source_key` (see `read_shard_source`). The shards are
+    written to a sibling directory that is renamed into place at the end,
+    replacing any previous shards, so an interrupted write never looks
+    like a complete cache. Returns the number of records written.
+    """
+    try:
+        if os.path.isdir(shard_dir):
+            # Never replace a directory that is not a shard cache.
+            unexpected = [
+                name for name in os.listdir(shard_dir)
+                if name != SHARD_SOURCE_FILE_NAME and not (name.startswith("shard-") and name.endswith(".npz"))
+            ]
+            if unexpected:
+                raise FileExistsError(f"{shard_dir} holds files other than shards: {unexpected[:5]}")
+
+        partial_dir = f"{os.path.normpath(shard_dir)}.partial"
+        shutil.rmtree(partial_dir, ignore_errors=True)
+        os.makedirs(partial_dir)
+        total = 0
+        for shard_no, (features, labels) in enumerate(chunks):
+            np.savez(os.path.join(partial_dir, f"shard-{shard_no:05d}.npz"), features=features, labels=labels)
+            total += len(labels)
+        with open(os.path.join(partial_dir, SHARD_SOURCE_FILE_NAME), "w") as f:
+            json.dump(source_key, f, sort_keys=True)
+
+        if os.path.isdir(shard_dir):
+            shutil.rmtree(shard_dir)
+        os.rename(partial_dir, shard_dir)
+        logging.info(f"Wrote {total} records to shards in {shard_dir}")
+        return total
+    except Exception as e:
+        raise MyException(e, sys)
+
+
+def read_shard_source(shard_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    Source key stored by `write_shards`, or None when `shard_dir` holds no
+    complete shard set (or one written without a key).
+    """
+    try:
+        with open(os.path.join(shard_dir, SHARD_SOURCE_FILE_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def iter_shard_chunks(shard_dir: str) -> Iterator[Chunk]:
+    """
+    Read shards written by `write_shards` back in order, one at a time.
+    """
+    shard_paths = sorted(glob.glob(os.path.join(shard_dir, "shard-*.npz")))
+    if not shard_paths:
+        raise FileNotFoundError(f"No shards found in {shard_dir}")
+    for path in shard_paths:
+        with np.load(path) as shard:
+            yield shard["features"], shard["labels"]
+
+
+def is_validation_window(window_index: np.ndarray, validation_fraction: float) -> np.ndarray:
+    """
+    Deterministic split on the global window index: the same window always
+    lands on the same side, across epochs and across runs.
+    """
+    hashed = (window_index.astype(np.uint64) * _SPLIT_HASH_MULTIPLIER) >> np.uint64(32)
+    return (hashed % np.uint64(_SPLIT_BUCKETS)) < np.uint64(validation_fraction * _SPLIT_BUCKETS)
+
+
+def iter_windows(
+    chunks: Iterator[Chunk],
+    window_size: int,
+    validation_fraction: float,
+    validation: bool
+) -> Iterator[Chunk]:
+    """
+    Slide a global window over a chunked record stream, carrying the last
+    `window_size - 1` records across chunk boundaries, and keep only the
+    windows on the requested side of the split. Each window is labelled
+    with its last record, as in the in-memory builder.
+    """
+    tail_features: Optional[np.ndarray] = None
+    tail_labels: Optional[np.ndarray] = None
+    next_window_index = 0
+
+    for features, labels in chunks:
+        if tail_features is not None:
+            features = np.concatenate([tail_features, features])
+            labels = np.concatenate([tail_labels, labels])
+        if len(labels) >= window_size:
+            windows = sliding_window_view(features, window_size, axis=0).transpose(0, 2, 1)
+            window_labels = labels[window_size - 1:]
+            window_index = np.arange(next_window_index, next_window_index + len(window_labels))
+            next_window_index += len(window_labels)
+
+            keep = is_validation_window(window_index, validation_fraction) == validation
+            if keep.any():
+                yield np.ascontiguousarray(windows[keep]), window_labels[keep]
+
+        tail_features = features[-(window_size - 1):] if window_size > 1 else features[:0]
+        tail_labels = labels[-(window_size - 1):] if window_size > 1 else labels[:0]
@@ -1,13 +1,25 @@
 from dataclasses import dataclass
+from typing import Callable, Iterator, Tuple, Union
 import numpy as np
 
+from src2.components.sequence_builder import SlidingWindows
+
 @dataclass
 class DataTransformationArtifact:
-    x_train: np.ndarray
+    # Windows stay lazy views over one feature matrix; np.asarray() materializes them.
+    x_train: Union[np.ndarray, SlidingWindows]
     y_train: np.ndarray
-    x_val: np.ndarray
+    x_val: Union[np.ndarray, SlidingWindows]
     y_val: np.ndarray
 
+@dataclass
+class StreamingTransformationArtifact:
+    # Called once per pass; yields (features, labels) record chunks in stream order.
+    chunk_source: Callable[[], Iterator[Tuple[np.ndarray, np.ndarray]]]
+    window_size: int
+    num_features: int
+    validation_fraction: float
+
 @dataclass
 class ModelTrainerArtifact:
     model_path: str
@@ -1,9 +1,34 @@
 from dataclasses import dataclass
+from typing import Optional, Tuple
 
 @dataclass
 class DataTransformationConfig:
     sequence_length: int = 30
     num_features: int = 8  
+    # Columns taken from dict records, in the order the BiLSTM sees them.
+    feature_columns: Tuple[str, ...] = (
+        "Amount",
+        "HourOfDay",
+        "CustomerTenureMonths",
+        "NumTransactionsLast24h",
+        "AvgTransactionAmount7d",
+        "CardPresent",
+        "IsInternational",
+        "IsNewDevice",
+    )
+    # Set group_by (e.g. "CustomerID") to build windows per group ordered by order_by
+    # instead of one global window over the stream.
+    group_by: Optional[str] = None
+    order_by: str = "TransactionTimestamp"
+    validation_fraction: float = 0.2
+    # Streaming mode: records are read in chunks of chunk_size. With cache_stream the validated
+    # stream is written once as .npz shards to shard_dir (by default stream_cache/ under the
+    # run's artifact dir) and every pass reads the shards; without it every pass re-runs
+    # ingestion and validation. Shards already in shard_dir are reused only if they were
+    # built from the same source snapshot, schema and feature columns.
+    chunk_size: int = 4096
+    cache_stream: bool = True
+    shard_dir: Optional[str] = None
 
     def validate(self):
         if self.sequence_length <= 0:
@@ -14,3 +39,8 @@ class DataTransformationConfig:
 @dataclass
 class ModelTrainerConfig:
     model_trainer_dir: str = "artifacts/model_trainer"
+    # "in_memory" trains on materialized arrays; "streaming" trains from a tf.data pipeline.
+    training_mode: str = "in_memory"
+    epochs: int = 20
+    batch_size: int = 32
+    shuffle_buffer_size: int = 10_000
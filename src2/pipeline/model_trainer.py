@@ -1,6 +1,7 @@
+import os
 import sys
 from itertools import tee, islice
-from typing import Dict, Any, Iterator, Tuple
+from typing import Dict, Any, Callable, Iterator, Optional, Tuple
 
 from src.exception import MyException
 from src.logger import logging
@@ -24,18 +25,22 @@ from src.entity.artifact_entity import (
 )
 from src2.entity.artifact_entity import (
     DataTransformationArtifact,
+    StreamingTransformationArtifact,
     ModelTrainerArtifact
 )
 
 
 class TrainPipeline:
-    def __init__(self):
+    def __init__(self, training_mode: str = "in_memory"):
+        """
+        training_mode: "in_memory" for small runs, "streaming" for a bounded-memory tf.data pipeline.
+        """
         try:
             logging.info("Initializing pipeline configuration objects...")
             self.data_ingestion_config = DataIngestionConfig()
             self.data_validation_config = DataValidationConfig()
             self.data_transformation_config = DataTransformationConfig()
-            self.model_trainer_config = ModelTrainerConfig()
+            self.model_trainer_config = ModelTrainerConfig(training_mode=training_mode)
         except Exception as e:
             raise MyException(e, sys)
 
@@ -49,44 +54,97 @@ class TrainPipeline:
         except Exception as e:
             raise MyException(e, sys)
 
-    def start_data_validation(self, ingestion_artifact: DataIngestionArtifact):
+    def start_data_validation(self, data_stream: Iterator[Tuple[Dict[str, Any], int]]):
         """
-       Runs the data validation step.
-      """
-     try:
-        logging.info("[Data Validation] Starting...")
-
-        validation = DataValidation(
-            data_validation_config=DataValidationConfig(),
-            ingestion_artifact=ingestion_artifact
-        )
-
-        # This is the important line: it returns BOTH
-        validation_artifact, validated_stream = validation.initiate_data_validation()
+        Runs the data validation step.
+        """
+        try:
+            logging.info("[Data Validation] Starting...")
 
-        logging.info("[Data Validation] Completed.")
-        return validation_artifact, validated_stream
+            validation = DataValidation(
+                data_validation_config=self.data_validation_config,
+                ingestion_artifact=None
+            )
 
-     except Exception as e:
-        raise MyException(e, sys)
+            # Returns BOTH the artifact and the stream of valid records.
+            validation_artifact = validation.initiate_data_validation()
+            validated_stream, _ = validation.run_validation(data_stream)
 
+            logging.info("[Data Validation] Stream ready; records are validated as they are consumed.")
+            return validation_artifact, validated_stream
 
+        except Exception as e:
+            raise MyException(e, sys)
 
     def start_data_transformation(
-      self, validation_artifact: DataValidationArtifact
-      )  -> DataTransformationArtifact:
-     try:
-        logging.info("Starting data transformation...")
-        transformer = DataTransformation(
-            config=self.data_transformation_config,
-            validation_artifact=validation_artifact
-        )
-        transformation_artifact = transformer.initiate_data_transformation()
-        logging.info("Data transformation completed.")
-        return transformation_artifact
-     except Exception as e:
-        raise MyException(e, sys)
+        self, validation_artifact: DataValidationArtifact, validated_stream
+    ) -> DataTransformationArtifact:
+        try:
+            logging.info("Starting data transformation...")
+            transformer = DataTransformation(
+                config=self.data_transformation_config,
+                validation_artifact=validation_artifact,
+                validated_stream=validated_stream,
+                window_size=self.data_transformation_config.sequence_length
+            )
+            transformation_artifact = transformer.initiate_data_transformation()
+            logging.info("Data transformation completed.")
+            return transformation_artifact
+        except Exception as e:
+            raise MyException(e, sys)
 
+    def _streaming_source(self) -> Tuple[Callable[[], Iterator], Optional[Dict[str, Any]]]:
+        """
+        The validated record source for streaming mode, plus the key its
+        shard cache is checked against. With the feature store, the store is
+        synced once here and the key is its snapshot id and the schema file's
+        mtime; reading MongoDB directly has no cheap version, so no key.
+        """
+        if not self.data_ingestion_config.use_feature_store:
+            def record_source():
+                ingestion_artifact = self.start_data_ingestion()
+                _, validated_stream = self.start_data_validation(ingestion_artifact.data_stream)
+                return validated_stream
+
+            return record_source, None
+
+        feature_store = DataIngestion(self.data_ingestion_config).sync_feature_store()
+        schema_file_path = self.data_validation_config.schema_file_path
+
+        def record_source():
+            _, validated_stream = self.start_data_validation(feature_store.iter_records())
+            return validated_stream
+
+        source_key = {
+            "feature_store": os.path.abspath(feature_store.root_dir),
+            "snapshot": feature_store.snapshot_id,
+            "schema": os.path.abspath(schema_file_path),
+            "schema_mtime": os.path.getmtime(schema_file_path),
+        }
+        return record_source, source_key
+
+    def start_streaming_transformation(self) -> StreamingTransformationArtifact:
+        """
+        Streaming mode: ingestion and validation run once, into on-disk
+        shards that every training pass re-reads (or on every pass, with
+        `cache_stream=False`), so no stage holds the full dataset. Shards
+        from an earlier run are reused while the source is unchanged.
+        """
+        try:
+            logging.info("Starting streaming data transformation...")
+            record_source, source_key = self._streaming_source()
+
+            transformer = DataTransformation(
+                config=self.data_transformation_config,
+                validation_artifact=None,
+                validated_stream=None,
+                window_size=self.data_transformation_config.sequence_length
+            )
+            transformation_artifact = transformer.initiate_streaming_transformation(record_source, source_key)
+            logging.info("Streaming data transformation ready.")
+            return transformation_artifact
+        except Exception as e:
+            raise MyException(e, sys)
 
     def start_model_trainer(
         self, transformation_artifact: DataTransformationArtifact
@@ -103,39 +161,46 @@ class TrainPipeline:
         except Exception as e:
             raise MyException(e, sys)
 
-    def run_pipeline(self) -> None:
+    def run_pipeline(
+        self, data_ingestion_artifact: Optional[DataIngestionArtifact] = None
+    ) -> ModelTrainerArtifact:
+        """
+        Pass `data_ingestion_artifact` to train on an already-prepared stream
+        (in-memory mode only; streaming mode re-reads its source every pass).
+        """
         try:
             logging.info("Running end-to-end training pipeline...")
 
-            
-            data_ingestion_artifact = self.start_data_ingestion()
+            if self.model_trainer_config.training_mode == "streaming":
+                if data_ingestion_artifact is not None:
+                    raise ValueError("Streaming mode reads its own source; do not pass an ingestion artifact.")
+                data_transformation_artifact = self.start_streaming_transformation()
+            else:
+                if data_ingestion_artifact is None:
+                    data_ingestion_artifact = self.start_data_ingestion()
 
-            
-            stream_debug, stream_real = tee(data_ingestion_artifact.data_stream)
-            sample = list(islice(stream_debug, 2))
-            logging.info(f"Sample records:\n{sample}")
-            data_ingestion_artifact.data_stream = stream_real
+                stream_debug, stream_real = tee(data_ingestion_artifact.data_stream)
+                sample = list(islice(stream_debug, 2))
+                logging.info(f"Sample records:\n{sample}")
+                data_ingestion_artifact.data_stream = stream_real
 
-            
-            data_validation_artifact = self.start_data_validation(
-                data_ingestion_artifact.data_stream
-            )
+                data_validation_artifact, validated_stream = self.start_data_validation(
+                    data_ingestion_artifact.data_stream
+                )
 
-           
-            data_transformation_artifact = self.start_data_transformation(
-                data_validation_artifact
-            )
+                data_transformation_artifact = self.start_data_transformation(
+                    data_validation_artifact, validated_stream
+                )
 
-            
             model_trainer_artifact = self.start_model_trainer(
                 data_transformation_artifact
             )
 
-            
             logging.info("Pipeline Execution Summary:")
             print("\nPipeline Execution Summary:")
             print(f"   Best Model: {model_trainer_artifact.best_model_name}")
             print(f"   Accuracy: {model_trainer_artifact.best_score:.4f}")
+            return model_trainer_artifact
 
         except Exception as e:
             raise MyException(e, sys)
@@ -2,40 +2,63 @@ import numpy as np
 import sys
 import pickle
 import pandas as pd
+from typing import Optional
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, roc_auc_score
 from sklearn.model_selection import train_test_split
-from tensorflow.keras.models import load_model
+from src.components.data_validation import BatchValidator
+from src.constants import META_GRID_PATH, META_GRID_RESOLUTION
+from src.data_access.credit_data import LABEL_FIELD
+from src.data_access.csv_data import read_transactions_csv
+from src.data_access.feature_store import FeatureStore
 from src.exception import MyException
 from src.logger import logging
+from src.serving.inference import CompiledBiLSTM
+from src.serving.meta_grid import MetaGrid
+from src.utils.feature_encoder import FEATURE_NAMES as RIVER_FEATURES, FeatureEncoder
+from src3.components.oof_stacking import OutOfFoldStacker
+from src3.entity.config_entity import MetaStackingConfig
 
 
 class MetaModelTrainer:
     def __init__(
         self,
         river_model_path: str = "artifact/hk/model_trainer/model.pkl",
-        bilstm_model_path: str = "artifacts/model_trainer/best_bilstm_model.h5"
+        bilstm_model_path: str = "artifacts/model_trainer/best_bilstm_model.h5",
+        stacking_config: Optional[MetaStackingConfig] = None
     ):
         """
         Initialize MetaModelTrainer with pretrained River and BiLSTM models.
         """
         try:
+            self.stacking_config = stacking_config or MetaStackingConfig()
             with open(river_model_path, "rb") as f:
                 self.river_model = pickle.load(f)
-            self.bilstm_model = load_model(bilstm_model_path)
+            self.bilstm_model = CompiledBiLSTM.from_path(bilstm_model_path)
 
             logging.info("Loaded River and BiLSTM models successfully.")
         except Exception as e:
             raise MyException(e, sys)
 
-    def load_records_from_csv(self, csv_path: str):
+    @staticmethod
+    def load_records_from_csv(csv_path: str):
         """
-        Load records for meta training from a CSV file.
+        Load records for meta training from a CSV file, one dict per row.
+        `load_arrays_from_csv` is the fast path; this one is kept for
+        callers that need per-row dicts and as the benchmark reference.
         Returns:
             List of (features_dict, label)
         """
         df = pd.read_csv(csv_path)
 
+        validation = BatchValidator.from_yaml().validate(df)
+        if validation.invalid_records:
+            logging.info(
+                f"Dropping {validation.invalid_records} invalid CSV rows: {validation.failures}"
+            )
+            df = df[validation.mask]
+
         records = []
         for _, row in df.iterrows():
             label = int(row["IsFraud"])
@@ -57,77 +80,113 @@ class MetaModelTrainer:
         )
         return records
 
-    def create_meta_dataset(self, records, window_size=30):
+    @staticmethod
+    def load_arrays_from_csv(csv_path: str, chunksize=None):
+        """
+        Typed, columnar counterpart of `load_records_from_csv`.
+        Returns:
+            (values, labels): float64 (n, len(RIVER_FEATURES)) matrix and int64 labels
+        """
+        df = read_transactions_csv(csv_path, chunksize=chunksize)
+        values = df[list(RIVER_FEATURES)].to_numpy(dtype=np.float64)
+        labels = df["IsFraud"].to_numpy()
+
+        logging.info(f"Loaded {len(labels)} records from CSV. Positive labels: {int(labels.sum())}")
+        return values, labels
+
+    @staticmethod
+    def load_arrays_from_feature_store(root_dir: str):
+        """
+        Same arrays as `load_arrays_from_csv`, read from the memory-mapped
+        parts of a feature store snapshot (invalid rows dropped).
+        """
+        store = FeatureStore(root_dir)
+        columns = list(RIVER_FEATURES) + [LABEL_FIELD]
+        value_blocks, label_blocks = [], []
+        for batch in store.iter_batches(columns=columns, validator=BatchValidator.from_yaml()):
+            value_blocks.append(np.column_stack([
+                batch.column(name).to_numpy(zero_copy_only=False).astype(np.float64) for name in RIVER_FEATURES
+            ]))
+            label_blocks.append(batch.column(LABEL_FIELD).to_numpy(zero_copy_only=False))
+        if not value_blocks:
+            raise ValueError(f"Feature store {root_dir} is empty.")
+        values, labels = np.concatenate(value_blocks), np.concatenate(label_blocks)
+
+        logging.info(f"Loaded {len(labels)} records from {root_dir}. Positive labels: {int(labels.sum())}")
+        return values, labels
+
+    @staticmethod
+    def records_to_arrays(records):
+        """
+        Pack (features_dict, label) records into the arrays used by
+        `create_meta_dataset_from_arrays`.
+        """
+        values = np.empty((len(records), len(RIVER_FEATURES)), dtype=np.float64)
+        FeatureEncoder(dtype=np.float64).encode_many((raw_features for raw_features, _ in records), out=values)
+        labels = np.array([label for _, label in records])
+        return values, labels
+
+    def create_meta_dataset(self, records, window_size=30, batch_size=1024):
         """
         Create meta dataset using predictions from River and BiLSTM.
         """
-        X_meta = []
-        y_meta = []
-        rolling_window = []
-        total_records = 0
+        values, labels = self.records_to_arrays(records)
+        return self.create_meta_dataset_from_arrays(values, labels, window_size, batch_size)
 
-        for raw_features, label in records:
-            total_records += 1
+    def create_meta_dataset_from_arrays(self, values, labels, window_size=30, batch_size=1024):
+        """
+        All records are packed into one float32 feature matrix and the
+        rolling windows are taken as a strided view over it, so no window is
+        copied until its BiLSTM batch is scored.
+        """
+        if len(values) < window_size:
+            raise ValueError("No meta records created. Check your data and window size.")
 
-            
-            river_input = {
-                "Amount": raw_features["Amount"],
-                "HourOfDay": raw_features["HourOfDay"],
-                "CustomerTenureMonths": raw_features["CustomerTenureMonths"],
-                "NumTransactionsLast24h": raw_features["NumTransactionsLast24h"],
-                "AvgTransactionAmount7d": raw_features["AvgTransactionAmount7d"],
-                "CardPresent": int(raw_features["CardPresent"]),
-                "IsInternational": int(raw_features["IsInternational"]),
-                "IsNewDevice": int(raw_features["IsNewDevice"]),
-            }
+        features = values.astype(np.float32)
 
+        # River is still asked about every record, in order, as before.
+        river_probs = []
+        for river_input in FeatureEncoder.river_dicts(values):
             river_prob = self.river_model.predict_proba_one(river_input)
             if isinstance(river_prob, dict):
                 river_prob = river_prob.get(1, 0.0)
+            river_probs.append(river_prob)
 
-            bilstm_numeric = np.array([
-                raw_features["Amount"],
-                raw_features["HourOfDay"],
-                raw_features["CustomerTenureMonths"],
-                raw_features["NumTransactionsLast24h"],
-                raw_features["AvgTransactionAmount7d"],
-                int(raw_features["CardPresent"]),
-                int(raw_features["IsInternational"]),
-                int(raw_features["IsNewDevice"])
-            ], dtype=np.float32)
-
-            rolling_window.append(bilstm_numeric)
-            if len(rolling_window) < window_size:
-                continue
+        # (n_windows, window_size, n_features) view; window i ends at record i + window_size - 1.
+        windows = sliding_window_view(features, window_size, axis=0).transpose(0, 2, 1)
+        bilstm_probs = np.concatenate([
+            self.bilstm_model.predict_proba(windows[start:start + batch_size])
+            for start in range(0, len(windows), batch_size)
+        ])
 
-            bilstm_input = np.array(rolling_window).reshape(1, window_size, -1)
-            bilstm_prob = self.bilstm_model.predict(bilstm_input)[0][0]
-
-            X_meta.append([river_prob, bilstm_prob])
-            y_meta.append(label)
-
-            rolling_window.pop(0)
-
-            logging.debug(
-                f"Processed record {total_records}: River={river_prob:.4f}, BiLSTM={bilstm_prob:.4f}"
-            )
-
-        if not X_meta:
-            raise ValueError("No meta records created. Check your data and window size.")
+        X_meta = np.column_stack([river_probs[window_size - 1:], bilstm_probs])
+        y_meta = labels[window_size - 1:]
 
         logging.info(f"Meta dataset created: {len(X_meta)} samples.")
-        return np.array(X_meta), np.array(y_meta)
+        return X_meta, y_meta
+
+    def create_meta_dataset_oof(self, values, labels, window_size=30):
+        """
+        Same rows as `create_meta_dataset_from_arrays`, but each prediction
+        comes from base models retrained without that row's fold.
+        """
+        X_meta, y_meta, report = OutOfFoldStacker(self.stacking_config).predict(
+            values, labels, window_size, self.river_model, self.bilstm_model.model
+        )
+        logging.info(f"Out-of-fold stacking report: {report}")
+        return X_meta, y_meta
 
-    def train_meta_model(self, X_meta, y_meta):
+    def train_meta_model(self, X_meta, y_meta, **params):
         """
         Train a RandomForest classifier as the meta model.
+        `params` override the RandomForest defaults below.
         """
         stratify = y_meta if len(np.unique(y_meta)) > 1 else None
         X_train, X_val, y_train, y_val = train_test_split(
             X_meta, y_meta, test_size=0.2, random_state=42, stratify=stratify
         )
 
-        clf = RandomForestClassifier(n_estimators=50, random_state=42)
+        clf = RandomForestClassifier(**{"n_estimators": 50, "random_state": 42, **params})
         clf.fit(X_train, y_train)
 
         y_pred = clf.predict(X_val)
@@ -140,22 +199,51 @@ class MetaModelTrainer:
             f"Meta model trained. Accuracy: {acc:.4f}, AUC: {auc:.4f}"
         )
 
+        # Kept for `compile_meta_grid`, which calibrates and validates on the same split.
+        self.meta_split = (X_train, X_val, y_val)
         return clf
 
-    def run_meta_training(self, records=None, csv_path=None, window_size=30):
+    def compile_meta_grid(self, meta_model, grid_path=META_GRID_PATH, resolution=META_GRID_RESOLUTION):
+        """
+        Compile the meta model into a `MetaGrid` for serving, with axes
+        calibrated on the training split and the deviation report taken on
+        the validation split.
+        """
+        X_train, X_val, y_val = self.meta_split
+        grid = MetaGrid.compile(meta_model, resolution=resolution, X_calibration=X_train)
+        grid.deviation_report(meta_model, X_val, y_val)
+        grid.save(grid_path)
+        return grid
+
+    def run_meta_training(
+        self, records=None, csv_path=None, window_size=30, feature_store_dir=None, stacking=None
+    ):
         """
         Main method to create meta dataset and train the meta model.
+        `stacking` ("in_sample" or "oof") defaults to `stacking_config.mode`.
         """
         try:
             logging.info("Starting meta model training...")
 
-            if records is None and csv_path is None:
-                raise ValueError("You must provide either `records` or `csv_path`.")
+            if records is None and csv_path is None and feature_store_dir is None:
+                raise ValueError("You must provide `records`, `csv_path` or `feature_store_dir`.")
 
-            if records is None:
-                records = self.load_records_from_csv(csv_path)
+            stacking = stacking or self.stacking_config.mode
+            if stacking not in ("in_sample", "oof"):
+                raise ValueError(f"Unknown stacking mode: {stacking}")
 
-            X_meta, y_meta = self.create_meta_dataset(records, window_size)
+            if records is None:
+                if feature_store_dir is not None:
+                    values, labels = self.load_arrays_from_feature_store(feature_store_dir)
+                else:
+                    values, labels = self.load_arrays_from_csv(csv_path)
+            else:
+                values, labels = self.records_to_arrays(records)
+
+            if stacking == "oof":
+                X_meta, y_meta = self.create_meta_dataset_oof(values, labels, window_size)
+            else:
+                X_meta, y_meta = self.create_meta_dataset_from_arrays(values, labels, window_size)
             logging.info(f"Meta dataset created with shape: {X_meta.shape}, labels shape: {y_meta.shape}")
 
             meta_model = self.train_meta_model(X_meta, y_meta)
@@ -165,6 +253,8 @@ class MetaModelTrainer:
                 pickle.dump(meta_model, f)
 
             logging.info("Meta model training complete. Model saved to artifact/meta_model.pkl")
+
+            self.compile_meta_grid(meta_model)
             return meta_model
 
         except Exception as e:
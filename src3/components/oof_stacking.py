@@ -0,0 +1,222 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.exception import MyException
+from src.logger import logging
+from src.utils.feature_encoder import FEATURE_NAMES as RIVER_FEATURES, FeatureEncoder
+from src3.entity.config_entity import MetaStackingConfig
+
+
+def fold_bounds(n_windows: int, n_folds: int) -> List[Tuple[int, int]]:
+    """
+    Contiguous [start, stop) window ranges, one per fold, in time order.
+    """
+    if n_windows < n_folds:
+        raise ValueError(f"Cannot split {n_windows} windows into {n_folds} folds.")
+    edges = np.linspace(0, n_windows, n_folds + 1).astype(int)
+    return [(int(edges[i]), int(edges[i + 1])) for i in range(n_folds)]
+
+
+def river_proba_many(river_model, values: np.ndarray) -> np.ndarray:
+    """
+    Fraud probability for every row of an encoded matrix in one River call.
+    """
+    probs = river_model.predict_proba_many(pd.DataFrame(values, columns=list(RIVER_FEATURES)))
+    # Labels may have been learnt as 0/1 or False/True; both compare equal to 1.
+    positive = next((column for column in probs.columns if column == 1), None)
+    if positive is None:
+        return np.zeros(len(values))
+    return probs[positive].to_numpy(dtype=np.float64)
+
+
+def _score_fold(
+    fold: int,
+    bounds: Tuple[int, int],
+    inputs_dir: str,
+    window_size: int,
+    river_model,
+    bilstm_json: str,
+    config: MetaStackingConfig,
+    tf_threads: Optional[int] = None
+) -> Tuple[int, np.ndarray, np.ndarray, float]:
+    """
+    Train fresh copies of both base models on every window outside
+    `bounds` and score the windows inside it.
+
+    Training windows that share a record with the held-out block are
+    dropped as well, so no held-out label reaches the fold's BiLSTM.
+    """
+    import tensorflow as tf
+    if tf_threads:
+        tf.config.threading.set_intra_op_parallelism_threads(tf_threads)
+    from tensorflow.keras.models import model_from_json
+    from tensorflow.keras.optimizers import Adam
+    from src.serving.inference import CompiledBiLSTM
+    from src2.components.model_trainer import WindowBatches
+    from src2.components.sequence_builder import SlidingWindows
+
+    start_time = time.perf_counter()
+    values = np.load(os.path.join(inputs_dir, "values.npy"), mmap_mode="r")
+    labels = np.load(os.path.join(inputs_dir, "labels.npy"), mmap_mode="r")
+    start, stop = bounds
+    n_windows = len(values) - window_size + 1
+    # Window w covers records [w, w + window_size) and is labelled by its last record.
+    window_labels = labels[window_size - 1:]
+    held_out = np.arange(start, stop)
+
+    river = river_model.clone()
+    river_train = np.r_[0:start + window_size - 1, stop + window_size - 1:len(values)]
+    for river_input, label in zip(FeatureEncoder.river_dicts(values[river_train]), labels[river_train].tolist()):
+        river.learn_one(river_input, label)
+    river_probs = river_proba_many(river, values[held_out + window_size - 1])
+
+    tf.keras.utils.set_random_seed(config.seed + fold)
+    features = values.astype(np.float32)
+    train_windows = np.r_[0:max(start - window_size + 1, 0), min(stop + window_size - 1, n_windows):n_windows]
+    model = model_from_json(bilstm_json)
+    model.compile(optimizer=Adam(learning_rate=0.001), loss="binary_crossentropy")
+    model.fit(
+        WindowBatches(
+            SlidingWindows(features, train_windows, window_size),
+            window_labels[train_windows],
+            batch_size=config.bilstm_batch_size,
+            seed=config.seed + fold
+        ),
+        epochs=config.bilstm_epochs,
+        verbose=0
+    )
+    bilstm = CompiledBiLSTM(model, warmup_batch_sizes=())
+    bilstm_probs = np.concatenate([
+        bilstm.predict_proba(batch)
+        for batch in SlidingWindows(features, held_out, window_size).batches(config.inference_batch_size)
+    ])
+    return fold, river_probs, bilstm_probs, time.perf_counter() - start_time
+
+
+class OutOfFoldStacker:
+    """
+    Builds the meta dataset from out-of-fold base-model predictions.
+
+    The windows are split into `n_folds` contiguous blocks. For each block,
+    fresh River and BiLSTM models (same hyperparameters and architecture as
+    the trained ones) learn from the other blocks and score this one in
+    batches, so every meta feature comes from a model that never saw the
+    row's label. Folds train in parallel worker processes, one per CPU at
+    most, and each fold's predictions are cached under `cache_dir` keyed by
+    the data, the base-model definitions and the fold settings: re-running
+    with a different meta model reuses them instead of retraining.
+    """
+
+    def __init__(self, config: Optional[MetaStackingConfig] = None):
+        self.config = config or MetaStackingConfig()
+
+    def cache_key(self, values: np.ndarray, labels: np.ndarray, window_size: int,
+                  river_model, bilstm_json: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+        digest.update(np.ascontiguousarray(labels, dtype=np.int64).tobytes())
+        digest.update(repr(river_model._get_params()).encode())
+        digest.update(bilstm_json.encode())
+        digest.update(json.dumps({
+            "window_size": window_size,
+            "n_folds": self.config.n_folds,
+            "bilstm_epochs": self.config.bilstm_epochs,
+            "bilstm_batch_size": self.config.bilstm_batch_size,
+            "seed": self.config.seed,
+        }, sort_keys=True).encode())
+        return digest.hexdigest()[:16]
+
+    @staticmethod
+    def _fold_path(cache_dir: str, fold: int) -> str:
+        return os.path.join(cache_dir, f"fold-{fold:02d}.npz")
+
+    @staticmethod
+    def _save_fold(path: str, river_probs: np.ndarray, bilstm_probs: np.ndarray, seconds: float) -> None:
+        tmp_path = path[:-len(".npz")] + ".tmp.npz"
+        np.savez(tmp_path, river=river_probs, bilstm=bilstm_probs, seconds=seconds)
+        os.replace(tmp_path, path)
+
+    def predict(
+        self, values: np.ndarray, labels: np.ndarray, window_size: int, river_model, bilstm_model
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+        """
+        Returns (X_meta, y_meta, report) with rows in window order, matching
+        `MetaModelTrainer.create_meta_dataset_from_arrays`.
+        """
+        try:
+            n_windows = len(values) - window_size + 1
+            bounds = fold_bounds(n_windows, self.config.n_folds)
+            bilstm_json = bilstm_model.to_json()
+            key = self.cache_key(values, labels, window_size, river_model, bilstm_json)
+            cache_dir = os.path.join(self.config.cache_dir, key)
+            os.makedirs(cache_dir, exist_ok=True)
+
+            results: Dict[int, Tuple[np.ndarray, np.ndarray, float]] = {}
+            for fold in range(len(bounds)):
+                path = self._fold_path(cache_dir, fold)
+                if os.path.exists(path):
+                    with np.load(path) as cached:
+                        results[fold] = (cached["river"], cached["bilstm"], float(cached["seconds"]))
+            cached_folds = sorted(results)
+            missing = [fold for fold in range(len(bounds)) if fold not in results]
+            logging.info(
+                f"Out-of-fold stacking: {len(bounds)} folds, {len(cached_folds)} cached in {cache_dir}"
+            )
+
+            if missing:
+                # Workers memory-map the inputs instead of receiving a pickled copy each.
+                np.save(os.path.join(cache_dir, "values.npy"), values)
+                np.save(os.path.join(cache_dir, "labels.npy"), labels)
+
+                # A single worker runs the folds in-process: spawning one would
+                # only add a TensorFlow import on top of the same work.
+                cpus = os.cpu_count() or 1
+                workers = max(1, min(self.config.max_workers, cpus, len(missing)))
+                jobs = [
+                    (fold, bounds[fold], cache_dir, window_size, river_model, bilstm_json, self.config)
+                    for fold in missing
+                ]
+                if workers == 1:
+                    completed = (_score_fold(*job) for job in jobs)
+                    pool = None
+                else:
+                    pool = ProcessPoolExecutor(
+                        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                    tf_threads = max(1, cpus // workers)
+                    futures = [pool.submit(_score_fold, *job, tf_threads) for job in jobs]
+                    completed = (future.result() for future in as_completed(futures))
+                try:
+                    for fold, river_probs, bilstm_probs, seconds in completed:
+                        self._save_fold(self._fold_path(cache_dir, fold), river_probs, bilstm_probs, seconds)
+                        results[fold] = (river_probs, bilstm_probs, seconds)
+                        logging.info(f"Fold {fold} scored {len(bilstm_probs)} windows in {seconds:.2f}s")
+                finally:
+                    if pool is not None:
+                        pool.shutdown(cancel_futures=True)
+
+            X_meta = np.column_stack([
+                np.concatenate([results[fold][0] for fold in range(len(bounds))]),
+                np.concatenate([results[fold][1] for fold in range(len(bounds))]),
+            ])
+            y_meta = np.asarray(labels)[window_size - 1:]
+            report = {
+                "cache_dir": cache_dir,
+                "folds": len(bounds),
+                "cached_folds": cached_folds,
+                "fold_seconds": [round(results[fold][2], 3) for fold in range(len(bounds))],
+            }
+            logging.info(f"Out-of-fold meta dataset created: {len(X_meta)} samples.")
+            return X_meta, y_meta, report
+
+        except Exception as e:
+            raise MyException(e, sys)
@@ -10,3 +10,21 @@ class MetaTrainerConfig:
     bilstm_model_path: str = "artifacts/model_trainer/best_bilstm_model.h5"
     river_model_path: str = "artifacts/hk/model_trainer/model.pkl"
     meta_model_path: str = "artifacts/meta_model/meta_model.pkl"
+
+
+@dataclass
+class MetaStackingConfig:
+    """
+    Settings for building the meta dataset from base-model predictions.
+    "in_sample" scores every window with the already-trained base models;
+    "oof" retrains them per fold and scores each fold with the models that
+    did not see it.
+    """
+    mode: str = "in_sample"
+    n_folds: int = 5
+    bilstm_epochs: int = 2
+    bilstm_batch_size: int = 32
+    inference_batch_size: int = 1024
+    max_workers: int = 2
+    seed: int = 42
+    cache_dir: str = "artifacts/meta_model/oof_cache"
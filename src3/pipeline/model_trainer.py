@@ -1,26 +1,32 @@
 import sys
 import pickle
 import numpy as np
-from tensorflow.keras.models import load_model
 from src.exception import MyException
 from src.logger import logging
-from typing import Tuple
+from typing import Optional, Tuple
 from src3.components.meta_trainer import MetaModelTrainer
+from src.serving.inference import CompiledBiLSTM
+from src.serving.metrics import MetricsRegistry
+from src.utils.feature_encoder import FeatureEncoder
 
 class MetaModelPipeline:
     def __init__(
         self,
         river_model_path: str = "artifact/hk/model_trainer/model.pkl",
-        bilstm_model_path: str = "artifacts/model_trainer/best_bilstm_model.h5"
+        bilstm_model_path: str = "artifacts/model_trainer/best_bilstm_model.h5",
+        metrics: Optional[MetricsRegistry] = None
     ):
         """
         Initialize pipeline with paths to the trained models.
+        Pass the app's `metrics` to time each stage of `predict`.
         """
         try:
+            self.metrics = metrics or MetricsRegistry(enabled=False)
             with open(river_model_path, "rb") as f:
                 self.river_model = pickle.load(f)
 
-            self.bilstm_model = load_model(bilstm_model_path)
+            self.bilstm_model = CompiledBiLSTM.from_path(bilstm_model_path)
+            self.encoder = FeatureEncoder(dtype=np.float64, capacity=1)
 
             logging.info(
                 f"Loaded River model from {river_model_path} and BiLSTM model from {bilstm_model_path}."
@@ -33,20 +39,12 @@ class MetaModelPipeline:
         Convert incoming raw features dictionary to a BiLSTM-ready array and River-ready dict.
         """
         try:
-            bilstm_features = np.array([
-                raw_features["Amount"],
-                raw_features["HourOfDay"],
-                raw_features["CustomerTenureMonths"],
-                raw_features["NumTransactionsLast24h"],
-                raw_features["AvgTransactionAmount7d"],
-                int(raw_features["CardPresent"]),
-                int(raw_features["IsInternational"]),
-                int(raw_features["IsNewDevice"])
-            ], dtype=np.float32)
+            features = self.encoder.encode_one(raw_features)
 
-            bilstm_input = np.tile(bilstm_features, (30, 1)).reshape((1, 30, 8))
+            bilstm_input = np.empty((1, 30, self.encoder.num_features), dtype=np.float32)
+            bilstm_input[:] = features
 
-            river_input = raw_features.copy()
+            river_input = FeatureEncoder.river_dict(features)
 
             return bilstm_input, river_input
 
@@ -58,16 +56,20 @@ class MetaModelPipeline:
         Run predictions using both models and return combined results.
         """
         try:
-            bilstm_input, river_input = self.preprocess_features(raw_features)
+            with self.metrics.time("parse"):
+                bilstm_input, river_input = self.preprocess_features(raw_features)
 
-            bilstm_pred_prob = self.bilstm_model.predict(bilstm_input)[0][0]
+            with self.metrics.time("bilstm"):
+                bilstm_pred_prob = float(self.bilstm_model.predict_proba(bilstm_input)[0])
             bilstm_pred_label = int(bilstm_pred_prob >= 0.5)
 
-            river_pred_prob = self.river_model.predict_proba_one(river_input).get(1, 0.0)
+            with self.metrics.time("river"):
+                river_pred_prob = self.river_model.predict_proba_one(river_input).get(1, 0.0)
             river_pred_label = int(river_pred_prob >= 0.5)
 
-            combined_prob = (bilstm_pred_prob + river_pred_prob) / 2.0
-            combined_label = int(combined_prob >= 0.5)
+            with self.metrics.time("meta"):
+                combined_prob = (bilstm_pred_prob + river_pred_prob) / 2.0
+                combined_label = int(combined_prob >= 0.5)
 
             logging.info(
                 f"Predictions - BiLSTM prob: {bilstm_pred_prob:.4f}, River prob: {river_pred_prob:.4f}, Combined prob: {combined_prob:.4f}"
@@ -0,0 +1,45 @@
+import pytest
+
+
+@pytest.fixture
+def transaction():
+    """
+    One schema-valid (features, label) record, as streamed from MongoDB.
+    """
+    features = {
+        "TransactionID": "TX0000000",
+        "CustomerID": "CUST3000",
+        "TransactionTimestamp": "2025-04-23T19:10:22",
+        "Amount": 95148.43,
+        "Currency": "INR",
+        "MerchantCategory": "Fuel",
+        "TransactionType": "POS",
+        "CardPresent": True,
+        "HourOfDay": 19,
+        "DayOfWeek": "Wednesday",
+        "GeoLocation": "Colemanmouth, DO",
+        "DeviceType": "POS Terminal",
+        "IsInternational": False,
+        "CustomerTenureMonths": 117,
+        "NumTransactionsLast24h": 5,
+        "AvgTransactionAmount7d": 25410.68,
+        "IsNewDevice": False,
+    }
+    return features, 0
+
+
+@pytest.fixture
+def request_payload():
+    """
+    One /predict payload.
+    """
+    return {
+        "amount": 120.5,
+        "hour_of_day": 14,
+        "customer_tenure": 24,
+        "num_tx_last_24h": 3,
+        "avg_tx_amount_7d": 80.0,
+        "card_present": True,
+        "is_international": False,
+        "is_new_device": False,
+    }
@@ -0,0 +1,94 @@
+import atexit
+import json
+import time
+import uuid
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def serving():
+    """
+    The Flask app with its models loaded (single process, as `python app.py`).
+    """
+    import app as serving_app
+
+    # Keep test traffic out of the on-disk sequence store snapshot.
+    atexit.unregister(serving_app.sequence_store.save)
+    deadline = time.monotonic() + 300
+    while not serving_app.models.wait_until_ready(timeout=1):
+        if serving_app.models.error is not None:
+            # e.g. model pickles written by another River version than the installed one.
+            pytest.skip(f"Models could not be loaded: {serving_app.models.error}")
+        if time.monotonic() > deadline:
+            pytest.fail(f"Models did not load: {serving_app.models.startup_report()}")
+    return serving_app
+
+
+@pytest.fixture
+def client(serving):
+    return serving.app.test_client()
+
+
+def test_retried_predict_is_scored_and_recorded_once(serving, client, request_payload):
+    payload = {**request_payload, "customer_id": f"test-{uuid.uuid4()}"}
+    appends, hits = serving.sequence_store.appends, serving.score_cache.hits
+
+    responses = [client.post("/predict", json=payload) for _ in range(3)]
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert responses[1].get_json() == responses[0].get_json() == responses[2].get_json()
+    assert serving.sequence_store.appends - appends == 1
+    assert serving.score_cache.hits - hits == 2
+
+
+def test_a_new_transaction_for_the_customer_is_scored_again(serving, client, request_payload):
+    payload = {**request_payload, "customer_id": f"test-{uuid.uuid4()}"}
+    client.post("/predict", json=payload)
+    hits = serving.score_cache.hits
+    client.post("/predict", json={**payload, "amount": payload["amount"] + 1})
+    assert serving.score_cache.hits == hits
+    assert serving.sequence_store.peek(payload["customer_id"]) is not None
+
+
+@pytest.mark.parametrize("body", ["[1, 2]", '"text"', "3", "{}"])
+def test_predict_rejects_non_object_bodies(client, body):
+    response = client.post("/predict", data=body, content_type="application/json")
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+@pytest.mark.parametrize("value", ["null", "NaN", "Infinity", '"abc"'])
+def test_predict_rejects_unusable_values(client, request_payload, value):
+    body = json.dumps(request_payload).replace('"amount": 120.5', f'"amount": {value}')
+    response = client.post("/predict", data=body, content_type="application/json")
+    assert response.status_code == 400
+
+
+def test_predict_rejects_a_missing_field(client, request_payload):
+    del request_payload["amount"]
+    assert client.post("/predict", json=request_payload).status_code == 400
+
+
+def test_predict_batch_streams_one_result_per_row(client, request_payload):
+    columns = {key: [value, value] for key, value in request_payload.items()}
+    response = client.post("/predict_batch", json=columns)
+    assert response.status_code == 200
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 2 and json.loads(lines[0]) == json.loads(lines[1])
+
+
+@pytest.mark.parametrize("columns", [
+    lambda payload: payload,  # scalars instead of arrays
+    lambda payload: {**{key: [value] for key, value in payload.items()}, "amount": [1.0, 2.0]},
+    lambda payload: [payload],
+])
+def test_predict_batch_rejects_malformed_columns(client, request_payload, columns):
+    response = client.post("/predict_batch", json=columns(request_payload))
+    assert response.status_code == 400
+
+
+def test_predict_batch_rejects_non_object_ndjson_lines(client, request_payload):
+    body = json.dumps(request_payload) + "\n[1, 2]\n"
+    response = client.post("/predict_batch", data=body, content_type="application/x-ndjson")
+    assert response.status_code == 400
+    assert "Line 2" in response.get_json()["error"]
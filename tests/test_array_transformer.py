@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.components.array_transformer import ArrayTransformer
+
+
+def record(i, category=None):
+    return {
+        "amount": float(i),
+        "hour": float(i % 24),
+        "merchant": category or f"m{i % 3}",
+        "present": i % 2 == 0,
+        "city": f"city{i}",
+    }
+
+
+def transformer(output):
+    return ArrayTransformer(["amount", "hour"], ["merchant"], ["present"], output=output, hashed_fields={"city": 4})
+
+
+@pytest.mark.parametrize("output", ["dense", "sparse"])
+def test_rows_have_a_fixed_width_until_a_category_is_learned(output):
+    encoder = transformer(output)
+    for i in range(5):
+        encoder.learn_one(record(i))
+    width = len(encoder.feature_names)
+    assert len(encoder.transform_one(record(5, category="unseen"))) == width
+    assert "merchant_unseen" not in encoder.feature_names
+
+
+def test_learning_a_category_appends_a_column_without_moving_others():
+    encoder = transformer("dense")
+    for i in range(5):
+        encoder.learn_one(record(i))
+    before = encoder.transform_one(record(7))
+    names = encoder.feature_names
+
+    encoder.learn_one(record(6, category="new"))
+    assert encoder.feature_names[:len(names)] == names
+    assert encoder.feature_names[len(names):] == ["merchant_new"]
+    after = encoder.transform_one(record(7, category="new"))
+    # Same numeric/boolean/hash columns (statistics aside), one-hot moved to the new column.
+    assert after[names.index("present")] == before[names.index("present")]
+    assert after[-1] == 1.0 and not after[len(names) - 3:len(names)].any()
+
+
+@pytest.mark.parametrize("output", ["dense", "sparse"])
+def test_transform_many_matches_transform_one(output):
+    encoder = transformer(output)
+    records = [record(i) for i in range(10)] + [record(10, category="unseen")]
+    for x in records[:10]:
+        encoder.learn_one(x)
+    frame = encoder.transform_many(pd.DataFrame(records))
+    if output == "sparse":
+        frame = frame.sparse.to_dense()
+    assert list(frame.columns) == encoder.feature_names
+    np.testing.assert_allclose(frame.to_numpy(dtype=float), np.vstack([encoder.transform_one(x) for x in records]))
+
+
+def test_dict_output_matches_the_river_union():
+    from river import compose
+    from river.preprocessing import OneHotEncoder, StandardScaler
+
+    union = compose.TransformerUnion(
+        compose.Select("amount", "hour") | StandardScaler(),
+        compose.Select("merchant") | OneHotEncoder(),
+    )
+    encoder = ArrayTransformer(["amount", "hour"], ["merchant"], [])
+    for i in range(20):
+        x = record(i, category="late" if i == 15 else None)
+        assert encoder.transform_one(x) == union.transform_one(x)
+        encoder.learn_one(x)
+        union.learn_one(x)
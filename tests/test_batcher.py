@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+
+from src.serving.batcher import MicroBatcher
+
+
+def submit_concurrently(batcher, items):
+    results = [None] * len(items)
+    errors = [None] * len(items)
+    barrier = threading.Barrier(len(items))
+
+    def run(i):
+        barrier.wait()
+        try:
+            results[i] = batcher.submit(items[i], timeout=5)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(items))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_submits_are_coalesced_and_answered_in_order():
+    calls = []
+
+    def batch_fn(items):
+        calls.append(list(items))
+        return [item * 10 for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=50)
+    try:
+        results, errors = submit_concurrently(batcher, list(range(8)))
+    finally:
+        batcher.close()
+
+    assert errors == [None] * 8
+    assert results == [i * 10 for i in range(8)]
+    assert len(calls) < 8
+    assert all(len(batch) <= 8 for batch in calls)
+    stats = batcher.stats()
+    assert stats["requests"] == 8
+    assert stats["batches"] == len(calls)
+
+
+def test_batch_size_is_capped():
+    sizes = []
+
+    def batch_fn(items):
+        sizes.append(len(items))
+        return items
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=2, max_wait_ms=50)
+    try:
+        results, _ = submit_concurrently(batcher, list(range(6)))
+    finally:
+        batcher.close()
+
+    assert results == list(range(6))
+    assert max(sizes) <= 2
+
+
+def test_error_reaches_every_caller_in_the_batch():
+    def batch_fn(items):
+        raise RuntimeError("model failed")
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=20)
+    try:
+        _, errors = submit_concurrently(batcher, list(range(4)))
+    finally:
+        batcher.close()
+
+    assert all(isinstance(e, RuntimeError) and "model failed" in str(e) for e in errors)
+
+
+def test_wrong_number_of_results_is_an_error():
+    batcher = MicroBatcher(lambda items: [], max_batch_size=1, max_wait_ms=0)
+    try:
+        with pytest.raises(Exception, match="returned 0 results for 1 items"):
+            batcher.submit("x", timeout=5)
+    finally:
+        batcher.close()
+
+
+def test_submit_times_out():
+    release = threading.Event()
+
+    def batch_fn(items):
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=1, max_wait_ms=0)
+    try:
+        with pytest.raises(TimeoutError):
+            batcher.submit("x", timeout=0.05)
+    finally:
+        release.set()
+        batcher.close()
+
+
+def test_close_serves_queued_items_first():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=4, max_wait_ms=0)
+    assert batcher.submit("a", timeout=5) == "a"
+    batcher.close()
+    assert batcher.stats()["requests"] == 1
+
+
+def test_submit_after_close_is_rejected():
+    batcher = MicroBatcher(lambda items: items, max_wait_ms=0)
+    batcher.close()
+    batcher.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.submit("a", timeout=5)
+
+
+@pytest.mark.parametrize("kwargs", [{"max_batch_size": 0}, {"max_wait_ms": -1}])
+def test_invalid_settings(kwargs):
+    with pytest.raises(ValueError):
+        MicroBatcher(lambda items: items, **kwargs)
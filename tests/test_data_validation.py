@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from src.components.data_validation import DataValidation
+from src.entity.config_entity import DataValidationConfig
+
+
+@pytest.fixture
+def validation(tmp_path):
+    config = DataValidationConfig()
+    config.report_file_path = str(tmp_path / "report.yaml")
+    config.invalid_log_file_path = str(tmp_path / "invalid.csv")
+    return DataValidation(config, ingestion_artifact=None)
+
+
+def with_value(transaction, field, value, label=None):
+    features, default_label = transaction
+    return {**features, field: value}, default_label if label is None else label
+
+
+@pytest.mark.parametrize("field, value, rule", [
+    ("Amount", -1.0, "Amount:range"),
+    ("Amount", True, "Amount:type"),
+    ("HourOfDay", 24, "HourOfDay:range"),
+    ("HourOfDay", 3.5, "HourOfDay:type"),
+    ("Currency", "EUR", "Currency:domain"),
+    ("CardPresent", 1, "CardPresent:type"),
+    ("CustomerID", None, "CustomerID:missing"),
+    ("Amount", float("nan"), "Amount:missing"),
+])
+def test_check_names_the_failed_rule(validation, transaction, field, value, rule):
+    assert validation.check(transaction) is None
+    assert validation.check(with_value(transaction, field, value)) == rule
+
+
+@pytest.mark.parametrize("label", [2, "1", 1.5, None])
+def test_labels_outside_the_domain_are_rejected(validation, transaction, label):
+    assert validation.check((transaction[0], label)) == "label:domain"
+
+
+def test_stream_yields_valid_records_and_writes_the_report(validation, transaction, tmp_path):
+    records = [transaction, with_value(transaction, "Amount", -1.0), transaction]
+    stream, report = validation.run_validation(iter(records))
+    assert list(stream) == [transaction, transaction]
+
+    assert report.finalized
+    with open(tmp_path / "report.yaml") as f:
+        written = yaml.safe_load(f)
+    assert written["valid_records"] == 2
+    assert written["failures"] == {"Amount:range": 1}
+    assert (tmp_path / "invalid.csv").read_text().count("\n") == 2  # header and one record
+
+
+def test_an_abandoned_stream_is_not_reported_as_finalized(validation, transaction):
+    stream, report = validation.run_validation(iter([transaction] * 3))
+    next(stream)
+    stream.close()
+    assert not report.finalized and report.valid_records == 1
+
+
+def test_batch_validation_agrees_with_the_record_checks(validation, transaction):
+    records = [
+        transaction,
+        with_value(transaction, "Amount", -1.0),
+        with_value(transaction, "HourOfDay", 24),
+        with_value(transaction, "Currency", "EUR"),
+        with_value(transaction, "CustomerID", None),
+        (transaction[0], 3),
+    ]
+    frame = pd.DataFrame([features for features, _ in records])
+    labels = np.array([label for _, label in records])
+    result = validation.validate_batch(frame, labels)
+    expected = [validation.check(record) is None for record in records]
+    assert result.mask.tolist() == expected
+    assert result.invalid_records == 5
@@ -0,0 +1,78 @@
+import copy
+import os
+
+import pyarrow as pa
+import pytest
+
+from src.components.data_validation import BatchValidator
+from src.data_access.feature_store import FeatureStore
+
+
+class FakeCreditData:
+    """
+    Serves `stream_collection_after` from a list of documents, like CreditData.
+    """
+
+    def __init__(self, docs, fail_after=None):
+        self.docs = docs
+        self.fail_after = fail_after
+
+    def stream_collection_after(self, collection_name, after_id=None, batch_size=5000):
+        docs = [copy.deepcopy(doc) for doc in self.docs if after_id is None or doc["_id"] > after_id]
+        for start in range(0, len(docs), batch_size):
+            if self.fail_after is not None and start >= self.fail_after:
+                raise ConnectionError("cursor lost")
+            yield docs[start:start + batch_size]
+
+
+def documents(transaction, ids, **overrides):
+    features, label = transaction
+    return [{**features, **overrides, "_id": i, "IsFraud": label} for i in ids]
+
+
+def test_incremental_sync_only_pulls_new_documents(tmp_path, transaction):
+    store = FeatureStore(str(tmp_path))
+    docs = documents(transaction, range(1, 4))
+    assert store.sync("c", FakeCreditData(docs)) == 3
+    docs += documents(transaction, range(4, 6))
+    assert store.sync("c", FakeCreditData(docs)) == 2
+    assert store.sync("c", FakeCreditData(docs)) == 0
+    assert store.num_rows == 5 and store.watermark == 5
+    assert len(store.parts) == 2
+
+
+def test_a_field_null_in_the_first_sync_keeps_its_type(tmp_path, transaction):
+    store = FeatureStore(str(tmp_path))
+    store.sync("c", FakeCreditData(documents(transaction, [1], GeoLocation=None)))
+    store.sync("c", FakeCreditData(documents(transaction, [1, 2])))
+    table = store.read_table()
+    assert table.schema.field("GeoLocation").type == pa.string()
+    assert table.column("GeoLocation").to_pylist() == [None, transaction[0]["GeoLocation"]]
+
+
+def test_a_failed_sync_leaves_no_part_behind(tmp_path, transaction):
+    store = FeatureStore(str(tmp_path))
+    with pytest.raises(Exception, match="cursor lost"):
+        store.sync("c", FakeCreditData(documents(transaction, range(1, 5)), fail_after=2), batch_size=2)
+    assert os.listdir(tmp_path) == []
+    assert not store.exists()
+
+
+def test_iter_records_skips_invalid_rows(tmp_path, transaction):
+    store = FeatureStore(str(tmp_path))
+    docs = documents(transaction, [1, 2]) + documents(transaction, [3], Amount=-1.0)
+    store.sync("c", FakeCreditData(docs))
+    records = list(store.iter_records(validator=BatchValidator.from_yaml()))
+    assert len(records) == 2
+    assert records[0] == transaction
+
+
+def test_import_table_replaces_the_snapshot(tmp_path, transaction):
+    store = FeatureStore(str(tmp_path))
+    store.sync("c", FakeCreditData(documents(transaction, [1, 2])))
+    store.import_table(pa.table({"Amount": [1.0], "IsFraud": [0]}), source="file.csv")
+    assert store.num_rows == 1 and store.watermark is None
+    assert len(os.listdir(tmp_path)) == 2  # the new part and the manifest
+    # The imported schema differs from schema.yaml, so the next sync is a full refresh.
+    assert store.sync("c", FakeCreditData(documents(transaction, [1, 2]))) == 2
+    assert store.num_rows == 2
@@ -0,0 +1,108 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.serving.features import (
+    REQUEST_KEYS,
+    columns_to_matrix,
+    customer_ids,
+    parse_ndjson,
+    record_to_matrix,
+    records_to_matrix,
+    to_river_inputs,
+)
+from src.utils.feature_encoder import FEATURE_NAMES, FeatureEncoder, FeatureError
+
+
+def test_single_and_batch_paths_agree(request_payload):
+    columns = {key: [request_payload[key]] * 2 for key in REQUEST_KEYS}
+    batch = columns_to_matrix(columns)
+    np.testing.assert_array_equal(batch[0], record_to_matrix(request_payload)[0])
+    np.testing.assert_array_equal(records_to_matrix([request_payload] * 2), batch)
+    assert batch.dtype == np.float64 and batch.shape == (2, len(REQUEST_KEYS))
+
+
+def test_booleans_and_numeric_strings_are_encoded(request_payload):
+    row = record_to_matrix(dict(request_payload, card_present=True, amount="12.5"))[0]
+    assert row[REQUEST_KEYS.index("card_present")] == 1.0
+    assert row[REQUEST_KEYS.index("amount")] == 12.5
+
+
+def test_river_inputs_are_keyed_by_model_feature_name(request_payload):
+    (river_input,) = to_river_inputs(record_to_matrix(request_payload))
+    assert list(river_input) == list(FEATURE_NAMES)
+    assert river_input["Amount"] == request_payload["amount"]
+
+
+def test_customer_ids_are_strings():
+    assert customer_ids({"customer_id": [1, None, "a"]}) == ["1", None, "a"]
+    assert customer_ids({}) is None
+
+
+@pytest.mark.parametrize("body", [[1], "text", 5, None])
+def test_non_object_predict_body(body):
+    with pytest.raises(FeatureError, match="JSON object"):
+        record_to_matrix(body)
+
+
+def test_missing_field(request_payload):
+    del request_payload["amount"]
+    with pytest.raises(FeatureError, match="amount"):
+        record_to_matrix(request_payload)
+
+
+@pytest.mark.parametrize("value", [None, float("nan"), float("inf"), "nan"])
+def test_null_and_non_finite_values_are_rejected(request_payload, value):
+    with pytest.raises(FeatureError, match="amount"):
+        record_to_matrix(dict(request_payload, amount=value))
+    with pytest.raises(FeatureError, match="row 2: amount"):
+        records_to_matrix([request_payload, dict(request_payload, amount=value)])
+    columns = {key: [request_payload[key], request_payload[key]] for key in REQUEST_KEYS}
+    columns["amount"][1] = value
+    with pytest.raises(FeatureError, match="row 2: amount"):
+        columns_to_matrix(columns)
+
+
+def test_non_numeric_value(request_payload):
+    with pytest.raises(FeatureError, match="not numeric"):
+        record_to_matrix(dict(request_payload, amount="abc"))
+
+
+def test_scalar_columns_are_rejected(request_payload):
+    with pytest.raises(FeatureError, match="must be arrays"):
+        columns_to_matrix(dict(request_payload))
+
+
+def test_columns_must_have_the_same_length(request_payload):
+    columns = {key: [request_payload[key]] for key in REQUEST_KEYS}
+    columns["amount"] = [1.0, 2.0]
+    with pytest.raises(FeatureError, match="same length"):
+        columns_to_matrix(columns)
+    columns["amount"] = [1.0]
+    columns["customer_id"] = ["a", "b"]
+    with pytest.raises(FeatureError, match="customer_id"):
+        columns_to_matrix(columns)
+
+
+def test_non_object_records_are_rejected(request_payload):
+    with pytest.raises(FeatureError, match="Record 2"):
+        records_to_matrix([request_payload, [1]])
+
+
+def test_ndjson(request_payload):
+    body = json.dumps(request_payload) + "\n\n" + json.dumps(request_payload) + "\n"
+    assert len(parse_ndjson(body)) == 2
+    with pytest.raises(FeatureError, match="line 2"):
+        parse_ndjson(json.dumps(request_payload) + "\n{broken")
+    with pytest.raises(FeatureError, match="Line 1 is not a JSON object"):
+        parse_ndjson("[1]\n")
+
+
+def test_encoder_reuses_its_buffer_unless_given_out():
+    encoder = FeatureEncoder(("a", "b"), dtype=np.float32, capacity=1)
+    first = encoder.encode_many([{"a": 1, "b": 2}, {"a": 3, "b": 4}])
+    np.testing.assert_array_equal(first, [[1, 2], [3, 4]])
+    out = np.empty(2, dtype=np.float32)
+    assert encoder.encode_one({"a": 5, "b": 6}, out=out) is out
+    assert encoder.encode_many([]).shape == (0, 2)
@@ -0,0 +1,52 @@
+import pytest
+
+from src.components.data_transformation import DataTransformer
+from src.components.hashing_encoder import HashingEncoder, hash_bucket, hashed_column
+from src.entity.config_entity import DataTransformationConfig
+
+
+def test_buckets_are_stable_and_in_range():
+    for value in ["Mumbai", "Pune", 42, True]:
+        bucket, weight = hash_bucket("GeoLocation", value, 8, seed=0)
+        assert 0 <= bucket < 8 and weight in (-1, 1)
+        assert hash_bucket("GeoLocation", value, 8, seed=0) == (bucket, weight)
+        assert hash_bucket("GeoLocation", value, 8, seed=0, signed=False)[1] == 1
+
+
+def test_values_hash_as_strings_per_field():
+    assert hash_bucket("f", 1, 1024, seed=0) == hash_bucket("f", "1", 1024, seed=0)
+    tokens = {hash_bucket(field, "x", 1 << 20, seed=0) for field in ("a", "b", "c", "d")}
+    assert len(tokens) > 1
+
+
+def test_encoder_emits_one_column_per_field_and_skips_missing_values():
+    encoder = HashingEncoder({"GeoLocation": 4, "DeviceType": 2})
+    out = encoder.transform_one({"GeoLocation": "Pune", "DeviceType": None, "Other": "x"})
+    (name, weight), = out.items()
+    bucket, expected = hash_bucket("GeoLocation", "Pune", 4, seed=0)
+    assert name == hashed_column("GeoLocation", bucket) and weight == expected
+
+
+def transformer(tmp_path, engine, signed):
+    config = DataTransformationConfig(
+        engine=engine, output="dict", hashed_fields={"GeoLocation": 16}, signed_hashing=signed
+    )
+    config.transformed_data_dir = str(tmp_path / engine)
+    config.pipeline_path = str(tmp_path / engine / "pipeline.pkl")
+    return DataTransformer(config)
+
+
+@pytest.mark.parametrize("signed", [True, False])
+def test_river_and_array_engines_encode_identically(tmp_path, transaction, signed):
+    features, label = transaction
+    records = [
+        ({**features, "GeoLocation": f"City {i % 7}", "Amount": 100.0 + i, "CardPresent": i % 2 == 0}, label)
+        for i in range(30)
+    ]
+    outputs = {}
+    for engine in ("river", "array"):
+        step = transformer(tmp_path, engine, signed)
+        stream, _ = step.fit_transform_stream(iter(records))
+        outputs[engine] = [transformed for transformed, _ in stream]
+    assert outputs["river"] == outputs["array"]
+    assert not any(name.startswith("GeoLocation_City") for name in outputs["array"][-1])
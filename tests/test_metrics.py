@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from src.serving.metrics import MetricsRegistry
+
+
+def test_counter_and_histogram_exposition():
+    registry = MetricsRegistry(namespace="t")
+    requests = registry.counter("requests_total", "Requests.", ("endpoint",))
+    requests.labels("/predict").inc()
+    requests.labels("/predict").inc(2)
+    sizes = registry.histogram("rows", "Rows.", buckets=(1, 10))
+    sizes.observe(5)
+
+    text = registry.render()
+    assert 't_requests_total{endpoint="/predict"} 3' in text
+    assert 't_rows_bucket{le="1"} 0' in text
+    assert 't_rows_bucket{le="10"} 1' in text
+    assert 't_rows_bucket{le="+Inf"} 1' in text
+    assert "t_rows_sum 5" in text
+    assert "t_rows_count 1" in text
+    assert text.count("# HELP t_requests_total") == 1
+
+
+def test_stage_timer_records_one_observation():
+    registry = MetricsRegistry(namespace="t")
+    with registry.time("parse"):
+        pass
+    assert 't_stage_seconds_count{stage="parse"} 1' in registry.render()
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry(namespace="t")
+    registry.counter("c", "C.", ("path",)).labels('a"b\n').inc()
+    assert 't_c{path="a\\"b\\n"} 1' in registry.render()
+
+
+def test_wrong_label_count_is_an_error():
+    registry = MetricsRegistry(namespace="t")
+    counter = registry.counter("c", "C.", ("a", "b"))
+    with pytest.raises(ValueError):
+        counter.labels("only-one")
+
+
+def test_duplicate_registration_is_an_error():
+    registry = MetricsRegistry(namespace="t")
+    registry.counter("c", "C.")
+    with pytest.raises(ValueError):
+        registry.counter("c", "C.")
+
+
+def test_callbacks_are_read_at_scrape_time():
+    registry = MetricsRegistry(namespace="t")
+    state = {"depth": 1}
+    registry.callback("queue_depth", "Depth.", lambda: state["depth"])
+    registry.callback("by_model", "Per model.", lambda: {"river": 1, "bilstm": 2}, label_name="model")
+    state["depth"] = 7
+    text = registry.render()
+    assert "t_queue_depth 7" in text
+    assert 't_by_model{model="bilstm"} 2' in text
+
+
+def test_disabled_registry_is_a_no_op():
+    registry = MetricsRegistry(enabled=False, namespace="t")
+    counter = registry.counter("c", "C.", ("a",))
+    counter.labels("x").inc()
+    with registry.time("parse"):
+        pass
+    assert registry.callback("g", "G.", lambda: 1) is None
+    assert "t_c{" not in registry.render()
+
+
+def worker_registry(worker_id, shared_value):
+    registry = MetricsRegistry(namespace="t")
+    registry.set_constant_labels(worker=worker_id)
+    registry.counter("requests_total", "Requests.").inc(worker_id + 1)
+    registry.callback("cache_hits_total", "Hits.", lambda: shared_value, kind="counter", shared=True)
+    return registry
+
+
+def test_render_merges_other_workers_under_one_family():
+    local = worker_registry(0, shared_value=5)
+    other = worker_registry(1, shared_value=5)
+    # Other workers' families arrive as JSON (see WorkerExports).
+    exported = json.loads(json.dumps(other.collect(include_shared=False)))
+
+    text = local.render(others=[exported])
+    assert 't_requests_total{worker="0"} 1' in text
+    assert 't_requests_total{worker="1"} 2' in text
+    assert text.count("# HELP t_requests_total") == 1
+    # Shared state is reported once, without a worker label.
+    samples = [line for line in text.splitlines() if line.startswith("t_cache_hits_total")]
+    assert samples == ["t_cache_hits_total 5"]
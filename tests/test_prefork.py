@@ -0,0 +1,89 @@
+import os
+import signal
+import socket
+import time
+import urllib.request
+import multiprocessing
+
+import pytest
+
+from src.serving.prefork import PreforkServer, WorkerExports, process_memory
+
+
+def pid_app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [str(os.getpid()).encode()]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(condition, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture
+def running_server():
+    server = PreforkServer(pid_app, "127.0.0.1", free_port(), workers=2, graceful_timeout=5)
+    master = multiprocessing.get_context("fork").Process(target=server.serve_forever)
+    master.start()
+    # The worker table is shared memory, so this process sees the master's updates.
+    assert wait_for(lambda: all(server.worker_pids()) and server._table[:, 1].all())
+    yield server, master
+    if master.is_alive():
+        os.kill(master.pid, signal.SIGTERM)
+    master.join(15)
+
+
+def get(server):
+    with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/", timeout=5) as response:
+        return int(response.read())
+
+
+def test_workers_serve_requests_on_the_shared_port(running_server):
+    server, _ = running_server
+    pids = {get(server) for _ in range(20)}
+    assert pids <= set(server.worker_pids())
+
+
+def test_dead_worker_is_restarted(running_server):
+    server, _ = running_server
+    old_pid = server.worker_pids()[0]
+    os.kill(old_pid, signal.SIGKILL)
+    assert wait_for(lambda: server.worker_pids()[0] not in (0, old_pid) and server._table[0, 1])
+    assert get(server) in server.worker_pids()
+
+
+def test_sigterm_stops_every_worker(running_server):
+    server, master = running_server
+    os.kill(master.pid, signal.SIGTERM)
+    master.join(15)
+    assert master.exitcode == 0
+    assert not any(server.worker_pids())
+
+
+def test_workers_must_be_positive():
+    with pytest.raises(ValueError):
+        PreforkServer(pid_app, "127.0.0.1", 0, workers=0)
+
+
+def test_worker_exports_are_read_by_the_other_workers(tmp_path):
+    directory = str(tmp_path)
+    WorkerExports(directory, 0, lambda: {"requests": 1}).write()
+    WorkerExports(directory, 1, lambda: {"requests": 2}).write()
+    assert WorkerExports(directory, 0, lambda: None).others() == {1: {"requests": 2}}
+
+
+def test_process_memory_reports_this_process():
+    memory = process_memory(os.getpid())
+    if not memory:
+        pytest.skip("/proc/<pid>/smaps_rollup is not available")
+    assert memory["rss_mb"] > 0
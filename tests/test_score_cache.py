@@ -0,0 +1,125 @@
+import multiprocessing
+import time
+
+import numpy as np
+import pytest
+
+from src.serving.score_cache import ScoreCache, SharedScoreCache, score_key
+
+
+ROW = np.array([120.5, 14, 24, 3, 80.0, 1, 0, 0], dtype=np.float64)
+
+
+def test_score_key_is_canonical():
+    assert score_key(ROW, "v1") == score_key(ROW.copy(), "v1")
+    negative_zero = ROW.copy()
+    negative_zero[6] = -0.0
+    assert score_key(negative_zero, "v1") == score_key(ROW, "v1")
+
+
+def test_score_key_depends_on_version_customer_and_history():
+    history = np.ones((30, 8), dtype=np.float32)
+    keys = {
+        score_key(ROW, "v1"),
+        score_key(ROW, "v2"),
+        score_key(ROW, "v1", customer_id="c1"),
+        score_key(ROW, "v1", customer_id="c2"),
+        score_key(ROW, "v1", history, "c1"),
+        score_key(ROW, "v1", history * 2, "c1"),
+    }
+    assert len(keys) == 6
+
+
+@pytest.fixture(params=[ScoreCache, SharedScoreCache])
+def cache_class(request):
+    return request.param
+
+
+def test_hit_and_miss_counts(cache_class):
+    cache = cache_class(max_entries=16, ttl_s=30)
+    key = score_key(ROW, "v1")
+    assert cache.get(key) is None
+    cache.put(key, {"score": 0.5})
+    assert cache.get(key) == {"score": 0.5}
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_entries_expire(cache_class):
+    cache = cache_class(max_entries=16, ttl_s=0.05)
+    key = score_key(ROW, "v1")
+    cache.put(key, 1)
+    time.sleep(0.1)
+    assert cache.get(key) is None
+    assert cache.expirations == 1
+
+
+def test_invalidate_drops_everything(cache_class):
+    cache = cache_class(max_entries=16, ttl_s=30)
+    keys = [score_key(ROW + i, "v1") for i in range(4)]
+    for key in keys:
+        cache.put(key, 1)
+    cache.invalidate()
+    assert all(cache.get(key) is None for key in keys)
+    assert len(cache) == 0
+    assert cache.invalidations == 1
+
+
+def test_zero_entries_disables_the_cache(cache_class):
+    cache = cache_class(max_entries=0, ttl_s=30)
+    key = score_key(ROW, "v1")
+    cache.put(key, 1)
+    assert not cache.enabled
+    assert cache.get(key) is None
+
+
+@pytest.mark.parametrize("kwargs", [{"max_entries": -1}, {"ttl_s": 0}])
+def test_invalid_settings(cache_class, kwargs):
+    with pytest.raises(ValueError):
+        cache_class(**kwargs)
+
+
+def test_lru_eviction():
+    cache = ScoreCache(max_entries=2, ttl_s=30)
+    a, b, c = (score_key(ROW + i, "v1") for i in range(3))
+    cache.put(a, "a")
+    cache.put(b, "b")
+    cache.get(a)
+    cache.put(c, "c")
+    assert cache.get(b) is None
+    assert cache.get(a) == "a" and cache.get(c) == "c"
+    assert cache.evictions == 1
+
+
+def test_shared_cache_evicts_least_recently_used_in_a_full_set():
+    cache = SharedScoreCache(max_entries=4, ttl_s=30, ways=4)  # a single set
+    keys = [score_key(ROW + i, "v1") for i in range(5)]
+    for key in keys[:4]:
+        cache.put(key, 1)
+    cache.get(keys[0])
+    cache.put(keys[4], 1)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == 1
+    assert cache.evictions == 1
+
+
+def test_shared_cache_skips_values_that_do_not_fit():
+    cache = SharedScoreCache(max_entries=4, ttl_s=30, value_bytes=64)
+    key = score_key(ROW, "v1")
+    cache.put(key, "x" * 1000)
+    assert cache.get(key) is None
+
+
+def _put_in_child(cache, key):
+    cache.put(key, {"score": 0.25})
+
+
+def test_shared_cache_entries_are_visible_across_forked_processes():
+    cache = SharedScoreCache(max_entries=16, ttl_s=30)
+    key = score_key(ROW, "v1")
+    child = multiprocessing.get_context("fork").Process(target=_put_in_child, args=(cache, key))
+    child.start()
+    child.join(10)
+    assert child.exitcode == 0
+    assert cache.get(key) == {"score": 0.25}
+    assert cache.stats()["shared"] is True
@@ -0,0 +1,142 @@
+import collections
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from src.serving.sequence_store import SequenceStore, customer_key
+
+
+def row(value, num_features=3):
+    return np.full(num_features, value, dtype=np.float32)
+
+
+def test_short_history_is_front_padded_with_the_first_event():
+    store = SequenceStore(sequence_length=4, num_features=3, max_customers=8)
+    store.append("c1", row(1))
+    window = store.append("c1", row(2))
+    np.testing.assert_array_equal(window[:, 0], [1, 1, 1, 2])
+
+
+def test_window_keeps_the_latest_events_in_order():
+    store = SequenceStore(sequence_length=3, num_features=3, max_customers=8)
+    for value in range(1, 6):
+        window = store.append("c1", row(value))
+    np.testing.assert_array_equal(window[:, 0], [3, 4, 5])
+    assert store.appends == 5
+
+
+def test_peek_does_not_record_anything():
+    store = SequenceStore(sequence_length=3, num_features=3, max_customers=8)
+    assert store.peek("c1") is None
+    store.append("c1", row(1))
+    before = store.peek("c1")
+    store.peek("c1")
+    assert store.appends == 1
+    np.testing.assert_array_equal(store.peek("c1"), before)
+    assert len(store) == 1
+
+
+def test_least_recently_seen_customer_is_evicted():
+    store = SequenceStore(sequence_length=2, num_features=3, max_customers=2)
+    store.append("a", row(1))
+    store.append("b", row(2))
+    store.append("a", row(3))
+    store.append("c", row(4))
+    assert store.peek("b") is None
+    assert store.peek("a") is not None
+    assert store.evictions == 1
+
+
+def test_eviction_order_matches_an_lru_reference():
+    rng = np.random.default_rng(0)
+    store = SequenceStore(sequence_length=2, num_features=3, max_customers=20)
+    reference = collections.OrderedDict()
+    evictions = 0
+    for customer in rng.integers(0, 60, size=3000).tolist():
+        window = store.append(customer, row(customer))
+        assert window[-1, 0] == customer
+        reference[customer] = True
+        reference.move_to_end(customer)
+        if len(reference) > 20:
+            reference.popitem(last=False)
+            evictions += 1
+    assert [c for c in range(60) if store.peek(c) is not None] == sorted(reference)
+    assert store.evictions == evictions
+
+
+def test_build_sequences_mixes_customers_and_anonymous_rows():
+    store = SequenceStore(sequence_length=3, num_features=3, max_customers=8)
+    matrix = np.stack([row(1), row(2), row(3)])
+    sequences = store.build_sequences(["a", None, "a"], matrix)
+    assert sequences.shape == (3, 3, 3)
+    np.testing.assert_array_equal(sequences[1][:, 0], [2, 2, 2])
+    np.testing.assert_array_equal(sequences[2][:, 0], [1, 1, 3])
+    assert store.appends == 2
+
+
+def test_customer_ids_compare_as_strings():
+    assert customer_key(42) == customer_key("42")
+    assert customer_key("a") != 0
+
+
+def test_snapshot_round_trip_keeps_histories_and_lru_order(tmp_path):
+    store = SequenceStore(sequence_length=3, num_features=3, max_customers=4)
+    for customer, value in [("a", 1), ("b", 2), ("a", 3)]:
+        store.append(customer, row(value))
+    path = str(tmp_path / "store.npz")
+    store.save(path)
+
+    restored = SequenceStore(sequence_length=3, num_features=3, max_customers=2)
+    restored.load(path)
+    np.testing.assert_array_equal(restored.peek("a"), store.peek("a"))
+    restored.append("c", row(9))
+    assert restored.peek("b") is None  # "b" was the least recently seen
+
+
+def test_load_rejects_a_different_sequence_shape(tmp_path):
+    store = SequenceStore(sequence_length=3, num_features=3, max_customers=4)
+    store.append("a", row(1))
+    path = str(tmp_path / "store.npz")
+    store.save(path)
+    with pytest.raises(Exception, match="does not match"):
+        SequenceStore(sequence_length=5, num_features=3, max_customers=4).load(path)
+
+
+def test_memory_cap_too_small():
+    with pytest.raises(ValueError):
+        SequenceStore(sequence_length=30, num_features=8, max_memory_mb=0)
+
+
+def _append_in_child(store):
+    store.append("a", row(2))
+    store.append("b", row(5))
+
+
+def _fill_in_child(store):
+    for customer in range(10):
+        store.append(f"child-{customer}", row(customer))
+
+
+def test_shared_store_is_extended_by_forked_processes():
+    store = SequenceStore(sequence_length=3, num_features=3, max_customers=4, shared=True)
+    store.append("a", row(1))
+    child = multiprocessing.get_context("fork").Process(target=_append_in_child, args=(store,))
+    child.start()
+    child.join(10)
+    assert child.exitcode == 0
+    np.testing.assert_array_equal(store.peek("a")[:, 0], [1, 1, 2])
+    np.testing.assert_array_equal(store.peek("b")[:, 0], [5, 5, 5])
+    assert store.appends == 3
+
+
+def test_shared_store_index_sees_customers_added_and_evicted_by_other_processes():
+    store = SequenceStore(sequence_length=2, num_features=3, max_customers=4, shared=True)
+    store.append("parent", row(1))
+    child = multiprocessing.get_context("fork").Process(target=_fill_in_child, args=(store,))
+    child.start()
+    child.join(10)
+    assert child.exitcode == 0
+    assert store.peek("parent") is None
+    assert [c for c in range(10) if store.peek(f"child-{c}") is not None] == [6, 7, 8, 9]
+    assert store.evictions == 7
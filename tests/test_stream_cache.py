@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from src2.components.data_transformation import DataTransformation
+from src2.entity.config_entity import DataTransformationConfig
+
+
+def transformer(shard_dir):
+    config = DataTransformationConfig(shard_dir=str(shard_dir), chunk_size=50)
+    return DataTransformation(config, None, None, window_size=5)
+
+
+def source(value, calls):
+    def record_source():
+        calls.append(value)
+        return iter([({column: value for column in DataTransformationConfig.feature_columns}, 0)] * 120)
+    return record_source
+
+
+def first_value(artifact):
+    features, _ = next(iter(artifact.chunk_source()))
+    return features[0, 0]
+
+
+def test_shards_are_reused_only_for_the_same_source(tmp_path):
+    step, calls = transformer(tmp_path / "shards"), []
+    assert first_value(step.initiate_streaming_transformation(source(1.0, calls), {"snapshot": 1})) == 1.0
+    assert first_value(step.initiate_streaming_transformation(source(2.0, calls), {"snapshot": 1})) == 1.0
+    assert first_value(step.initiate_streaming_transformation(source(3.0, calls), {"snapshot": 2})) == 3.0
+    assert calls == [1.0, 3.0]
+
+
+def test_shards_without_a_source_key_are_rebuilt(tmp_path):
+    step, calls = transformer(tmp_path / "shards"), []
+    step.initiate_streaming_transformation(source(1.0, calls))
+    assert first_value(step.initiate_streaming_transformation(source(2.0, calls))) == 2.0
+    assert calls == [1.0, 2.0]
+
+
+def test_a_directory_that_is_not_a_shard_cache_is_left_alone(tmp_path):
+    shard_dir = tmp_path / "shards"
+    shard_dir.mkdir()
+    (shard_dir / "notes.txt").write_text("keep me")
+    with pytest.raises(Exception, match="other than shards"):
+        transformer(shard_dir).initiate_streaming_transformation(source(1.0, []), {"snapshot": 1})
+    assert os.listdir(shard_dir) == ["notes.txt"]
@@ -0,0 +1,30 @@
+"""
+Train the River, BiLSTM and meta models from one read of the data.
+
+Usage:
+    python train.py                                  # MongoDB feature store
+    python train.py --csv-path credit_card_fraud_dataset.csv
+"""
+import argparse
+
+from src.entity.config_entity import MultiModelTrainingConfig
+from src.pipline.multi_model_pipeline import MultiModelTrainPipeline
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv-path", default=None, help="read this CSV instead of the MongoDB collection")
+    parser.add_argument("--bilstm-epochs", type=int, default=None)
+    parser.add_argument("--meta-stacking", choices=("in_sample", "oof"), default="in_sample",
+                        help="build the meta dataset from in-sample or out-of-fold base-model scores")
+    parser.add_argument("--meta-river-model", default=None,
+                        help="score the meta dataset with this raw-feature River model instead of training one")
+    args = parser.parse_args()
+
+    config = MultiModelTrainingConfig(
+        csv_path=args.csv_path,
+        bilstm_epochs=args.bilstm_epochs,
+        meta_stacking=args.meta_stacking,
+        meta_river_model_path=args.meta_river_model
+    )
+    MultiModelTrainPipeline(config).run_pipeline()